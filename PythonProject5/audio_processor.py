@@ -4,6 +4,7 @@ import subprocess
 import tempfile
 from typing import Tuple, Optional
 import logging
+from utils.pcm_cache import PCMCache
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +44,11 @@ class AudioProcessor:
         if AudioProcessor.is_valid_wav(input_path, sample_rate):
             return input_path, False
 
+        # 默认参数且未指定输出目录时直接使用PCM缓存（无需清理）
+        cache = PCMCache.instance()
+        if output_dir is None and sample_rate == cache.sample_rate:
+            return cache.get_wav(input_path), False
+
         output_dir = output_dir or tempfile.mkdtemp(prefix="asr_temp_")
         os.makedirs(output_dir, exist_ok=True)
 
@@ -93,13 +99,13 @@ class AudioProcessor:
             input_path: 原始音频路径
             output_dir: 输出目录 (None则使用临时目录)
         Returns:
-            转换后的合规WAV路径
+            转换后的合规WAV路径（未指定输出目录时返回PCM缓存路径）
         """
         import tempfile
         import subprocess
 
         if output_dir is None:
-            output_dir = tempfile.mkdtemp(prefix="tencent_")
+            return PCMCache.instance().get_wav(input_path)
 
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(
@@ -8,7 +8,7 @@ from typing import Dict, Optional
 def validate_tencent_config(config_path: str) -> bool:
     """增强版腾讯云配置验证工具"""
     required_keys = ['secret_id', 'secret_key']
-    optional_keys = ['engine_type', 'filter_dirty', 'filter_mod', 'hotword_id']
+    optional_keys = ['engine_type', 'filter_dirty', 'filter_mod', 'hotword_id', 'source', 'stager']
 
     print(f"\n🔍 正在验证腾讯云配置文件: {os.path.basename(config_path)}")
 
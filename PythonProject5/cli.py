@@ -0,0 +1,287 @@
+"""
+无界面批量识别
+
+用法:
+    python cli.py 录音目录 --engine vosk --model models/vosk-model-cn --output results.jsonl
+    python cli.py a.wav b.mp3 --engine tencent --model configs/tencent.json --subtitles srt
+    python cli.py 样本目录 --engine whisper --model models/small.pt --benchmark
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import multiprocessing
+
+from stt_engine import STTEngine, WHISPER_DECODING_PROFILES
+from transcript import save_transcripts
+from subtitle_export import export_subtitles
+from progress_stats import ThroughputTracker
+from utils.audio_probe import AudioProbe, SILENCE_THRESHOLD_DB
+from utils.pipeline import SinkStage
+from utils.dedup import AudioDedup
+from tracing import tracer
+from profiling import RunProfiler, PROFILE_MODES
+from memory_budget import memory_budget
+from Levenshtein import distance
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg')
+
+logger = logging.getLogger("cli")
+
+
+def collect_files(inputs):
+    """展开命令行中的文件和目录（目录递归查找音频文件）"""
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif os.path.isfile(item):
+            files.append(item)
+        else:
+            logger.warning(f"跳过不存在的路径: {item}")
+    return files
+
+
+def iter_transcriptions(engine: STTEngine, files, split_channels: bool = False):
+    """按输入顺序产出(路径, 结果, 识别耗时)，声道拆分模式下结果为[(说话人, Transcript)]"""
+    if not split_channels:
+        yield from engine.transcribe_many(files)
+        return
+    yield from engine.transcribe_channels_many(files)
+
+
+def result_duration(tracker: ThroughputTracker, path: str):
+    """结果中的时长（秒，两位小数），无法探测时为None"""
+    seconds = tracker.duration_of(path)
+    return round(seconds, 2) if seconds else None
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="音频批量转文本（无界面模式）")
+    parser.add_argument("inputs", nargs="+", help="音频文件或目录")
+    parser.add_argument("--engine", default="vosk",
+                        choices=["vosk", "whisper", "microsoft", "tencent", "sphinx"])
+    parser.add_argument("--model", required=True, help="本地模型路径，或云服务配置JSON")
+    parser.add_argument("--lang", default="zh")
+    parser.add_argument("--split-channels", action="store_true", help="按声道拆分识别")
+    parser.add_argument("--workers", type=int, help="Vosk识别进程数（每个进程加载一份模型，默认最多4个，受内存上限约束）")
+    parser.add_argument("--threads", type=int, help="Whisper CPU推理线程数（默认CPU核数）")
+    parser.add_argument("--whisper-profile", choices=list(WHISPER_DECODING_PROFILES),
+                        help="Whisper解码策略（默认使用whisper自带参数）")
+    parser.add_argument("--whisper-int8", action="store_true", help="Whisper CPU推理使用int8动态量化")
+    parser.add_argument("--memory-budget", type=float, metavar="GB",
+                        help="已加载模型的内存上限（默认物理内存的60%%，0为不限）")
+    parser.add_argument("--silence-threshold", type=float, default=SILENCE_THRESHOLD_DB, metavar="DBFS",
+                        help="有声帧电平低于该值的文件判定为静音，不送入引擎")
+    parser.add_argument("--no-silence-check", action="store_true", help="关闭静音预检")
+    parser.add_argument("--no-dedup", action="store_true", help="内容相同的文件也分别识别（默认只识别一次）")
+    parser.add_argument("--benchmark", action="store_true", help="对比Whisper fp32与int8的速度和准确率")
+    parser.add_argument("--output", default="results.jsonl", help="时间轴结果(JSONL)")
+    parser.add_argument("--subtitles", choices=["srt", "vtt"], help="同时导出字幕")
+    parser.add_argument("--subtitle-dir", default="subtitles")
+    parser.add_argument("--trace", metavar="PATH",
+                        help="记录各阶段耗时并导出（.jsonl为JSONL，否则为Chrome trace）")
+    parser.add_argument("--profile", choices=PROFILE_MODES, help="性能分析模式，结果保存到--profile-dir")
+    parser.add_argument("--profile-dir", default="recognition_logs")
+    return parser
+
+
+def engine_config(args) -> dict:
+    config = {}
+    if args.workers:
+        config['vosk_workers'] = args.workers
+    if args.threads:
+        config['torch_threads'] = args.threads
+    if args.whisper_profile:
+        config['whisper_profile'] = args.whisper_profile
+    return config
+
+
+def run_benchmark(args, files) -> int:
+    """
+    Whisper CPU推理对比：fp32与int8动态量化
+
+    报告加载耗时（int8首次包含量化和写缓存）、识别耗时、RTF，
+    并以fp32输出为参照计算int8的字错误率(CER)。
+    """
+    if args.engine != 'whisper':
+        logger.error("--benchmark 仅支持whisper引擎")
+        return 1
+
+    total_audio = sum(AudioProbe.durations(files).values())
+    texts = {}
+    rows = []
+    for profile in ("fp32", "int8"):
+        config = engine_config(args)
+        config['whisper_cpu_profile'] = profile
+        started = time.perf_counter()
+        engine = STTEngine(model_config=args.model, lang=args.lang, engine_type='whisper', config=config)
+        load_time = time.perf_counter() - started
+
+        busy = 0.0
+        texts[profile] = {}
+        for path, transcript, elapsed in engine.transcribe_many(files):
+            texts[profile][path] = transcript.text
+            busy += elapsed
+        engine.release_resources()
+        rows.append((profile, load_time, busy, busy / total_audio if total_audio else 0.0))
+
+    def normalize(text):
+        return "".join(text.split())
+
+    errors = sum(distance(normalize(texts['fp32'][p]), normalize(texts['int8'][p])) for p in files)
+    chars = sum(len(normalize(texts['fp32'][p])) for p in files) or 1
+
+    logger.info(f"基准测试: {len(files)} 个文件，音频总时长 {ThroughputTracker.format_seconds(total_audio)}")
+    logger.info(f"{'profile':<8}{'加载(s)':>10}{'识别(s)':>10}{'RTF':>8}{'加速':>8}")
+    for profile, load_time, busy, rtf in rows:
+        speedup = rows[0][2] / busy if busy else 0.0
+        logger.info(f"{profile:<8}{load_time:>10.1f}{busy:>10.1f}{rtf:>8.3f}{speedup:>7.2f}x")
+    logger.info(f"int8相对fp32的字错误率(CER): {errors / chars * 100:.2f}%")
+    return 0
+
+
+def run(args) -> int:
+    files = collect_files(args.inputs)
+    if not files:
+        logger.error("没有找到音频文件")
+        return 1
+
+    if args.memory_budget is not None:
+        memory_budget.set_limit(int(args.memory_budget * 1024 ** 3) if args.memory_budget > 0 else None)
+
+    model_config = args.model
+    if args.engine in ('microsoft', 'tencent'):
+        with open(args.model, 'r', encoding='utf-8') as f:
+            model_config = json.load(f)
+    if args.benchmark:
+        return run_benchmark(args, files)
+
+    config = engine_config(args)
+    config['whisper_cpu_profile'] = 'int8' if args.whisper_int8 else 'fp32'
+    engine = STTEngine(model_config=model_config, lang=args.lang, engine_type=args.engine, config=config)
+    tracer.enable(bool(args.trace))
+
+    logger.info(f"正在读取 {len(files)} 个文件的时长...")
+    tracker = ThroughputTracker(AudioProbe.durations(files))
+    logger.info(f"共 {len(files)} 个文件，总时长 "
+                f"{ThroughputTracker.format_seconds(tracker.total_audio)}")
+
+    pending, copies = files, {}
+    if not args.no_dedup:
+        pending, copies = AudioDedup.group(files)
+        if copies:
+            logger.info(f"重复文件: {len(files) - len(pending)} 个与其他文件内容相同，只识别 {len(pending)} 个")
+    if not args.no_silence_check:
+        levels = AudioProbe.levels(pending, args.silence_threshold)
+        unique, pending = pending, [path for path in pending if not (levels[path] and levels[path]['silent'])]
+        for path in unique:
+            if levels[path] and levels[path]['silent']:
+                for silent_path in [path] + copies.get(path, []):
+                    logger.info(f"{os.path.basename(silent_path)} 静音，跳过识别 "
+                                f"(有声帧 {levels[path]['frame_db']:.1f} dBFS)")
+                    tracker.file_done(silent_path, 0.0, skipped=True)
+        if len(pending) < len(unique):
+            logger.info(f"静音预检: {len(unique) - len(pending)}/{len(unique)} 个文件未送入引擎")
+
+    results = []
+    saved = []  # 去重节省的识别时间（每个副本计一次原件的耗时）
+
+    def record(file_path, outcome, elapsed):
+        """记录阶段（persist线程）：整理一个文件的结果并输出进度，再复用到各副本"""
+        idx = tracker.done_files + 1
+        filename = os.path.basename(file_path)
+        result = None
+        try:
+            if args.split_channels:
+                channel_results = outcome
+                result = {'file': filename, 'text': STTEngine.format_channel_text(channel_results),
+                          'transcript': channel_results[0][1] if len(channel_results) == 1 else None}
+                if len(channel_results) > 1:
+                    result['channels'] = [
+                        {'speaker': speaker, 'text': t.text, 'transcript': t}
+                        for speaker, t in channel_results
+                    ]
+            else:
+                transcript = outcome
+                result = {'file': filename, 'text': transcript.text, 'transcript': transcript}
+
+            result['duration'] = result_duration(tracker, file_path)
+            if result['text']:
+                results.append(result)
+            else:
+                logger.warning(f"[{idx}/{len(files)}] {filename} 无转录结果")
+        except Exception as e:
+            logger.error(f"[{idx}/{len(files)}] {filename} 处理失败: {str(e)}")
+        finally:
+            tracker.file_done(file_path, elapsed, args.engine)
+
+        logger.info(f"[{idx}/{len(files)}] {filename} | {ThroughputTracker.format(tracker.snapshot())}")
+
+        for copy_path in copies.get(file_path, ()):
+            copy_name = os.path.basename(copy_path)
+            if result and result['text']:
+                results.append(dict(result, file=copy_name, duplicate_of=filename,
+                                    duration=result_duration(tracker, copy_path)))
+            saved.append(elapsed)
+            tracker.file_done(copy_path, 0.0, skipped=True)
+            logger.info(f"[{tracker.done_files}/{len(files)}] {copy_name} 与 {filename} 内容相同，复用识别结果")
+
+    # 读取/解码由引擎提前进行，结果记录在persist线程中，主线程只负责识别
+    with SinkStage(record) as sink:
+        for file_path, outcome, elapsed in iter_transcriptions(engine, pending, args.split_channels):
+            sink.put(file_path, outcome, elapsed)
+
+    if saved:
+        logger.info(f"去重: {len(saved)} 个重复文件复用识别结果，"
+                    f"节省识别时间 {ThroughputTracker.format_seconds(sum(saved))}")
+
+    save_transcripts(args.output, results)
+    logger.info(f"结果已保存: {args.output}")
+
+    if args.subtitles:
+        exported, skipped = export_subtitles(results, args.subtitle_dir, args.subtitles)
+        logger.info(f"字幕已导出 {len(exported)} 个，跳过 {len(skipped)} 个 -> {args.subtitle_dir}")
+
+    if args.trace:
+        tracer.export(args.trace)
+        for line in tracer.summary_lines():
+            logger.info(line)
+        logger.info(f"trace已保存: {args.trace}")
+
+    snapshot = tracker.snapshot()
+    logger.info(f"完成: {len(results)}/{len(files)} 成功，用时 "
+                f"{ThroughputTracker.format_seconds(snapshot['elapsed'])} | "
+                f"{ThroughputTracker.format(snapshot)}")
+    return 0 if results else 2
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        handlers=[
+            logging.FileHandler("audio_to_text.log", encoding="utf-8"),
+            logging.StreamHandler()
+        ]
+    )
+    args = build_parser().parse_args(argv)
+
+    profiler = RunProfiler.create(args.profile, args.profile_dir)
+    if profiler:
+        profiler.start()
+    try:
+        return run(args)
+    finally:
+        if profiler:
+            for line in profiler.stop():
+                logger.info(line)
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,6 +1,8 @@
+import os
 import matplotlib.pyplot as plt
 import numpy as np
 import soundfile as sf
+from utils.pcm_cache import PCMCache
 
 
 class AudioDebugger:
@@ -8,11 +10,15 @@ class AudioDebugger:
     def analyze_audio(audio_path: str):
         """音频分析工具"""
         try:
-            data, sample_rate = sf.read(audio_path)
+            info = sf.info(audio_path)
+            cache = PCMCache.instance()
+            samples = cache.load(audio_path)  # 16kHz单声道int16（np.memmap）
+            sample_rate = cache.sample_rate
 
-            # 绘制波形图
+            # 绘制波形图（长音频抽样绘制，避免整段拷贝）
+            step = max(1, len(samples) // 200000)
             plt.figure(figsize=(12, 4))
-            plt.plot(np.linspace(0, len(data) / sample_rate, len(data)), data)
+            plt.plot(np.arange(0, len(samples), step) / sample_rate, samples[::step] / 32768.0)
             plt.title(f"Audio Waveform: {os.path.basename(audio_path)}")
             plt.xlabel("Time (s)")
             plt.ylabel("Amplitude")
@@ -20,10 +26,10 @@ class AudioDebugger:
 
             # 打印关键信息
             print(f"\n🔍 音频分析报告:")
-            print(f"- 采样率: {sample_rate}Hz")
-            print(f"- 时长: {len(data) / sample_rate:.2f}秒")
-            print(f"- 声道数: {data.shape[1] if len(data.shape) > 1 else 1}")
-            print(f"- 最大振幅: {np.max(np.abs(data)):.2f}")
+            print(f"- 采样率: {info.samplerate}Hz")
+            print(f"- 时长: {len(samples) / sample_rate:.2f}秒")
+            print(f"- 声道数: {info.channels}")
+            print(f"- 最大振幅: {np.max(np.abs(samples.astype(np.int32))) / 32768.0:.2f}")
 
         except Exception as e:
             print(f"分析失败: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,222 @@
+import os
+import json
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from stt_engine import STTEngine
+from vosk_pool import DEFAULT_VOSK_WORKERS
+from memory_budget import memory_budget, MemoryBudgetExceeded
+from transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# 目录/文件名前缀 -> 语言代码（与模型配置中的lang一致）
+LANGUAGE_PREFIXES = {"CN": "zh", "ZH": "zh", "EN": "en"}
+
+
+def language_hint(rel_path: str) -> Optional[str]:
+    """
+    由相对路径推断语言：顶层目录名（CN/、EN/）或根目录文件名前缀（CN_、EN_）
+
+    与search_audio_files显示的前缀规则一致，但不回退到当前模型的语言。
+    """
+    parts = os.path.normpath(rel_path).split(os.sep)
+    if len(parts) > 1:
+        return LANGUAGE_PREFIXES.get(parts[0].upper())
+    head = parts[0].split("_", 1)[0].upper()
+    return LANGUAGE_PREFIXES.get(head) if "_" in parts[0] else None
+
+
+class LanguageRouter:
+    """
+    按语言分流识别
+
+    每个文件先按路径前缀确定语言，没有前缀时（若有可用的Whisper模型）对前30秒做语种识别，
+    仍无法确定的交给默认引擎。各语言组由各自常驻的独立引擎实例（STTEngine.create）
+    在独立线程中并发识别，引擎在多次运行之间保持加载；内存预算不足时空闲的分流引擎
+    可能被淘汰，下次用到时重新加载。
+    """
+
+    def __init__(self, models: Dict[str, Dict], engine_options: Optional[Dict] = None):
+        self.models = models
+        self.engine_options = dict(engine_options or {})
+        self._engines: Dict[str, STTEngine] = {}
+        self._lock = threading.Lock()
+
+    # ========== 模型选择 ==========
+
+    def pick_model(self, lang: str, preferred_engine: Optional[str] = None) -> Optional[str]:
+        """选择该语言的有效模型：优先专用模型，其次多语种Whisper；同等条件下优先当前引擎类型"""
+        candidates = [name for name, info in self.models.items()
+                      if info.get('valid', True) and info.get('lang') in (lang, 'multilingual')]
+        candidates.sort(key=lambda name: (self.models[name]['lang'] != lang,
+                                          self.models[name]['engine'] != preferred_engine))
+        return candidates[0] if candidates else None
+
+    def _detector_model(self) -> Optional[str]:
+        for name, info in self.models.items():
+            if info.get('valid', True) and info['engine'] == 'whisper':
+                return name
+        return None
+
+    def _share(self, groups: int) -> int:
+        """并发识别时每组分到的识别进程/线程数"""
+        return max(1, (os.cpu_count() or 1) // max(1, groups))
+
+    def engine_for(self, model_name: str, workers: Optional[int] = None) -> STTEngine:
+        """取得（必要时加载）某模型的常驻引擎（workers为分到的CPU份额，进程数不超过配置的上限）"""
+        with self._lock:
+            engine = self._engines.get(model_name)
+            if engine is None or engine.released:
+                info = self.models[model_name]
+                config = dict(self.engine_options)
+                if workers:
+                    config['vosk_workers'] = min(workers, int(config.get('vosk_workers') or DEFAULT_VOSK_WORKERS))
+                    config['vosk_threads'] = workers
+                if info.get('rss'):
+                    config['memory_estimate'] = info['rss']  # 模型清单中的实测值
+                if info['engine'] in ('microsoft', 'tencent'):
+                    with open(info['path'], 'r', encoding='utf-8') as f:
+                        model_config = json.load(f)
+                else:
+                    model_config = info['path']
+                logger.info(f"加载分流引擎: {model_name}")
+                engine = STTEngine.create(model_config=model_config, lang=info['lang'],
+                                          engine_type=info['engine'], config=config)
+                self._engines[model_name] = engine
+            memory_budget.touch(engine)
+            return engine
+
+    # ========== 分流 ==========
+
+    def route(self, files: List[str], root_folder: str, default_engine: STTEngine,
+              detect: bool = True) -> Dict[Optional[str], List[str]]:
+        """
+        按语言分组
+
+        Returns:
+            {语言代码: [文件路径]}，无法确定语言的文件在None组
+        """
+        groups: Dict[Optional[str], List[str]] = {}
+        unknown = []
+        for path in files:
+            lang = language_hint(os.path.relpath(path, root_folder)) if root_folder else None
+            if lang is None:
+                unknown.append(path)
+            else:
+                groups.setdefault(lang, []).append(path)
+
+        detector = None
+        if detect and unknown:
+            if default_engine.engine_type == 'whisper':
+                detector = default_engine
+            elif self._detector_model():
+                detector = self.engine_for(self._detector_model())
+        if detector:
+            for path in unknown:
+                try:
+                    lang = detector.detect_language(path)
+                except Exception as e:
+                    logger.warning(f"语种识别失败 {os.path.basename(path)}: {str(e)}")
+                    lang = None
+                groups.setdefault(lang, []).append(path)
+        elif unknown:
+            groups.setdefault(None, []).extend(unknown)
+        return groups
+
+    def assign_engines(self, groups: Dict[Optional[str], List[str]],
+                       default_engine: STTEngine) -> List[Tuple[str, STTEngine, List[str]]]:
+        """为每个语言组选定引擎：[(标签, 引擎, 文件列表)]"""
+        workers = self._share(len(groups))
+        plan = []
+        for lang, paths in groups.items():
+            model_name = None
+            if lang is not None and lang != default_engine.lang:
+                model_name = self.pick_model(lang, default_engine.engine_type)
+                if model_name and self.models[model_name]['path'] == default_engine.model_config:
+                    model_name = None  # 选中的就是当前模型（如多语种Whisper）
+                elif model_name is None:
+                    logger.warning(f"没有 {lang} 语言的可用模型，{len(paths)} 个文件使用默认引擎")
+            engine = None
+            if model_name:
+                try:
+                    engine = self.engine_for(model_name, workers)
+                except MemoryBudgetExceeded as e:
+                    logger.warning(f"{str(e)}，{len(paths)} 个文件使用默认引擎")
+            if engine is not None:
+                plan.append((model_name, engine, paths))
+            else:
+                plan.append((f"默认/{default_engine.lang}", default_engine, paths))
+
+        # 同一引擎的多个组合并，避免同一模型并发两份
+        merged: Dict[int, Tuple[str, STTEngine, List[str]]] = {}
+        for label, engine, paths in plan:
+            if id(engine) in merged:
+                merged[id(engine)][2].extend(paths)
+            else:
+                merged[id(engine)] = (label, engine, list(paths))
+        return list(merged.values())
+
+    def transcribe_many(self, plan: List[Tuple[str, STTEngine, List[str]]],
+                        on_error: Optional[Callable[[str, Exception], None]] = None
+                        ) -> Iterator[Tuple[str, Transcript, float]]:
+        """
+        各组在独立线程中并发识别，按完成顺序产出(路径, Transcript, 识别耗时)
+
+        每组（包括默认引擎）同时在识别的文件数按CPU核数平分。
+        停止迭代（close）时各组在当前文件完成后退出。
+        """
+        workers = self._share(len(plan))
+        outputs = queue.Queue(maxsize=64)
+        stop = threading.Event()
+        done = object()
+
+        def run_group(label: str, engine: STTEngine, paths: List[str]):
+            items = engine.transcribe_many(paths, workers)
+            try:
+                for item in items:
+                    if stop.is_set():
+                        break
+                    outputs.put(item)
+            except Exception as e:
+                logger.error(f"分流组 {label} 识别失败: {str(e)}", exc_info=True)
+                if on_error:
+                    on_error(label, e)
+            finally:
+                items.close()
+                outputs.put(done)
+
+        threads = [threading.Thread(target=run_group, args=group, name=f"route-{group[0]}", daemon=True)
+                   for group in plan]
+        for _, engine, _ in plan:
+            memory_budget.pin(engine)  # 识别期间不被淘汰
+        for thread in threads:
+            thread.start()
+
+        try:
+            remaining = len(threads)
+            while remaining:
+                item = outputs.get()
+                if item is done:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            stop.set()
+            # 清空队列，避免工作线程阻塞在put上
+            while any(t.is_alive() for t in threads):
+                try:
+                    outputs.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            for _, engine, _ in plan:
+                memory_budget.unpin(engine)
+
+    def close(self):
+        """释放所有常驻的分流引擎"""
+        with self._lock:
+            for engine in self._engines.values():
+                engine.release_resources()
+            self._engines.clear()
@@ -0,0 +1,113 @@
+"""
+本地假对象存储服务（用于在无云端环境下调试腾讯云URL方式）
+
+支持PUT上传、GET/HEAD下载、DELETE删除，对象保存在临时目录，收发都按块流式进行。
+配合腾讯云配置中的 "stager": {"type": "put", "upload_url": "http://127.0.0.1:9000/asr-staging"} 使用。
+
+用法: python fake_storage_server.py [端口] [存储目录]
+"""
+import os
+import sys
+import shutil
+import logging
+import tempfile
+from typing import Optional
+
+from utils.audio_stager import COPY_BUFFER, _FileRequestHandler, _StagingServer
+
+
+class _StorageRequestHandler(_FileRequestHandler):
+    """
+    在只读文件服务上增加PUT/DELETE
+
+    对象按名称直接映射到server.root下的文件，上传记录保存在server.objects（{本地路径: 字节数}），
+    不使用暂存服务的server.files（{对象名: 本地路径}）。
+    """
+
+    def _object_path(self) -> str:
+        key = self.path.split('?', 1)[0].lstrip('/')
+        path = os.path.normpath(os.path.join(self.server.root, *key.split('/')))
+        if os.path.commonpath([path, self.server.root]) != self.server.root:
+            raise PermissionError(f"越界的对象名: {key}")
+        return path
+
+    def _checked_path(self) -> Optional[str]:
+        """对象的本地路径；越界的对象名回复403并返回None"""
+        try:
+            return self._object_path()
+        except PermissionError as e:
+            self.log_message("%s", str(e))
+            self.send_error(403)
+            return None
+
+    def _lookup(self):
+        return self._object_path()
+
+    def _send_file(self, with_body: bool):
+        if self._checked_path() is not None:
+            super()._send_file(with_body)
+
+    def do_PUT(self):
+        length = int(self.headers.get("Content-Length", 0))
+        path = self._checked_path()
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            remaining = length
+            while remaining > 0:
+                chunk = self.rfile.read(min(COPY_BUFFER, remaining))
+                if not chunk:
+                    break
+                f.write(chunk)
+                remaining -= len(chunk)
+        self.server.objects[path] = length
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_DELETE(self):
+        path = self._checked_path()
+        if path is None:
+            return
+        if os.path.isfile(path):
+            os.remove(path)
+        self.server.objects.pop(path, None)
+        self.send_response(204)
+        self.end_headers()
+
+
+class FakeObjectStorage:
+    """在后台线程中运行的假对象存储"""
+
+    def __init__(self, port: int = 0, root: str = None, bind: str = "127.0.0.1"):
+        self._server = _StagingServer((bind, port), _StorageRequestHandler)
+        self._server.root = root or tempfile.mkdtemp(prefix="fake_storage_")
+        self._server.objects = {}
+        self._server.start()
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+        self.root = self._server.root
+
+    @property
+    def objects(self):
+        """当前保存的对象 {本地路径: 字节数}"""
+        return dict(self._server.objects)
+
+    def close(self, remove: bool = True):
+        self._server.shutdown()
+        self._server.server_close()
+        if remove:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    storage = FakeObjectStorage(port, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"假对象存储已启动: {storage.url} | 目录: {storage.root}")
+    print(f"腾讯云配置: \"stager\": {{\"type\": \"put\", \"upload_url\": \"{storage.url}/asr-staging\"}}")
+    try:
+        input("按回车键停止...\n")
+    finally:
+        storage.close(remove=False)
@@ -0,0 +1,212 @@
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, Dict, List, Sequence, Set, Tuple
+
+FRAME_INTERVAL_MS = 16  # 状态刷新合并到下一帧
+
+
+class VirtualFileList(ttk.Frame):
+    """
+    虚拟化文件列表
+
+    Treeview只保留固定数量的可见行，滚动时把数据重新绑定到这些行上，
+    数据量再大也只渲染一屏。文件名 -> 行号 的索引使状态更新为O(1)，
+    多次更新合并到下一帧统一重绘。选择状态保存在数据层，接口与Listbox的
+    curselection()保持一致。
+    """
+
+    def __init__(self, master, height: int = 8, **kwargs):
+        super().__init__(master, **kwargs)
+        self._names: List[str] = []
+        self._status: List[str] = []
+        self._index: Dict[str, List[int]] = {}  # 文件名 -> 行号（不同子目录可能重名）
+        self._selected: Set[int] = set()
+        self._anchor = None
+        self._top = 0
+        self._rows = height
+        self._render_pending = False
+
+        self.tree = ttk.Treeview(self, columns=("name", "status"), show="headings",
+                                 height=height, selectmode="none")
+        self.tree.heading("name", text="文件")
+        self.tree.heading("status", text="状态")
+        self.tree.column("name", width=700, anchor=tk.W)
+        self.tree.column("status", width=100, anchor=tk.CENTER, stretch=False)
+        self.tree.tag_configure("selected", background="#cce8ff")
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        for i in range(height):
+            self.tree.insert("", tk.END, iid=f"row{i}", values=("", ""))
+
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<B1-Motion>", self._on_drag)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+        self.tree.bind("<Control-a>", lambda e: self.select_all())
+        self.tree.bind("<Up>", lambda e: self._move_cursor(-1))
+        self.tree.bind("<Down>", lambda e: self._move_cursor(1))
+
+    # ========== 数据接口 ==========
+
+    def set_items(self, items: Sequence[Tuple[str, str]], status_of: Callable[[str], str] = lambda key: ""):
+        """
+        替换全部数据
+
+        Args:
+            items: [(文件名键, 显示名称), ...]
+            status_of: 文件名键 -> 状态文本
+        """
+        self._names = [name for _, name in items]
+        self._status = [status_of(key) for key, _ in items]
+        self._index = {}
+        for row, (key, _) in enumerate(items):
+            self._index.setdefault(key, []).append(row)
+        self._selected.clear()
+        self._anchor = None
+        self._top = 0
+        self._schedule_render()
+
+    def set_status(self, key: str, status: str):
+        """更新单个文件的状态（O(1)，下一帧统一重绘）"""
+        rows = self._index.get(key)
+        if not rows:
+            return
+        for row in rows:
+            self._status[row] = status
+        self._schedule_render()
+
+    def set_all_status(self, status: str = ""):
+        """重置所有行的状态"""
+        self._status = [status] * len(self._names)
+        self._schedule_render()
+
+    def size(self) -> int:
+        return len(self._names)
+
+    def curselection(self) -> Tuple[int, ...]:
+        """与Listbox.curselection()一致：返回选中行号（升序）"""
+        return tuple(sorted(self._selected))
+
+    def select_all(self):
+        self._selected = set(range(len(self._names)))
+        self._schedule_render()
+        return "break"
+
+    def selection_clear(self):
+        self._selected.clear()
+        self._schedule_render()
+
+    # ========== 渲染 ==========
+
+    def _schedule_render(self):
+        if not self._render_pending:
+            self._render_pending = True
+            self.after(FRAME_INTERVAL_MS, self._render)
+
+    def _render(self):
+        """只刷新可见的几行"""
+        self._render_pending = False
+        total = len(self._names)
+        self._top = max(0, min(self._top, total - self._rows))
+
+        for i in range(self._rows):
+            row = self._top + i
+            if row < total:
+                tags = ("selected",) if row in self._selected else ()
+                self.tree.item(f"row{i}", values=(self._names[row], self._status[row]), tags=tags)
+            else:
+                self.tree.item(f"row{i}", values=("", ""), tags=())
+
+        if total > self._rows:
+            self.scrollbar.set(self._top / total, (self._top + self._rows) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ========== 滚动 ==========
+
+    def scroll(self, delta_rows: int):
+        self._top = max(0, min(self._top + delta_rows, len(self._names) - self._rows))
+        self._render()
+
+    def see(self, row: int):
+        if row < self._top:
+            self.scroll(row - self._top)
+        elif row >= self._top + self._rows:
+            self.scroll(row - self._top - self._rows + 1)
+
+    def _on_scrollbar(self, *args):
+        total = len(self._names)
+        if args[0] == "moveto":
+            self._top = int(float(args[1]) * total)
+            self.scroll(0)
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self._rows if args[2] == "pages" else 1)
+            self.scroll(step)
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    # ========== 选择 ==========
+
+    def _row_at(self, y: int):
+        iid = self.tree.identify_row(y)
+        if not iid:
+            return None
+        row = self._top + int(iid[3:])
+        return row if row < len(self._names) else None
+
+    def _on_click(self, event):
+        if self.tree.identify_region(event.x, event.y) == "heading":
+            return None
+        self.tree.focus_set()
+        row = self._row_at(event.y)
+        if row is None:
+            return "break"
+
+        ctrl = event.state & 0x0004
+        shift = event.state & 0x0001
+        if shift and self._anchor is not None:
+            low, high = sorted((self._anchor, row))
+            self._selected = set(range(low, high + 1))
+        elif ctrl:
+            self._selected.symmetric_difference_update({row})
+            self._anchor = row
+        else:
+            self._selected = {row}
+            self._anchor = row
+        self._render()
+        return "break"
+
+    def _on_drag(self, event):
+        """拖动框选，越过边缘时自动滚动"""
+        if self._anchor is None:
+            return "break"
+        if event.y < 0:
+            self.scroll(-1)
+            row = self._top
+        elif event.y > self.tree.winfo_height():
+            self.scroll(1)
+            row = min(len(self._names) - 1, self._top + self._rows - 1)
+        else:
+            row = self._row_at(event.y)
+        if row is not None:
+            low, high = sorted((self._anchor, row))
+            self._selected = set(range(low, high + 1))
+            self._render()
+        return "break"
+
+    def _move_cursor(self, step: int):
+        if not self._names:
+            return "break"
+        current = self._anchor if self._anchor is not None else self._top - step
+        row = max(0, min(len(self._names) - 1, current + step))
+        self._selected = {row}
+        self._anchor = row
+        self.see(row)
+        self._render()
+        return "break"
@@ -0,0 +1,249 @@
+import os
+import logging
+import tkinter as tk
+from tkinter import ttk
+import tkinter.scrolledtext as scrolledtext
+from collections import deque
+from typing import Iterable, List, Tuple
+
+DEFAULT_MAX_LINES = 5000
+HISTORY_PAGE_LINES = 1000
+READ_BLOCK_SIZE = 64 * 1024
+
+LEVEL_NAMES = ["DEBUG", "INFO", "WARNING", "ERROR"]
+LEVEL_COLORS = {"DEBUG": "gray", "WARNING": "#b36b00", "ERROR": "red"}
+
+
+def _level_tag(level: int) -> str:
+    """把logging级别归并到四个显示级别"""
+    if level >= logging.ERROR:
+        return "ERROR"
+    if level >= logging.WARNING:
+        return "WARNING"
+    if level >= logging.INFO:
+        return "INFO"
+    return "DEBUG"
+
+
+def _parse_file_level(line: str) -> str:
+    """从日志文件行（'时间 - 级别 - 消息'）中识别级别"""
+    for name in ("ERROR", "CRITICAL", "WARNING", "DEBUG"):
+        if f" - {name} - " in line:
+            return "ERROR" if name == "CRITICAL" else name
+    return "INFO"
+
+
+def read_lines_before(path: str, end_offset: int, max_lines: int) -> Tuple[int, List[str]]:
+    """
+    从文件end_offset处向前读取最多max_lines行
+
+    Returns:
+        (这些行的起始偏移, 行列表)
+    """
+    if max_lines <= 0:
+        return end_offset, []
+    with open(path, 'rb') as f:
+        pos = end_offset
+        buffer = b""
+        while pos > 0 and buffer.count(b"\n") <= max_lines:
+            size = min(READ_BLOCK_SIZE, pos)
+            pos -= size
+            f.seek(pos)
+            buffer = f.read(size) + buffer
+
+    lines = buffer.split(b"\n")
+    if pos > 0:
+        # 第一段可能是被截断的半行，留给下一页
+        pos += len(lines[0]) + 1
+        lines = lines[1:]
+    if lines and lines[-1] == b"":
+        lines = lines[:-1]
+    if len(lines) > max_lines:
+        skipped = lines[:-max_lines]
+        pos += sum(len(line) + 1 for line in skipped)
+        lines = lines[-max_lines:]
+
+    return pos, [line.decode('utf-8', errors='replace').rstrip("\r") for line in lines]
+
+
+def skip_lines(path: str, offset: int, count: int) -> int:
+    """从文件offset处向后跳过count行，返回下一行的起始偏移"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        while count > 0:
+            block = f.read(READ_BLOCK_SIZE)
+            if not block:
+                break
+            found = block.count(b"\n")
+            if found < count:
+                count -= found
+                offset += len(block)
+                continue
+            index = -1
+            for _ in range(count):
+                index = block.index(b"\n", index + 1)
+            return offset + index + 1
+    return offset
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+class LogViewer(ttk.Frame):
+    """
+    有界日志面板
+
+    界面只保留最近max_lines行（环形缓冲），超出部分从文本框头部批量删除；
+    更早的记录按需从日志文件分页读取。级别过滤通过Text标签的elide属性实现，
+    搜索使用Text.search逐个定位，二者都不需要重绘整个控件。
+
+    面板中的行与日志文件的行并非一一对应（文件中还有其他模块的记录、多行消息等），
+    因此按块记录每段内容在文件中的起始偏移：追加的一批行以追加前的文件大小为起点，
+    从文件读入的历史行偏移精确。加载更早记录时从最旧一块的偏移向前读取。
+    """
+
+    def __init__(self, master, log_file: str = "audio_to_text.log",
+                 max_lines: int = DEFAULT_MAX_LINES, height: int = 15, **kwargs):
+        super().__init__(master, **kwargs)
+        self.log_file = log_file
+        self.max_lines = max_lines
+        self._line_count = 0
+        # 面板中自上而下的各块: [文件起始偏移, 行数, 是否与文件逐行对应]
+        self._blocks = deque()
+        self._file_end = _file_size(log_file)  # 上次追加时的文件大小，之前的内容都算作更早记录
+        self._search_index = "1.0"
+
+        # 工具栏
+        toolbar = ttk.Frame(self)
+        toolbar.pack(fill=tk.X, padx=5, pady=(5, 0))
+
+        ttk.Label(toolbar, text="级别:").pack(side=tk.LEFT)
+        self.level_var = tk.StringVar(value="INFO")
+        level_combo = ttk.Combobox(toolbar, textvariable=self.level_var, values=LEVEL_NAMES,
+                                   width=9, state="readonly")
+        level_combo.pack(side=tk.LEFT, padx=5)
+        level_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_level_filter())
+
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(toolbar, textvariable=self.search_var, width=30)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind("<Return>", lambda e: self.find_next())
+        ttk.Button(toolbar, text="查找", command=self.find_next).pack(side=tk.LEFT)
+
+        ttk.Button(toolbar, text="加载更早记录", command=self.load_older).pack(side=tk.RIGHT)
+
+        self.text = scrolledtext.ScrolledText(self, height=height)
+        self.text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        for name, color in LEVEL_COLORS.items():
+            self.text.tag_configure(name, foreground=color)
+        self.text.tag_configure("history", background="#f2f2f2")
+        self.text.tag_configure("match", background="yellow")
+        self.text.config(state=tk.DISABLED)
+
+        self.apply_level_filter()
+
+    # ========== 追加 ==========
+
+    def append(self, lines: Iterable[Tuple[int, str]]):
+        """追加一批(级别, 文本)，超出上限时从头部整体删除"""
+        self.text.config(state=tk.NORMAL)
+        added = 0
+        for level, line in lines:
+            self.text.insert(tk.END, line + "\n", _level_tag(level))
+            added += line.count("\n") + 1
+
+        if added:
+            self._blocks.append([self._file_end, added, False])
+        self._file_end = _file_size(self.log_file)
+
+        self._line_count += added
+        excess = self._line_count - self.max_lines
+        if excess > 0:
+            self.text.delete("1.0", f"{excess + 1}.0")
+            self._line_count -= excess
+            self._drop_blocks(excess)
+
+        self.text.see(tk.END)
+        self.text.config(state=tk.DISABLED)
+
+    def clear(self):
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.config(state=tk.DISABLED)
+        self._line_count = 0
+        self._blocks.clear()
+        self._file_end = _file_size(self.log_file)
+        self._search_index = "1.0"
+
+    def _drop_blocks(self, count: int):
+        """头部删除count行后更新各块的偏移"""
+        while count > 0 and self._blocks:
+            block = self._blocks[0]
+            if block[1] <= count:
+                count -= block[1]
+                self._blocks.popleft()
+                continue
+            if block[2]:
+                # 历史行与文件逐行对应，可精确前移
+                block[0] = skip_lines(self.log_file, block[0], count)
+            else:
+                # 追加的行无法定位到文件行，改以该块的结束位置为界（宁可重复显示也不遗漏）
+                block[0] = self._blocks[1][0] if len(self._blocks) > 1 else self._file_end
+            block[1] -= count
+            count = 0
+
+    # ========== 历史 ==========
+
+    def load_older(self):
+        """从面板最旧一行在日志文件中的偏移处向前读取一页，插入到顶部"""
+        if not os.path.exists(self.log_file):
+            return
+
+        end = self._blocks[0][0] if self._blocks else self._file_end
+        if end <= 0:
+            return
+
+        start, lines = read_lines_before(self.log_file, end, HISTORY_PAGE_LINES)
+        if not lines:
+            return
+
+        self.text.config(state=tk.NORMAL)
+        for line in reversed(lines):
+            self.text.insert("1.0", line + "\n", (_parse_file_level(line), "history"))
+        self.text.config(state=tk.DISABLED)
+        self.text.see("1.0")
+
+        self._line_count += len(lines)
+        self._blocks.appendleft([start, len(lines), True])
+
+    # ========== 过滤与搜索 ==========
+
+    def apply_level_filter(self):
+        """隐藏低于所选级别的行（只修改标签属性）"""
+        threshold = LEVEL_NAMES.index(self.level_var.get())
+        for index, name in enumerate(LEVEL_NAMES):
+            self.text.tag_configure(name, elide=index < threshold)
+
+    def find_next(self):
+        """从上次位置向后查找，命中后高亮并滚动到该处"""
+        pattern = self.search_var.get()
+        self.text.tag_remove("match", "1.0", tk.END)
+        if not pattern:
+            return
+
+        count = tk.IntVar()
+        pos = self.text.search(pattern, self._search_index, stopindex=tk.END, nocase=True, count=count)
+        if not pos and self._search_index != "1.0":
+            pos = self.text.search(pattern, "1.0", stopindex=tk.END, nocase=True, count=count)
+        if not pos:
+            self.bell()
+            return
+
+        end = f"{pos}+{count.get()}c"
+        self.text.tag_add("match", pos, end)
+        self.text.see(pos)
+        self._search_index = end
@@ -1,10 +1,27 @@
 import os
 import threading
+import multiprocessing
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk, StringVar, IntVar, DoubleVar, simpledialog
-import tkinter.scrolledtext as scrolledtext
 import logging
-from stt_engine import STTEngine
+from stt_engine import STTEngine, WHISPER_DECODING_PROFILES
+from engine_router import LanguageRouter
+from model_loader import ModelLoader
+from memory_budget import memory_budget, MemoryBudgetExceeded
+from utils.pcm_cache import PCMCache
+from transcript import save_transcripts
+from subtitle_export import export_subtitles
+from file_list_view import VirtualFileList
+from ui_events import UIEventQueue
+from log_viewer import LogViewer
+from progress_stats import ThroughputTracker
+from utils.audio_probe import AudioProbe, SILENCE_THRESHOLD_DB
+from utils.model_manifest import ModelManifest
+from utils.process_memory import format_bytes
+from utils.pipeline import SinkStage
+from utils.dedup import AudioDedup
+from tracing import tracer
+from profiling import RunProfiler
 import sys
 import openpyxl
 from openpyxl.styles import Font
@@ -19,6 +36,9 @@ import re
 class AudioToTextTool:
     """音频转文本GUI工具"""
 
+    # 性能分析选项 -> RunProfiler模式
+    PROFILE_OPTIONS = {"关闭": None, "采样": "sample", "cProfile": "cprofile"}
+
     def load_presets_from_file(self):
         """加载预设文件（自动处理损坏情况）"""
         self.presets = {}  # 重置内存中的预设
@@ -61,6 +81,9 @@ class AudioToTextTool:
         self.root.geometry("1920x1080")
         self.root.iconbitmap(self.resource_path("icon.ico")) if os.path.exists("icon.ico") else None
 
+        # 界面事件通道：工作线程只入队，主线程按帧合并刷新
+        self.ui_events = UIEventQueue(self.root)
+
         # === 关键修复：确保presets在create_widgets之前初始化 ===
         self.preset_file = "audio_to_text_presets.json"
         self.presets = {}
@@ -95,12 +118,33 @@ class AudioToTextTool:
         self.models = {}
         self.model_languages = {}
         self.stt_engine = None  # 初始化为None，不立即加载
+        self.split_channels_var = tk.BooleanVar(value=False)  # 按声道拆分识别（坐席/客户分轨）
+        self.trace_var = tk.BooleanVar(value=False)  # 记录各阶段耗时并导出trace
+        self.profile_var = tk.StringVar(value="关闭")  # 性能分析模式
+        self.whisper_int8_var = tk.BooleanVar(value=False)  # Whisper CPU推理使用int8量化
+        self.whisper_profile_var = tk.StringVar(value="默认")  # Whisper解码策略
+        self.whisper_language_var = tk.StringVar(value="自动")  # Whisper固定语言
+        self.route_language_var = tk.BooleanVar(value=False)  # 按CN/EN前缀或语种识别分流到对应模型
+        self.language_router = None  # 分流用的常驻引擎
+        self.model_state_var = tk.StringVar(value="未加载")  # 模型加载进度
+        self.memory_usage_var = tk.StringVar(value=memory_budget.format())  # 已加载模型的内存占用
+        default_budget = memory_budget.limit / 1024 ** 3 if memory_budget.limit else 0
+        self.memory_budget_var = tk.DoubleVar(value=round(default_budget, 1))  # 模型内存上限（GB，0为不限）
+        self.silence_check_var = tk.BooleanVar(value=True)  # 识别前剔除静音文件
+        self.silence_threshold_var = tk.DoubleVar(value=SILENCE_THRESHOLD_DB)  # 静音阈值(dBFS)
+        self.file_levels = {}  # 文件名 -> 静音预检的电平统计（silent为True的文件未送入引擎）
+        self.dedup_var = tk.BooleanVar(value=True)  # 内容相同的文件只识别一次
+        self.duplicates = {}  # 副本文件名 -> 原件文件名（复用原件的识别结果）
+        self.dedup_saved = 0.0  # 去重节省的识别时间（秒）
+        self.model_loader = ModelLoader(self.ui_events)  # 后台加载与预热
+        self._pending_start = False  # 模型加载完成后自动开始处理
 
         # ... 其他初始化代码 ...
         self.log_dir = "recognition_logs"
         os.makedirs(self.log_dir, exist_ok=True)
 
-        # 1. 仅扫描模型（不加载）
+        # 1. 仅扫描模型（不加载），结果缓存在模型清单中
+        self.model_manifest = ModelManifest("models")
         self.scan_models_lightweight()
 
         # 2. 如果有模型，设置默认选择但不加载
@@ -116,86 +160,43 @@ class AudioToTextTool:
         # 创建界面
         self.create_widgets()
 
-    def scan_models_lightweight(self):
-        """轻量级模型扫描，只验证基本文件结构不加载模型"""
-        models_dir = "models"
-        self.models = {}  # 结构: { "显示名称": { "path": 路径, "engine": 类型, "lang": 语言, "valid": 是否有效 } }
-        self.model_languages = {}
-
-        if not os.path.exists(models_dir):
-            self.log(f"⚠️ 模型目录不存在: {models_dir}", logging.WARNING)
-            return
+        # 界面创建完成后再开始处理事件（启动阶段的日志会在第一帧统一显示）
+        self.ui_events.on_log = self._append_log_lines
+        self.ui_events.on_progress = self._update_progress
+        self.ui_events.on_status = self.status_var.set
+        self.ui_events.on_file_status = self._update_file_statuses
+        self.ui_events.start()
+        memory_budget.on_change = lambda: self.ui_events.call(self._refresh_memory_usage)
 
-        MODEL_CONFIG = {
-            'CN': {'engine': 'vosk', 'lang': 'zh'},
-            'EN': {'engine': 'vosk', 'lang': 'en'},
-            'WHISPER': {'engine': 'whisper', 'lang': 'multilingual'},
-            'MICROSOFT': {'engine': 'microsoft', 'config_file': True},
-            'TENCENT': {'engine': 'tencent', 'config_file': True}
-        }
+        # 后台预加载最近使用的预设中的模型
+        self._preload_last_preset()
 
-        for lang_dir in os.listdir(models_dir):
-            lang_path = os.path.abspath(os.path.join(models_dir, lang_dir))
-            lang_key = lang_dir.upper()
+    def scan_models_lightweight(self, force=False):
+        """
+        轻量级模型扫描，只验证基本文件结构不加载模型
 
-            if not os.path.isdir(lang_path) or lang_key not in MODEL_CONFIG:
-                continue
+        扫描结果持久化在模型清单中，目录未变化时不遍历models/（见ModelManifest）。
+        """
+        self.models = {}  # 结构: { "显示名称": { "path": 路径, "engine": 类型, "lang": 语言, "valid": 是否有效, ... } }
+        self.model_languages = {}
 
-            config = MODEL_CONFIG[lang_key]
-
-            # 云服务配置验证
-            if config.get('config_file'):
-                for config_file in os.listdir(lang_path):
-                    if not config_file.lower().endswith('.json'):
-                        continue
-
-                    config_path = os.path.join(lang_path, config_file)
-                    display_name = f"{lang_dir.title()}/{os.path.splitext(config_file)[0]}"
-                    is_valid = False
-
-                    try:
-                        # 仅验证配置文件是否存在，不加载内容
-                        if os.path.exists(config_path):
-                            is_valid = True
-                    except Exception as e:
-                        self.log(f"❌ 配置文件验证失败 {config_file}: {str(e)}", logging.ERROR)
-
-                    self.models[display_name] = {
-                        'path': config_path,
-                        'engine': config['engine'],
-                        'lang': config.get('lang', 'zh'),
-                        'valid': is_valid,
-                        'loaded': False
-                    }
-                    self.model_languages[display_name] = config.get('lang', 'zh')
-                continue
+        if not os.path.exists(self.model_manifest.models_dir):
+            self.log(f"⚠️ 模型目录不存在: {self.model_manifest.models_dir}", logging.WARNING)
+            return
 
-            # 本地模型验证
-            for model_name in os.listdir(lang_path):
-                model_path = os.path.join(lang_path, model_name)
-                display_name = f"{lang_dir}/{model_name}"
-                is_valid = False
-
-                # 快速验证文件/目录是否存在
-                if config['engine'] == 'vosk':
-                    is_valid = os.path.isdir(model_path)
-                elif config['engine'] == 'whisper':
-                    is_valid = os.path.exists(model_path)
-
-                self.models[display_name] = {
-                    'path': model_path,
-                    'engine': config['engine'],
-                    'lang': config.get('lang', 'zh'),
-                    'valid': is_valid,
-                    'loaded': False
-                }
-                self.model_languages[display_name] = config.get('lang', 'zh')
+        start_time = time.perf_counter()
+        for display_name, entry in self.model_manifest.scan(force=force).items():
+            self.models[display_name] = dict(entry, loaded=False)
+            self.model_languages[display_name] = entry['lang']
 
         if not self.models:
             self.log("⚠️ 未找到任何模型", logging.WARNING)
         else:
             valid_count = sum(1 for m in self.models.values() if m['valid'])
-            self.log(f"模型扫描完成，共找到 {len(self.models)} 个模型 ({valid_count} 个有效)")
+            stats = self.model_manifest.last_scan
+            self.log(f"模型扫描完成，共找到 {len(self.models)} 个模型 ({valid_count} 个有效)，"
+                     f"清单复用 {stats['reused']} 个 / 重新扫描 {stats['rescanned']} 个，"
+                     f"耗时 {time.perf_counter() - start_time:.2f}s")
 
     def _initialize_variables(self):
         """初始化所有核心属性"""
@@ -291,101 +292,8 @@ class AudioToTextTool:
         return os.path.join(base_path, relative_path)
 
     def scan_models(self):
-        """仅扫描模型目录，验证文件完整性，但不加载模型"""
-        models_dir = "models"
-        self.models = {}  # 结构: { "显示名称": { "path": 路径, "engine": 类型, "lang": 语言, "valid": 是否有效 } }
-        self.model_languages = {}
-
-        if not os.path.exists(models_dir):
-            self.log(f"⚠️ 模型目录不存在: {models_dir}", logging.WARNING)
-            return
-
-        MODEL_CONFIG = {
-            'CN': {'engine': 'vosk', 'lang': 'zh'},
-            'EN': {'engine': 'vosk', 'lang': 'en'},
-            'WHISPER': {'engine': 'whisper', 'lang': 'multilingual'},
-            'MICROSOFT': {'engine': 'microsoft', 'config_file': True},
-            'TENCENT': {'engine': 'tencent', 'config_file': True}
-        }
-
-        for lang_dir in os.listdir(models_dir):
-            lang_path = os.path.abspath(os.path.join(models_dir, lang_dir))
-            lang_key = lang_dir.upper()
-
-            if not os.path.isdir(lang_path) or lang_key not in MODEL_CONFIG:
-                continue
-
-            config = MODEL_CONFIG[lang_key]
-
-            # 云服务配置验证
-            if config.get('config_file'):
-                for config_file in os.listdir(lang_path):
-                    if not config_file.lower().endswith('.json'):
-                        continue
-
-                    config_path = os.path.join(lang_path, config_file)
-                    display_name = f"{lang_dir.title()}/{os.path.splitext(config_file)[0]}"
-                    is_valid = False
-
-                    try:
-                        # 仅验证配置文件完整性，不加载
-                        with open(config_path, 'r', encoding='utf-8') as f:
-                            config_data = json.load(f)
-
-                        required_fields = {
-                            'microsoft': ['api_key', 'region'],
-                            'tencent': ['secret_id', 'secret_key']
-                        }[config['engine']]
-
-                        is_valid = all(k in config_data for k in required_fields)
-                    except Exception as e:
-                        self.log(f"❌ 配置文件验证失败 {config_file}: {str(e)}", logging.ERROR)
-                        is_valid = False
-
-                    self.models[display_name] = {
-                        'path': config_path,
-                        'engine': config['engine'],
-                        'lang': config_data.get('language', 'zh') if is_valid else 'zh',
-                        'valid': is_valid,
-                        'loaded': False  # 标记是否已加载
-                    }
-                    self.model_languages[display_name] = config_data.get('language', 'zh') if is_valid else 'zh'
-                continue
-
-            # 本地模型验证
-            for model_name in os.listdir(lang_path):
-                model_path = os.path.join(lang_path, model_name)
-                display_name = f"{lang_dir}/{model_name}"
-                is_valid = False
-
-                # Vosk模型验证
-                if config['engine'] == 'vosk':
-                    is_valid = os.path.isdir(model_path) and any(
-                        f.endswith('.mfcc') or f.endswith('.dic')
-                        for f in os.listdir(model_path)
-                    )
-
-                # Whisper模型验证
-                elif config['engine'] == 'whisper':
-                    is_valid = (
-                            os.path.isdir(model_path) or
-                            (os.path.isfile(model_path) and model_name.endswith('.pt'))
-                    )
-
-                self.models[display_name] = {
-                    'path': model_path,
-                    'engine': config['engine'],
-                    'lang': config['lang'],
-                    'valid': is_valid,
-                    'loaded': False  # 标记是否已加载
-                }
-                self.model_languages[display_name] = config['lang']
-
-        if not self.models:
-            self.log("⚠️ 未找到任何有效模型", logging.WARNING)
-        else:
-            valid_count = sum(1 for m in self.models.values() if m['valid'])
-            self.log(f"模型扫描完成，共找到 {len(self.models)} 个模型 ({valid_count} 个有效)")
+        """忽略模型清单缓存，完整重新扫描模型目录"""
+        self.scan_models_lightweight(force=True)
 
     def create_widgets(self):
         # 主框架
@@ -411,20 +319,9 @@ class AudioToTextTool:
         list_frame = ttk.Frame(file_frame)
         list_frame.grid(row=1, column=0, columnspan=4, padx=5, pady=5, sticky=tk.EW)
 
-        # 滚动条
-        scrollbar = ttk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-
-        # 文件列表
-        self.file_listbox = tk.Listbox(
-            list_frame,
-            yscrollcommand=scrollbar.set,
-            selectmode=tk.EXTENDED,
-            height=8,
-            width=100
-        )
+        # 文件列表（虚拟化，只渲染可见行）
+        self.file_listbox = VirtualFileList(list_frame, height=8)
         self.file_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.file_listbox.yview)
 
         # Excel文件选择
         ttk.Label(file_frame, text="Excel表格:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.W)
@@ -473,12 +370,59 @@ class AudioToTextTool:
         self.confirm_btn = ttk.Button(model_frame, text="确认模型",
                                       command=self.confirm_model)
         self.confirm_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Label(model_frame, textvariable=self.model_state_var, width=16).pack(side=tk.LEFT, padx=5)
+
+        # 模型内存占用与上限（超出上限时先释放空闲的分流模型，仍不够则拒绝加载）
+        ttk.Label(model_frame, textvariable=self.memory_usage_var).pack(side=tk.LEFT, padx=5)
+        ttk.Label(model_frame, text="上限(GB):").pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Entry(model_frame, textvariable=self.memory_budget_var, width=5).pack(side=tk.LEFT, padx=5)
+
+        # 静音预检（探测时长时一并统计电平，低于阈值的文件不送入引擎）
+        ttk.Checkbutton(model_frame, text="静音预检", variable=self.silence_check_var).pack(side=tk.LEFT, padx=5)
+        ttk.Label(model_frame, text="阈值(dBFS):").pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Entry(model_frame, textvariable=self.silence_threshold_var, width=5).pack(side=tk.LEFT, padx=5)
+
+        # 重复文件（不同文件名/子目录下的同一录音）只识别一次，结果复用到所有副本
+        ttk.Checkbutton(model_frame, text="重复文件去重", variable=self.dedup_var).pack(side=tk.LEFT, padx=5)
 
         # 状态重置按钮
         self.reset_status_btn = ttk.Button(model_frame, text="重置状态",
                                            command=self.reset_file_status)
         self.reset_status_btn.pack(side=tk.RIGHT, padx=5)
 
+        # 声道拆分模式
+        split_channels_check = ttk.Checkbutton(model_frame, text="按声道拆分识别",
+                                               variable=self.split_channels_var)
+        split_channels_check.pack(side=tk.LEFT, padx=5)
+
+        # 按语言分流（混合CN/EN文件夹一次处理）
+        route_check = ttk.Checkbutton(model_frame, text="按语言分流", variable=self.route_language_var)
+        route_check.pack(side=tk.LEFT, padx=5)
+
+        # 阶段耗时追踪
+        trace_check = ttk.Checkbutton(model_frame, text="记录阶段耗时", variable=self.trace_var)
+        trace_check.pack(side=tk.LEFT, padx=5)
+
+        # 性能分析
+        ttk.Label(model_frame, text="性能分析:").pack(side=tk.LEFT, padx=(5, 0))
+        profile_combo = ttk.Combobox(model_frame, textvariable=self.profile_var,
+                                     values=list(self.PROFILE_OPTIONS), width=8, state="readonly")
+        profile_combo.pack(side=tk.LEFT, padx=5)
+
+        # Whisper CPU加速（int8动态量化，首次确认模型时量化并缓存）
+        whisper_int8_check = ttk.Checkbutton(model_frame, text="Whisper int8",
+                                             variable=self.whisper_int8_var)
+        whisper_int8_check.pack(side=tk.LEFT, padx=5)
+
+        # Whisper解码策略与固定语言（处理开始时生效，无需重新加载模型）
+        ttk.Label(model_frame, text="解码:").pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Combobox(model_frame, textvariable=self.whisper_profile_var,
+                     values=["默认"] + list(WHISPER_DECODING_PROFILES),
+                     width=8, state="readonly").pack(side=tk.LEFT, padx=5)
+        ttk.Label(model_frame, text="语言:").pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Combobox(model_frame, textvariable=self.whisper_language_var,
+                     values=["自动", "zh", "en", "ja", "ko", "yue"], width=6).pack(side=tk.LEFT, padx=5)
+
         # Excel设置框架
         excel_settings_frame = ttk.LabelFrame(settings_frame, text="Excel设置")
         excel_settings_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -512,9 +456,9 @@ class AudioToTextTool:
         log_frame = ttk.LabelFrame(self.main_frame, text="处理日志")
         log_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
 
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15)
-        self.log_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_view = LogViewer(log_frame, log_file="audio_to_text.log", height=15)
+        self.log_view.pack(fill=tk.BOTH, expand=True)
+        self.log_text = self.log_view.text
 
         # 进度条
         progress_frame = ttk.Frame(self.main_frame)
@@ -566,6 +510,15 @@ class AudioToTextTool:
                                 command=self.export_report)
         export_btn.pack(side=tk.LEFT, padx=5)
 
+        # 字幕导出（SRT/VTT）
+        self.subtitle_format_var = tk.StringVar(value="srt")
+        export_subtitle_btn = ttk.Button(center_btn_frame, text="导出字幕",
+                                         command=self.export_subtitles)
+        export_subtitle_btn.pack(side=tk.LEFT, padx=5)
+        subtitle_format_combo = ttk.Combobox(center_btn_frame, textvariable=self.subtitle_format_var,
+                                             values=["srt", "vtt"], width=5, state="readonly")
+        subtitle_format_combo.pack(side=tk.LEFT, padx=5)
+
         # 右侧按钮组（工具按钮）
         right_btn_frame = ttk.Frame(btn_frame)
         right_btn_frame.pack(side=tk.RIGHT, fill=tk.X)
@@ -681,6 +634,20 @@ class AudioToTextTool:
         self.start_row_var.set(config.get("start_row", 2))
         self.similarity_var.set(config.get("similarity", 0.8))
         self.model_var.set(config.get("model", ""))
+        self.split_channels_var.set(config.get("split_channels", False))
+        self.whisper_int8_var.set(config.get("whisper_int8", False))
+        self.whisper_profile_var.set(config.get("whisper_profile", "默认"))
+        self.whisper_language_var.set(config.get("whisper_language", "自动"))
+        self.route_language_var.set(config.get("route_language", False))
+        if "memory_budget_gb" in config:
+            self.memory_budget_var.set(config["memory_budget_gb"])
+        self.silence_check_var.set(config.get("silence_check", True))
+        self.silence_threshold_var.set(config.get("silence_threshold", SILENCE_THRESHOLD_DB))
+        self.dedup_var.set(config.get("dedup", True))
+
+        # 记录使用时间，下次启动时后台预加载该预设的模型
+        config["last_used"] = time.time()
+        self.save_presets_to_file()
 
         messagebox.showinfo("成功", f"预设 '{selected}' 已加载")
 
@@ -723,7 +690,17 @@ class AudioToTextTool:
             "compare_col": self.compare_col_var.get(),
             "start_row": self.start_row_var.get(),
             "similarity": self.similarity_var.get(),
-            "model": self.model_var.get()
+            "model": self.model_var.get(),
+            "split_channels": self.split_channels_var.get(),
+            "whisper_int8": self.whisper_int8_var.get(),
+            "whisper_profile": self.whisper_profile_var.get(),
+            "whisper_language": self.whisper_language_var.get(),
+            "route_language": self.route_language_var.get(),
+            "memory_budget_gb": self.memory_budget_var.get(),
+            "silence_check": self.silence_check_var.get(),
+            "silence_threshold": self.silence_threshold_var.get(),
+            "dedup": self.dedup_var.get(),
+            "last_used": time.time()
         }
 
         # 保存到预设
@@ -757,7 +734,17 @@ class AudioToTextTool:
             "compare_col": self.compare_col_var.get(),
             "start_row": self.start_row_var.get(),
             "similarity": self.similarity_var.get(),
-            "model": self.model_var.get()
+            "model": self.model_var.get(),
+            "split_channels": self.split_channels_var.get(),
+            "whisper_int8": self.whisper_int8_var.get(),
+            "whisper_profile": self.whisper_profile_var.get(),
+            "whisper_language": self.whisper_language_var.get(),
+            "route_language": self.route_language_var.get(),
+            "memory_budget_gb": self.memory_budget_var.get(),
+            "silence_check": self.silence_check_var.get(),
+            "silence_threshold": self.silence_threshold_var.get(),
+            "dedup": self.dedup_var.get(),
+            "last_used": time.time()
         }
 
         # 更新预设
@@ -997,11 +984,11 @@ class AudioToTextTool:
                         self.file_status[filename] = False
 
         # 更新文件列表
-        self.file_listbox.delete(0, tk.END)
-        for display_name in self.displayed_files:
-            filename = display_name.split('/', 1)[-1]  # 去掉语言前缀获取实际文件名
-            status = " (已生成)" if self.file_status.get(filename, False) else ""
-            self.file_listbox.insert(tk.END, display_name + status)
+        self.file_listbox.set_items(
+            [(os.path.basename(path), display_name)
+             for path, display_name in zip(self.found_files, self.displayed_files)],
+            self._file_status_text
+        )
 
         self.log(f"找到 {len(self.found_files)} 个音频文件（包含子文件夹）")
 
@@ -1009,16 +996,19 @@ class AudioToTextTool:
         """重置所有文件的生成状态"""
         for filename in self.file_status:
             self.file_status[filename] = False
+        self.file_levels.clear()
 
         # 更新文件列表显示
-        self.file_listbox.delete(0, tk.END)
-        for display_name in self.displayed_files:
-            filename = display_name.split('/', 1)[-1]  # 去掉语言前缀获取实际文件名
-            status = " (已生成)" if self.file_status.get(filename, False) else ""
-            self.file_listbox.insert(tk.END, display_name + status)
+        self.file_listbox.set_all_status("")
 
         self.log("已重置所有文件的生成状态")
 
+    def _file_status_text(self, filename):
+        """文件列表中显示的状态文本"""
+        if self.file_levels.get(filename, {}).get('silent'):
+            return "静音"
+        return "已生成" if self.file_status.get(filename, False) else ""
+
     # 停止方法
     def stop_text_generation(self):
         """停止文本生成过程"""
@@ -1043,73 +1033,149 @@ class AudioToTextTool:
         if hasattr(self, 'logger'):
             self.logger.log(level, message)
 
-        # 同时写入GUI日志框
-        if hasattr(self, 'log_text'):
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.insert(tk.END, message + "\n")
-            self.log_text.see(tk.END)
-            self.log_text.config(state=tk.DISABLED)
+        # 同时写入GUI日志框（经事件通道按帧合并，工作线程调用也安全）
+        if hasattr(self, 'ui_events'):
+            self.ui_events.log(message, level)
+
+    def _append_log_lines(self, lines):
+        """一次性追加一帧内积累的日志行（主线程，超出上限的旧行自动丢弃）"""
+        self.log_view.append(lines)
 
     def confirm_model(self):
-        """确认并加载选定的模型"""
+        """
+        确认并在后台加载选定的模型
+
+        Returns:
+            是否开始了新的加载（已加载、参数无效或已有加载任务时为False）
+        """
         model_name = self.model_var.get()
         if model_name not in self.models:
             messagebox.showerror("错误", "无效的模型选择")
-            return
+            return False
 
         model_info = self.models[model_name]
 
-        # 如果已经加载，直接返回
-        if model_info.get('loaded', False):
+        # 如果已用相同参数加载，直接返回
+        options = self._engine_options()
+        if model_info.get('loaded', False) and model_info.get('loaded_options') == options:
             self.log(f"模型 {model_name} 已加载，无需重复加载")
-            return
+            return False
 
         # 检查模型有效性
         if not model_info.get('valid', True):
             messagebox.showerror("错误", "所选模型配置无效，请检查模型文件")
-            return
+            return False
 
-        try:
-            start_time = time.time()
+        if self.model_loader.busy:
+            self.log(f"模型 {self.model_loader.model_name} 正在加载，请稍候", logging.WARNING)
+            return False
+        self._apply_memory_budget()
 
-            # 释放当前已加载的模型（如果有）
-            if hasattr(self, 'stt_engine') and self.stt_engine:
-                self.stt_engine.release_resources()
+        # 释放当前已加载的模型（如果有）
+        if hasattr(self, 'stt_engine') and self.stt_engine:
+            self.stt_engine.release_resources()
+            self.stt_engine = None
+        if self.language_router:
+            self.language_router.close()
+            self.language_router = None
+        for other in self.models.values():
+            other['loaded'] = False  # 已加载标记随单例释放而失效
+
+        self.confirm_btn.config(state=tk.DISABLED)
+        self.log(f"开始后台加载模型: {model_name}")
+        self.model_loader.load(
+            model_name, model_info, options,
+            on_done=lambda *result: self._on_model_loaded(options, *result),
+            on_progress=self.model_state_var.set
+        )
+        return True
 
-            # 加载新模型
-            if model_info['engine'] in ('microsoft', 'tencent'):
-                with open(model_info['path'], 'r', encoding='utf-8') as f:
-                    config = json.load(f)
+    def _on_model_loaded(self, options, model_name, engine, load_time, warm_time, rss_delta, error):
+        """后台加载完成（主线程）"""
+        self.confirm_btn.config(state=tk.NORMAL)
+        model_info = self.models[model_name]
 
-                self.stt_engine = STTEngine(
-                    model_config=config,
-                    lang=model_info['lang'],
-                    engine_type=model_info['engine']
-                )
+        if error is not None:
+            self._pending_start = False
+            error_msg = f"模型加载失败: {str(error)}"
+            self.log(error_msg, logging.ERROR)
+            self.model_state_var.set("加载失败")
+            self.status_var.set("就绪 | 模型加载失败")
+            if isinstance(error, MemoryBudgetExceeded):
+                # 模型本身有效，只是超出内存上限
+                messagebox.showerror("内存不足", f"{str(error)}\n可调高内存上限或换用较小的模型")
             else:
-                self.stt_engine = STTEngine(
-                    model_config=model_info['path'],
-                    lang=model_info['lang'],
-                    engine_type=model_info['engine']
-                )
-
-            # 标记为已加载
-            model_info['loaded'] = True
-            model_info['valid'] = True  # 加载成功即标记为有效
+                messagebox.showerror("引擎错误", error_msg)
+                model_info['valid'] = False  # 标记为无效
+            self.stt_engine = None
+            return
 
-            load_time = time.time() - start_time
-            self.log(f"✅ 模型加载成功: {model_name} (耗时: {load_time:.2f}s)")
+        self.stt_engine = engine
+        model_info['loaded'] = True
+        model_info['loaded_options'] = options
+        model_info['valid'] = True  # 加载成功即标记为有效
+        model_info['load_time'] = load_time
+        if rss_delta is not None:
+            model_info['rss'] = rss_delta
+        self.model_manifest.record_load(model_name, load_time, rss_delta)
+        self.log(f"✅ 模型加载成功: {model_name} (加载: {load_time:.2f}s, 预热: {warm_time:.2f}s, "
+                 f"内存: {format_bytes(rss_delta)})")
+        self.model_state_var.set(f"已加载 ({load_time + warm_time:.1f}s)")
+        self.status_var.set(f"就绪 | 模型已加载: {model_name}")
+
+        if self._pending_start:
+            self._pending_start = False
+            self.start_text_generation()
+
+    def _apply_memory_budget(self):
+        """把界面上的内存上限写入全局预算（无效或0为不限）"""
+        try:
+            limit_gb = float(self.memory_budget_var.get())
+        except (tk.TclError, ValueError):
+            limit_gb = 0
+        memory_budget.set_limit(int(limit_gb * 1024 ** 3) if limit_gb > 0 else None)
+
+    def _refresh_memory_usage(self):
+        """刷新模型面板中的内存占用（主线程）"""
+        self.memory_usage_var.set(memory_budget.format())
+
+    def _last_used_preset(self):
+        """最近使用（加载或保存）的预设名，没有记录时返回None"""
+        used = {name: config.get("last_used", 0) for name, config in self.presets.items()}
+        used = {name: stamp for name, stamp in used.items() if stamp}
+        return max(used, key=used.get) if used else None
+
+    def _preload_last_preset(self):
+        """启动时在后台加载最近使用的预设所选的模型（不修改其他设置）"""
+        preset_name = self._last_used_preset()
+        if not preset_name:
+            return
+        config = self.presets[preset_name]
+        model_name = config.get("model", "")
+        if model_name not in self.models or not self.models[model_name].get('valid', True):
+            self.log(f"上次使用的预设 '{preset_name}' 的模型不可用，跳过预加载", logging.WARNING)
+            return
 
-            # 测试引擎
-            test_result = self.stt_engine.test_model()
-            self.log(f"测试结果: {test_result[:50]}...")
+        self.preset_var.set(preset_name)
+        self.model_var.set(model_name)
+        self.whisper_int8_var.set(config.get("whisper_int8", False))
+        self.log(f"预加载上次使用的预设 '{preset_name}' 的模型: {model_name}")
+        self.confirm_model()
+
+    def _engine_options(self):
+        """界面上与引擎加载相关的选项（作为本地引擎的config）"""
+        return {
+            'whisper_cpu_profile': 'int8' if self.whisper_int8_var.get() else 'fp32'
+        }
 
-        except Exception as e:
-            error_msg = f"模型加载失败: {str(e)}"
-            self.log(error_msg, logging.ERROR)
-            messagebox.showerror("引擎错误", error_msg)
-            model_info['valid'] = False  # 标记为无效
-            self.stt_engine = None
+    def _decoding_options(self):
+        """界面上的解码选项（处理开始时写入引擎config，不需要重新加载模型）"""
+        profile = self.whisper_profile_var.get()
+        language = self.whisper_language_var.get().strip()
+        return {
+            'whisper_profile': profile if profile in WHISPER_DECODING_PROFILES else None,
+            'whisper_language': None if language in ("", "自动") else language
+        }
 
     def _transcribe_with_tencent(self, audio_path):
         """确保使用腾讯云API进行转录"""
@@ -1131,24 +1197,10 @@ class AudioToTextTool:
         except Exception as e:
             self.log(f"腾讯云识别失败: {str(e)}", logging.ERROR)
             return ""
-        finally:
-            if 'converted_path' in locals() and os.path.exists(converted_path):
-                os.remove(converted_path)
 
     def _convert_audio_for_tencent(self, input_path):
-        """转换为腾讯云要求的音频格式"""
-        temp_path = os.path.join(tempfile.gettempdir(), f"tencent_temp_{os.path.basename(input_path)}.wav")
-
-        cmd = [
-            "ffmpeg", "-i", input_path,
-            "-ar", "16000",  # 采样率16kHz
-            "-ac", "1",  # 单声道
-            "-acodec", "pcm_s16le",  # 16位有符号PCM
-            "-y", temp_path
-        ]
-
-        subprocess.run(cmd, check=True, capture_output=True)
-        return temp_path
+        """转换为腾讯云要求的音频格式（复用PCM缓存）"""
+        return PCMCache.instance().get_wav(input_path)
 
     def start_text_generation(self):
         """启动文本生成流程（完整线程安全版本）"""
@@ -1181,35 +1233,25 @@ class AudioToTextTool:
                 return
 
             model_info = self.models[model_name]
-            engine_type = model_info['engine']
-            language = self.model_languages.get(model_name, 'zh')
 
-            # === 4. 初始化引擎 ===
-            try:
-                if engine_type in ('microsoft', 'tencent'):
-                    with open(model_info['path'], 'r', encoding='utf-8') as f:
-                        config = json.load(f)
-                    self.stt_engine = STTEngine(
-                        model_config=model_info['path'],
-                        lang=language,
-                        engine_type=engine_type,
-                        config=config
-                    )
-                else:
-                    self.stt_engine = STTEngine(
-                        model_config=model_info['path'],
-                        lang=language,
-                        engine_type=engine_type
-                    )
-            except Exception as e:
-                error_msg = f"引擎初始化失败: {str(e)}"
-                self.log(error_msg, logging.ERROR)
-                messagebox.showerror("引擎错误", error_msg)
+            # === 4. 确认引擎已加载（未加载时后台加载，完成后自动开始） ===
+            if self.model_loader.busy:
+                self._pending_start = True
+                self.log(f"模型 {self.model_loader.model_name} 正在加载，加载完成后自动开始处理")
+                return
+            loaded = model_info.get('loaded') and model_info.get('loaded_options') == self._engine_options()
+            if not loaded or self.stt_engine is None:
+                if self.confirm_model():
+                    self._pending_start = True
+                    self.log("模型加载完成后自动开始处理")
                 return
 
             # === 5. 准备处理 ===
             self.is_processing = True
             self.results = []  # 清空之前的结果
+            self.duplicates = {}
+            self.dedup_saved = 0.0
+            self.file_levels.clear()  # 静音列表与电平只反映本次处理
             self.progress_var.set(0)
 
             # UI状态更新（必须通过root.after保证线程安全）
@@ -1221,16 +1263,21 @@ class AudioToTextTool:
             ])
 
             # === 6. 启动处理线程 ===
+            self.stt_engine.configure(**self._decoding_options())
+            self._apply_memory_budget()
+            tracer.reset()
+            tracer.enable(self.trace_var.get())
+
             self.processing_thread = threading.Thread(
                 target=self._process_files_thread,
-                args=(selected_files,),
+                args=(selected_files, self.split_channels_var.get(),
+                      self.PROFILE_OPTIONS.get(self.profile_var.get()),
+                      self.folder_entry.get() if self.route_language_var.get() else None,
+                      self._silence_threshold(), self.dedup_var.get()),
                 daemon=True
             )
             self.processing_thread.start()
 
-            # === 7. 启动进度监控 ===
-            self._start_progress_monitor(total_files)
-
             # 在处理完成后添加日志记录
             if self.results:
                 self._save_generation_log(selected_files)
@@ -1249,77 +1296,222 @@ class AudioToTextTool:
             self.status_var.set("就绪 | 发生错误")
         ])
 
-    def _process_files_thread(self, file_list):
+    def _silence_threshold(self):
+        """静音预检阈值(dBFS)，未启用时返回None"""
+        if not self.silence_check_var.get():
+            return None
+        try:
+            return float(self.silence_threshold_var.get())
+        except (tk.TclError, ValueError):
+            return SILENCE_THRESHOLD_DB
+
+    def _reject_silent(self, file_list, threshold_db, tracker, copies=None):
+        """
+        统计电平并剔除静音文件（不调用任何引擎）
+
+        Args:
+            copies: 去重得到的 {原件路径: [副本路径]}，副本沿用原件的电平
+
+        Returns:
+            (需要识别的文件列表, 静音文件数（含副本）)
+        """
+        copies = copies or {}
+        self.ui_events.status(f"正在检查 {len(file_list)} 个文件的电平...")
+        levels = AudioProbe.levels(file_list, threshold_db)
+        remaining, silent = [], 0
+        for file_path in file_list:
+            level = levels.get(file_path)
+            for path in [file_path] + copies.get(file_path, []):
+                if level:
+                    self.file_levels[os.path.basename(path)] = level
+            if not level or not level['silent']:
+                remaining.append(file_path)
+                continue
+            for path in [file_path] + copies.get(file_path, []):
+                filename = os.path.basename(path)
+                self.ui_events.file_status(filename)
+                self.log(f"🔇 {filename} 静音，跳过识别 (有声帧 {level['frame_db']:.1f} dBFS，"
+                         f"峰值 {level['peak_db']:.1f} dBFS)")
+                tracker.file_done(path, 0.0, skipped=True)
+                silent += 1
+        if silent:
+            self.log(f"静音预检: {silent} 个文件低于 {threshold_db:.0f} dBFS，未送入引擎")
+        return remaining, silent
+
+    def _process_files_thread(self, file_list, split_channels=False, profile_mode=None, route_root=None,
+                              silence_threshold=None, dedup=False):
         """实际处理文件的线程方法"""
+        engine_name = getattr(self.stt_engine, 'engine_type', '')
+        profiler = RunProfiler.create(profile_mode, self.log_dir)
+        if profiler:
+            profiler.start()
         try:
-            for idx, file_path in enumerate(file_list, 1):
-                if not self.is_processing:
-                    break
-
-                # 更新进度（线程安全）
-                self.root.after(0, self._update_progress, idx, len(file_list), os.path.basename(file_path))
+            # 先探测时长，进度和ETA按音频秒数计算
+            self.ui_events.status(f"正在读取 {len(file_list)} 个文件的时长...")
+            tracker = ThroughputTracker(AudioProbe.durations(file_list))
+            self.log(f"共 {len(file_list)} 个文件，总时长 "
+                     f"{ThroughputTracker.format_seconds(tracker.total_audio)}")
+
+            pending, copies, skipped = file_list, {}, 0
+            if dedup:
+                self.ui_events.status(f"正在检查 {len(file_list)} 个文件中的重复内容...")
+                pending, copies = AudioDedup.group(file_list)
+                if copies:
+                    self.log(f"重复文件: {len(file_list) - len(pending)} 个与其他文件内容相同，"
+                             f"只识别 {len(pending)} 个唯一文件")
+            if silence_threshold is not None:
+                pending, skipped = self._reject_silent(pending, silence_threshold, tracker, copies)
+
+            self.ui_events.progress(skipped, len(file_list), os.path.basename(file_list[0]), tracker.snapshot())
+            # 读取、解码在引擎的后台线程中提前进行，结果记录在persist线程中进行，
+            # 本线程只负责识别；各阶段之间的队列都有上限
+            outcomes = self._iter_transcriptions(pending, split_channels, route_root)
+            sink = SinkStage(lambda file_path, outcome, elapsed: self._record_outcome(
+                len(file_list), file_path, outcome, elapsed, split_channels, tracker, engine_name,
+                copies.get(file_path, ())))
+            try:
+                for file_path, outcome, elapsed in outcomes:
+                    if not self.is_processing:
+                        outcomes.close()  # 取消已提交但未开始的任务
+                        break
+                    sink.put(file_path, outcome, elapsed)
+            finally:
+                sink.close()
+
+            if self.duplicates:
+                self.log(f"去重: {len(self.duplicates)} 个重复文件复用识别结果，"
+                         f"节省识别时间 {ThroughputTracker.format_seconds(self.dedup_saved)}")
+            self.log(f"吞吐统计: {ThroughputTracker.format(tracker.snapshot())}")
+            if tracer.enabled:
+                self._export_trace()
 
+        finally:
+            if profiler:
                 try:
-                    # 执行转录
-                    text = self.stt_engine.transcribe(file_path)
-                    filename = os.path.basename(file_path)
-
-                    if text:
-                        self.results.append({
-                            'file': filename,
-                            'text': text,
-                            'duration': self._get_audio_duration(file_path)
-                        })
-                        self.file_status[filename] = True
-                        self.log(f"✅ [{idx}/{len(file_list)}] {filename} 转录成功")
-                    else:
-                        self.log(f"⚠️ [{idx}/{len(file_list)}] {filename} 无转录结果", logging.WARNING)
-
+                    for line in profiler.stop():
+                        self.log(line)
                 except Exception as e:
-                    self.log(f"❌ [{idx}/{len(file_list)}] 处理失败: {str(e)}", logging.ERROR)
-
-        finally:
+                    self.log(f"性能分析结果保存失败: {str(e)}", logging.ERROR)
             self.is_processing = False
-            self.root.after(0, self._finish_processing)
-
-    def _update_progress(self, processed, total, current_file):
-        """线程安全的进度更新"""
-        progress = (processed / total) * 100
-        self.progress_var.set(progress)
-        self.progress_label.config(text=f"{processed}/{total}")
-        self.status_var.set(f"处理中: {current_file[:30]}... ({progress:.1f}%)")
-
-    def _finish_processing(self):
-        """处理完成后的清理工作"""
-        success_count = len([r for r in self.results if r['text']])
-        total = self.progress_label.cget("text").split("/")[-1]
-
-        # 更新UI状态
-        self.start_btn.config(state=tk.NORMAL)
-        self.stop_btn.config(state=tk.DISABLED)
-        self.status_var.set(f"完成: {success_count}/{total} 成功")
-
-        # 刷新文件列表状态
-        for i, display_name in enumerate(self.displayed_files):
-            filename = display_name.split('/')[-1].split(' (')[0]
-            if filename in self.file_status:
-                status = " (已生成)" if self.file_status[filename] else ""
-                self.file_listbox.delete(i)
-                self.file_listbox.insert(i, f"{display_name.split(' (')[0]}{status}")
+            self.ui_events.call(self._finish_processing)
+
+    def _record_outcome(self, total, file_path, outcome, elapsed, split_channels, tracker, engine_name,
+                        duplicates=()):
+        """流水线的记录阶段（persist线程）：保存一个文件的识别结果并更新进度，再复用到各副本"""
+        idx = tracker.done_files + 1  # 只有本线程在识别期间更新完成数
+        result = None
+        with tracer.span("persist", os.path.basename(file_path)):
+            try:
+                # 声道拆分模式下各声道并发识别并带说话人标签
+                channel_results = None
+                if split_channels:
+                    channel_results = outcome
+                    text = STTEngine.format_channel_text(channel_results)
+                    transcript = None
+                else:
+                    transcript = outcome
+                    text = transcript.text
+                filename = os.path.basename(file_path)
+
+                if text:
+                    result = {
+                        'file': filename,
+                        'text': text,
+                        'transcript': transcript,
+                        'duration': self._format_duration(tracker.duration_of(file_path))
+                    }
+                    if channel_results and len(channel_results) > 1:
+                        result['channels'] = [
+                            {'speaker': speaker, 'text': channel_transcript.text,
+                             'transcript': channel_transcript}
+                            for speaker, channel_transcript in channel_results
+                        ]
+                    elif channel_results:
+                        result['transcript'] = channel_results[0][1]
+                    self.results.append(result)
+                    self.file_status[filename] = True
+                    self.ui_events.file_status(filename)
+                    self.log(f"✅ [{idx}/{total}] {filename} 转录成功")
+                else:
+                    self.log(f"⚠️ [{idx}/{total}] {filename} 无转录结果", logging.WARNING)
 
-        # 显示完成提示
-        messagebox.showinfo(
-            "处理完成",
-            f"成功处理 {success_count}/{total} 个文件\n"
-            f"结果已保存在内存中，可点击'填充文本'导出到Excel"
-        )
+            except Exception as e:
+                self.log(f"❌ [{idx}/{total}] 处理失败: {str(e)}", logging.ERROR)
+            finally:
+                # 更新进度（线程安全，按帧合并）
+                tracker.file_done(file_path, elapsed, engine_name)
+                self.ui_events.progress(idx, total, os.path.basename(file_path),
+                                        tracker.snapshot())
+
+            for copy_path in duplicates:
+                self._record_duplicate(total, copy_path, file_path, result, elapsed, tracker)
+
+    def _record_duplicate(self, total, copy_path, original_path, result, elapsed, tracker):
+        """把原件的识别结果复用到内容相同的副本（不调用引擎）"""
+        idx = tracker.done_files + 1
+        filename = os.path.basename(copy_path)
+        original = os.path.basename(original_path)
+        self.duplicates[filename] = original
+        self.dedup_saved += elapsed
+        if result:
+            self.results.append(dict(result, file=filename, duplicate_of=original,
+                                     duration=self._format_duration(tracker.duration_of(copy_path))))
+            self.file_status[filename] = True
+            self.ui_events.file_status(filename)
+            self.log(f"📎 [{idx}/{total}] {filename} 与 {original} 内容相同，复用识别结果")
+        else:
+            self.log(f"⚠️ [{idx}/{total}] {filename} 与 {original} 内容相同，无转录结果", logging.WARNING)
+        tracker.file_done(copy_path, 0.0, skipped=True)
+        self.ui_events.progress(idx, total, filename, tracker.snapshot())
+
+    def _iter_transcriptions(self, file_list, split_channels=False, route_root=None):
+        """
+        产出(路径, 结果, 识别耗时)
+
+        普通模式交给引擎的transcribe_many（Vosk可多进程并行）；
+        指定route_root时按语言分组，各组由对应模型并发识别（按完成顺序产出）；
+        声道拆分模式下结果为[(说话人, Transcript), ...]。
+        """
+        if route_root and not split_channels:
+            if self.language_router is None:
+                self.language_router = LanguageRouter(self.models, self._engine_options())
+            groups = self.language_router.route(file_list, route_root, self.stt_engine)
+            plan = self.language_router.assign_engines(groups, self.stt_engine)
+            for label, _, paths in plan:
+                self.log(f"语言分流: {label} <- {len(paths)} 个文件")
+            yield from self.language_router.transcribe_many(plan)
+            return
+        if not split_channels:
+            yield from self.stt_engine.transcribe_many(file_list)
+            return
+        yield from self.stt_engine.transcribe_channels_many(file_list)
 
-    def _update_progress(self, processed, total, current_file):
-        """线程安全的进度更新"""
-        progress = (processed / total) * 100
-        self.progress_var.set(progress)
+    def _export_trace(self):
+        """输出各阶段耗时分布，并把trace保存到日志目录"""
+        tracer.enable(False)
+        if not len(tracer):
+            return
+        base = os.path.join(self.log_dir, f"trace_{time.strftime('%Y%m%d_%H%M%S')}")
+        try:
+            tracer.export_chrome(base + ".json")
+            tracer.export_jsonl(base + ".jsonl")
+        except Exception as e:
+            self.log(f"trace导出失败: {str(e)}", logging.ERROR)
+            return
+        self.log("阶段耗时统计:")
+        for line in tracer.summary_lines():
+            self.log(line)
+        self.log(f"trace已保存: {base}.json（可在chrome://tracing或Perfetto中打开）")
+
+    def _update_progress(self, processed, total, current_file, stats=None):
+        """线程安全的进度更新（有统计时按音频时长加权并显示吞吐和ETA）"""
+        if stats:
+            self.progress_var.set(stats['fraction'] * 100)
+            self.status_var.set(f"处理中: {current_file[:30]}... | {ThroughputTracker.format(stats)}")
+        else:
+            self.progress_var.set((processed / total) * 100)
+            self.status_var.set(f"处理中: {current_file[:30]}...")
         self.progress_label.config(text=f"{processed}/{total}")
-        self.status_var.set(f"处理中: {current_file[:30]}...")
 
     def _finish_processing(self):
         """处理完成后的清理工作"""
@@ -1330,13 +1522,7 @@ class AudioToTextTool:
         self.stop_btn.config(state=tk.DISABLED)
         self.status_var.set(f"完成: {success_count}/{total} 成功")
 
-        # 刷新文件列表状态
-        for i, display_name in enumerate(self.displayed_files):
-            filename = display_name.split('/')[-1].split(' (')[0]
-            if filename in self.file_status:
-                status = " (已生成)" if self.file_status[filename] else ""
-                self.file_listbox.delete(i)
-                self.file_listbox.insert(i, f"{display_name.split(' (')[0]}{status}")
+        # 文件列表状态已在每个文件完成时增量更新，这里无需逐行重建
 
         messagebox.showinfo(
             "处理完成",
@@ -1344,28 +1530,14 @@ class AudioToTextTool:
             f"结果已保存在内存中，可点击'填充文本'导出到Excel"
         )
 
-    def _start_progress_monitor(self, total_files):
-        """修正后的进度监控"""
-
-        def monitor():
-            while self.is_processing:
-                time.sleep(0.1)  # 现在可以正确使用
-                processed = len(self.results)
-                progress = (processed / total_files) * 100
-                self.root.after(0, lambda: [
-                    self.progress_var.set(progress),
-                    self.status_var.set(f"处理中: {progress:.1f}%")
-                ])
-
-        threading.Thread(target=monitor, daemon=True).start()
-
     def _get_audio_duration(self, file_path):
-        """获取音频时长（示例实现）"""
-        try:
-            # 实际实现需要根据音频库获取时长
-            return "N/A"
-        except:
-            return "N/A"
+        """获取音频时长（秒），无法探测时返回N/A"""
+        return self._format_duration(AudioProbe.duration(file_path))
+
+    @staticmethod
+    def _format_duration(seconds):
+        """结果中的时长：保留两位小数，未知时为N/A"""
+        return round(seconds, 2) if seconds else "N/A"
 
     def process_audio_files(self, file_list):
             """批量处理音频文件 - 不再生成单独的TXT文件"""
@@ -1387,7 +1559,7 @@ class AudioToTextTool:
                     self.log(f"🚀 开始处理: {filename}")
 
                     # 更新状态
-                    self.root.after(0, self.update_progress, processed_count, total_files, filename)
+                    self.ui_events.call(self.update_progress, processed_count, total_files, filename)
 
                     # 转录音频
                     text = self.stt_engine.transcribe(file_path)
@@ -1396,14 +1568,14 @@ class AudioToTextTool:
                         self.log(f"✅ 转录结果: {text}")
 
                         # 记录结果到内存（不再保存为单独的TXT文件）
-                        result = {'file': filename, 'text': text, 'duration': "N/A"}
+                        result = {'file': filename, 'text': text, 'duration': self._get_audio_duration(file_path)}
                         self.results.append(result)
 
                         # 更新文件状态
                         self.file_status[filename] = True
 
                         # 更新列表显示
-                        self.root.after(0, self.update_file_status_in_list, filename)
+                        self.ui_events.file_status(filename)
                     else:
                         self.log("❌ 转录失败，无结果返回")
 
@@ -1415,20 +1587,18 @@ class AudioToTextTool:
 
             # 处理完成
             self.is_processing = False
-            self.root.after(0, self.reset_ui_state)
+            self.ui_events.call(self.reset_ui_state)
             self.log(f"处理完成! 成功处理 {len(self.results)}/{total_files} 个文件")
             messagebox.showinfo("完成", f"处理完成! 成功处理 {len(self.results)}/{total_files} 个文件")
 
+    def _update_file_statuses(self, filenames):
+        """批量刷新一帧内完成的文件状态（主线程）"""
+        for filename in filenames:
+            self.update_file_status_in_list(filename)
+
     def update_file_status_in_list(self, filename):
-            """更新列表框中文件的显示状态"""
-            # 找到对应的显示名称
-            for i, display_name in enumerate(self.displayed_files):
-                if filename in display_name:
-                    # 更新列表框中的这一行
-                    status = " (已生成)" if self.file_status.get(filename, False) else ""
-                    self.file_listbox.delete(i)
-                    self.file_listbox.insert(i, display_name + status)
-                    break
+            """更新列表框中文件的显示状态（按文件名索引O(1)定位）"""
+            self.file_listbox.set_status(filename, self._file_status_text(filename))
 
     def update_progress(self, processed, total, filename):
             """更新进度显示"""
@@ -1614,15 +1784,18 @@ class AudioToTextTool:
 
     def export_report(self):
         """导出报告到日志文件（包含模型信息）"""
-        if not self.results:
+        # 全部文件都被静音预检跳过时results为空，报告只列出静音文件
+        silent = [(name, level) for name, level in self.file_levels.items() if level['silent']]
+        if not self.results and not silent:
             messagebox.showwarning("警告", "没有可导出的结果")
             return
 
         # 准备日志文件名
         timestamp = time.strftime("%Y%m%d_%H%M%S")
-        first_file = os.path.splitext(os.path.basename(self.results[0]['file']))[0]
+        first_name = self.results[0]['file'] if self.results else silent[0][0]
+        first_file = os.path.splitext(os.path.basename(first_name))[0]
         model_name = self.model_var.get().replace("/", "_")  # 替换特殊字符
-        log_name = f"{timestamp}_{model_name}_{first_file}_{len(self.results)}.txt"
+        log_name = f"{timestamp}_{model_name}_{first_file}_{len(self.results) + len(silent)}.txt"
 
         # 询问保存位置
         filetypes = [("日志文件", "*.txt"), ("所有文件", "*.*")]
@@ -1648,6 +1821,9 @@ class AudioToTextTool:
                 f"Excel文件: {self.excel_entry.get() or '未设置'}",
                 f"处理文件数: {len(self.results)}",
                 f"成功识别数: {len([r for r in self.results if r['text']])}",
+                f"静音跳过数: {len(silent)}",
+                f"重复文件数: {len(self.duplicates)}（复用识别结果，节省识别时间 "
+                f"{ThroughputTracker.format_seconds(self.dedup_saved)}）",
                 "\n详细识别结果:",
                 "=" * 60
             ]
@@ -1655,34 +1831,99 @@ class AudioToTextTool:
             # 添加每个文件的处理结果
             for idx, result in enumerate(self.results, 1):
                 status = "成功" if result['text'] else "失败"
+                if result.get('duplicate_of'):
+                    status += f"（与 {result['duplicate_of']} 内容相同，复用识别结果）"
                 log_content.append(
                     f"{idx}. 文件名: {result['file']}\n"
                     f"   状态: {status}\n"
+                    f"   电平: {self._format_level(self.file_levels.get(result['file']))}\n"
                     f"   文本长度: {len(result['text'])}字符\n"
                     f"   识别结果:\n{result['text']}\n"
                     f"{'-' * 40}"
                 )
 
+            # 静音预检跳过的文件（未调用引擎）
+            if silent:
+                log_content += ["\n静音文件:", "=" * 60]
+                for idx, (filename, level) in enumerate(silent, 1):
+                    log_content.append(f"{idx}. 文件名: {filename}\n"
+                                       f"   状态: 静音\n"
+                                       f"   电平: {self._format_level(level)}")
+
             # 写入文件
             with open(path, 'w', encoding='utf-8') as f:
                 f.write("\n".join(log_content))
 
             self.log(f"报告已导出: {path}")
+
+            # 时间轴与文本一同保存，后续生成字幕/对齐无需重新识别
+            if self.results:
+                segments_path = f"{os.path.splitext(path)[0]}.segments.jsonl"
+                save_transcripts(segments_path, self.results)
+                self.log(f"时间轴已导出: {segments_path}")
             messagebox.showinfo("导出成功", f"报告已保存到:\n{path}")
 
         except Exception as e:
             messagebox.showerror("导出失败", f"导出报告时出错: {str(e)}")
             self.log(f"导出失败: {str(e)}", logging.ERROR)
 
+    @staticmethod
+    def _format_level(level):
+        """报告中的电平列"""
+        if not level:
+            return "未检测"
+        return (f"峰值 {level['peak_db']:.1f} dBFS / RMS {level['rms_db']:.1f} dBFS / "
+                f"有声帧 {level['frame_db']:.1f} dBFS")
+
+    def export_subtitles(self):
+        """按识别时间轴批量导出字幕（每个音频一个SRT/VTT文件）"""
+        if not self.results:
+            messagebox.showwarning("警告", "没有可导出的结果")
+            return
+
+        output_dir = filedialog.askdirectory(title="选择字幕保存目录", initialdir=self.folder_entry.get() or None)
+        if not output_dir:
+            return
+
+        fmt = self.subtitle_format_var.get()
+        results = list(self.results)
+        self.ui_events.status(f"正在导出 {len(results)} 个字幕文件...")
+
+        # 写文件在后台线程进行，完成后回到界面线程提示
+        def worker():
+            try:
+                exported, skipped = export_subtitles(results, output_dir, fmt)
+            except Exception as e:
+                self.ui_events.call(self._subtitles_exported, output_dir, fmt, [], [], e)
+                return
+            self.ui_events.call(self._subtitles_exported, output_dir, fmt, exported, skipped, None)
+
+        threading.Thread(target=worker, name="subtitle-export", daemon=True).start()
+
+    def _subtitles_exported(self, output_dir, fmt, exported, skipped, error):
+        """字幕导出完成（界面线程）"""
+        if error is not None:
+            self.status_var.set("字幕导出失败")
+            messagebox.showerror("导出失败", f"导出字幕时出错: {str(error)}")
+            self.log(f"字幕导出失败: {str(error)}", logging.ERROR)
+            return
+        self.status_var.set(f"字幕已导出 {len(exported)} 个")
+        self.log(f"字幕已导出 {len(exported)} 个 ({fmt.upper()}) -> {output_dir}")
+        if skipped:
+            self.log(f"无时间轴，跳过 {len(skipped)} 个: {', '.join(skipped[:3])}"
+                     f"{'...' if len(skipped) > 3 else ''}", logging.WARNING)
+        messagebox.showinfo("导出成功", f"已导出 {len(exported)} 个字幕文件到:\n{output_dir}")
+
     def clear_log(self):
             """清空日志"""
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.delete(1.0, tk.END)
-            self.log_text.config(state=tk.DISABLED)
+            self.log_view.clear()
             self.log("日志已清空")
 
 
 if __name__ == "__main__":
+    # 打包后Vosk进程池的子进程需要
+    multiprocessing.freeze_support()
+
     # 配置根日志器
     logging.basicConfig(
         level=logging.INFO,
@@ -0,0 +1,191 @@
+import os
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils.process_memory import format_bytes, total_memory_bytes
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUDGET_FRACTION = 0.6  # 默认预算为物理内存的60%
+
+# 没有实测数据时，按模型文件大小估算加载后的常驻内存
+# （Whisper检查点为fp16，CPU上以fp32加载约为文件的两倍多；int8量化后小于文件）
+MEMORY_FACTORS = {'whisper': 2.2, 'whisper-int8': 0.8, 'vosk': 1.3}
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """加载模型会超出内存预算，且淘汰空闲模型后仍放不下"""
+
+
+def model_size(path: str) -> int:
+    """模型文件或目录的总字节数"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                continue
+    return total
+
+
+def estimate_model_memory(engine_type: str, model_path: str, cpu_profile: str = 'fp32') -> int:
+    """按文件大小估算模型加载后的常驻内存（字节），未知引擎返回0"""
+    key = 'whisper-int8' if engine_type == 'whisper' and cpu_profile == 'int8' else engine_type
+    factor = MEMORY_FACTORS.get(key)
+    if not factor or not isinstance(model_path, str) or not os.path.exists(model_path):
+        return 0
+    return int(model_size(model_path) * factor)
+
+
+class MemoryBudget:
+    """
+    已加载模型的内存记账与预算
+
+    每个本地引擎加载前按估算值（或上次实测值）申请额度：超出预算时按最近最少使用的顺序
+    淘汰可淘汰的空闲引擎（分流用的独立实例），仍放不下则抛出MemoryBudgetExceeded拒绝加载。
+    加载完成后登记实测的常驻内存增量。正在识别的引擎通过pin()保护，不会被淘汰；
+    界面选定的单例引擎登记为不可淘汰。
+    """
+
+    def __init__(self, limit: Optional[int] = None):
+        self.limit = limit if limit is not None else self.default_limit()
+        self.on_change: Optional[Callable[[], None]] = None  # 占用变化时回调（可能在工作线程中）
+        self._lock = threading.RLock()
+        self._engines: "OrderedDict[int, Dict]" = OrderedDict()  # id(engine) -> 记录（按使用顺序）
+        self._reserved = 0  # 已申请但尚未完成加载的额度
+
+    @staticmethod
+    def default_limit() -> Optional[int]:
+        total = total_memory_bytes()
+        return int(total * DEFAULT_BUDGET_FRACTION) if total else None
+
+    def set_limit(self, limit: Optional[int]):
+        """设置预算（字节），None为不限制"""
+        with self._lock:
+            self.limit = limit
+        self._notify()
+
+    # ========== 查询 ==========
+
+    def used(self) -> int:
+        with self._lock:
+            return sum(record['bytes'] for record in self._engines.values()) + self._reserved
+
+    def usage(self) -> List[Tuple[str, int]]:
+        """[(模型标签, 字节数)]，按最近使用排序"""
+        with self._lock:
+            return [(record['label'], record['bytes']) for record in reversed(self._engines.values())]
+
+    def format(self) -> str:
+        limit = format_bytes(self.limit) if self.limit else "不限"
+        return f"模型内存: {format_bytes(self.used())} / {limit}"
+
+    # ========== 申请与登记 ==========
+
+    def admit(self, estimate: int, label: str) -> int:
+        """
+        为即将加载的模型申请额度，必要时淘汰空闲引擎
+
+        Returns:
+            申请到的额度（登记或取消时原样交回）
+
+        Raises:
+            MemoryBudgetExceeded: 淘汰所有可淘汰引擎后仍超出预算
+        """
+        evicted = []
+        with self._lock:
+            if self.limit:
+                for record in list(self._engines.values()):
+                    if self.used() + estimate <= self.limit:
+                        break
+                    if record['evictable'] and not record['pinned']:
+                        evicted.append(record)
+                        del self._engines[id(record['engine'])]
+                if self.used() + estimate > self.limit:
+                    # 放不下则撤销淘汰
+                    for record in evicted:
+                        self._engines[id(record['engine'])] = record
+                    raise MemoryBudgetExceeded(
+                        f"加载 {label} 约需 {format_bytes(estimate)}，"
+                        f"已用 {format_bytes(self.used())}，超出内存预算 {format_bytes(self.limit)}")
+            self._reserved += estimate
+
+        for record in evicted:
+            logger.info(f"内存预算不足，释放空闲模型: {record['label']} ({format_bytes(record['bytes'])})")
+            record['engine'].release_resources()
+        return estimate
+
+    def cancel(self, reserved: int):
+        """加载失败时交回额度"""
+        with self._lock:
+            self._reserved = max(0, self._reserved - reserved)
+        self._notify()
+
+    def register(self, engine, label: str, nbytes: int, reserved: int = 0, evictable: bool = False):
+        """登记加载完成的引擎及其实测内存，交回申请时的额度"""
+        with self._lock:
+            self._reserved = max(0, self._reserved - reserved)
+            self._engines[id(engine)] = {'engine': engine, 'label': label, 'bytes': int(nbytes),
+                                         'evictable': evictable, 'pinned': 0}
+        self._notify()
+
+    def commit(self, engine, reserved: int):
+        """把申请到的额度计入已登记引擎的占用（如引擎随后启动的识别进程）"""
+        with self._lock:
+            self._reserved = max(0, self._reserved - reserved)
+            record = self._engines.get(id(engine))
+            if record is not None:
+                record['bytes'] += int(reserved)
+        self._notify()
+
+    def update(self, engine, nbytes: int):
+        """更新引擎的内存占用（如预热后分配了缓存）"""
+        with self._lock:
+            record = self._engines.get(id(engine))
+            if record is None:
+                return
+            record['bytes'] = int(nbytes)
+        self._notify()
+
+    def unregister(self, engine):
+        with self._lock:
+            removed = self._engines.pop(id(engine), None)
+        if removed is not None:
+            self._notify()
+
+    # ========== 使用中保护 ==========
+
+    def touch(self, engine):
+        """标记为最近使用（最后才被淘汰）"""
+        with self._lock:
+            if id(engine) in self._engines:
+                self._engines.move_to_end(id(engine))
+
+    def pin(self, engine):
+        with self._lock:
+            record = self._engines.get(id(engine))
+            if record is not None:
+                record['pinned'] += 1
+                self._engines.move_to_end(id(engine))
+
+    def unpin(self, engine):
+        with self._lock:
+            record = self._engines.get(id(engine))
+            if record is not None:
+                record['pinned'] = max(0, record['pinned'] - 1)
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"内存占用回调失败: {str(e)}")
+
+
+# 进程内全局预算（由界面或命令行设置上限）
+memory_budget = MemoryBudget()
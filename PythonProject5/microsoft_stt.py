@@ -76,6 +76,20 @@ class MicrosoftSTT:
         返回:
             识别文本
         """
+        result = self.transcribe_detailed(audio_path)
+        if result['RecognitionStatus'] == 'Success':
+            return result['DisplayText']
+        else:
+            self.logger.error(f"识别失败: {result.get('RecognitionStatus')}")
+            return ""
+
+    def transcribe_detailed(self, audio_path):
+        """
+        转录音频文件并返回完整响应
+
+        返回:
+            detailed格式的响应字典（含Offset/Duration/NBest）
+        """
         if not os.path.exists(audio_path):
             self.logger.error(f"音频文件不存在: {audio_path}")
             raise FileNotFoundError(f"音频文件不存在: {audio_path}")
@@ -95,19 +109,17 @@ class MicrosoftSTT:
         }
 
         try:
-            # 读取音频文件
-            with open(audio_path, 'rb') as audio_file:
-                audio_data = audio_file.read()
-
             self.logger.info(f"开始识别: {os.path.basename(audio_path)}")
             start_time = time.time()
 
-            response = requests.post(
-                self.stt_url,
-                headers=headers,
-                params=params,
-                data=audio_data
-            )
+            # 以文件对象流式上传，避免整段读入内存
+            with open(audio_path, 'rb') as audio_file:
+                response = requests.post(
+                    self.stt_url,
+                    headers=headers,
+                    params=params,
+                    data=audio_file
+                )
 
             response.raise_for_status()
             result = response.json()
@@ -115,11 +127,7 @@ class MicrosoftSTT:
             duration = time.time() - start_time
             self.logger.info(f"识别完成 | 耗时: {duration:.2f}s | 状态: {result.get('RecognitionStatus')}")
 
-            if result['RecognitionStatus'] == 'Success':
-                return result['DisplayText']
-            else:
-                self.logger.error(f"识别失败: {result.get('RecognitionStatus')}")
-                return ""
+            return result
 
         except Exception as e:
             self.logger.error(f"识别过程中出错: {str(e)}")
@@ -0,0 +1,97 @@
+import gc
+import json
+import time
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from stt_engine import STTEngine
+from ui_events import UIEventQueue
+
+logger = logging.getLogger(__name__)
+
+# 完成回调: (模型名, 引擎或None, 加载耗时, 预热耗时, 常驻内存增量字节数或None, 异常或None)
+LoadCallback = Callable[[str, Optional[STTEngine], float, float, Optional[int], Optional[Exception]], None]
+
+
+def build_engine(model_info: Dict, options: Optional[Dict] = None) -> STTEngine:
+    """按扫描得到的模型信息创建（单例）引擎；云服务读取其JSON配置"""
+    if model_info['engine'] in ('microsoft', 'tencent'):
+        with open(model_info['path'], 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        return STTEngine(model_config=config, lang=model_info['lang'], engine_type=model_info['engine'])
+    config = dict(options or {})
+    if model_info.get('rss'):
+        config['memory_estimate'] = model_info['rss']  # 模型清单中的实测值比按文件大小估算准确
+    return STTEngine(model_config=model_info['path'], lang=model_info['lang'],
+                     engine_type=model_info['engine'], config=config)
+
+
+class ModelLoader:
+    """
+    后台模型加载
+
+    创建引擎和预热都在工作线程中进行，进度与完成回调经UIEventQueue回到Tk主线程，
+    加载大模型期间界面保持响应。同一时间只允许一个加载任务。
+    引擎在加载和预热时各自记录常驻内存增量（STTEngine.memory_bytes），随完成回调返回。
+    """
+
+    def __init__(self, events: UIEventQueue):
+        self.events = events
+        self.model_name: Optional[str] = None  # 正在加载的模型（仅在主线程读写）
+
+    @property
+    def busy(self) -> bool:
+        return self.model_name is not None
+
+    def load(self, model_name: str, model_info: Dict, options: Optional[Dict], on_done: LoadCallback,
+             on_progress: Optional[Callable[[str], None]] = None) -> bool:
+        """
+        开始后台加载（在主线程调用）
+
+        Args:
+            on_done: 完成回调（主线程）
+            on_progress: 阶段进度回调（主线程），参数为显示文本
+
+        Returns:
+            已有加载任务在进行时返回False
+        """
+        if self.busy:
+            return False
+        self.model_name = model_name
+        threading.Thread(target=self._run, args=(model_name, model_info, options, on_done, on_progress),
+                         name="ModelLoader", daemon=True).start()
+        return True
+
+    def _run(self, model_name, model_info, options, on_done, on_progress):
+        def report(text: str):
+            self.events.status(f"{text}: {model_name}")
+            if on_progress:
+                self.events.call(on_progress, text)
+
+        engine, error = None, None
+        load_time = warm_time = 0.0
+        rss_delta = None
+        gc.collect()  # 先回收上一个模型，内存增量更准确
+        try:
+            report("模型加载中 (1/2)")
+            start = time.perf_counter()
+            engine = build_engine(model_info, options)
+            load_time = time.perf_counter() - start
+
+            # Vosk进程池模式下预热即启动各识别进程并在其中加载模型
+            report("启动识别进程并预热 (2/2)" if engine.uses_vosk_pool else "模型预热中 (2/2)")
+            try:
+                warm_time = engine.warm_up()
+            except Exception as e:
+                # 预热失败不影响使用，首个文件会慢一些
+                logger.warning(f"模型预热失败: {str(e)}", exc_info=True)
+            rss_delta = engine.model_rss
+        except Exception as e:
+            logger.error(f"后台加载模型失败: {str(e)}", exc_info=True)
+            engine, error = None, e
+        self.events.call(self._finish, on_done, model_name, engine, load_time, warm_time, rss_delta, error)
+
+    def _finish(self, on_done: LoadCallback, *args):
+        self.model_name = None
+        on_done(*args)
@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from typing import List, Optional
+
+PROFILE_MODES = ("sample", "cprofile")
+SAMPLE_INTERVAL = 0.005  # 采样间隔（秒）
+TOP_FUNCTIONS = 15
+
+# 空闲等待的栈顶函数（Tk事件循环、条件变量、线程池空闲），不计入热点
+IDLE_FUNCTIONS = {"mainloop", "wait", "_worker", "join"}
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    低开销采样分析器
+
+    后台线程按固定间隔读取sys._current_frames()，统计所有线程（工作线程、
+    线程池、Tk主线程）的调用栈，输出folded格式（flamegraph.pl / speedscope可直接读取）。
+    被分析的代码不需要任何改动，开销与采样频率成正比，与调用次数无关。
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> List[str]:
+        """按自身采样数（栈顶）排序的热点函数（忽略空闲等待）"""
+        self_counts = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            if leaf.split(" ", 1)[0] not in IDLE_FUNCTIONS:
+                self_counts[leaf] += count
+        total = sum(self_counts.values()) or 1
+        return [f"{count / total * 100:5.1f}%  {label}" for label, count in self_counts.most_common(limit)]
+
+
+class RunProfiler:
+    """
+    一次批处理运行的性能分析
+
+    sample模式：StackSampler采样所有线程，保存.folded火焰图数据；
+    cprofile模式：在调用start()的线程（处理线程）上启用cProfile，保存.prof
+    （可用snakeviz、`python -m pstats`查看），同时按自身耗时列出热点函数。
+    """
+
+    def __init__(self, mode: str, output_dir: str = "recognition_logs"):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的分析模式: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.output_path: Optional[str] = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._started = 0.0
+
+    @classmethod
+    def create(cls, mode: Optional[str], output_dir: str = "recognition_logs") -> Optional["RunProfiler"]:
+        """mode为空或不在PROFILE_MODES中时返回None（即不分析）"""
+        return cls(mode, output_dir) if mode in PROFILE_MODES else None
+
+    def start(self):
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = StackSampler()
+            self._sampler.start()
+
+    def stop(self, limit: int = TOP_FUNCTIONS) -> List[str]:
+        """停止分析并保存结果，返回用于日志面板的摘要行"""
+        elapsed = time.perf_counter() - self._started
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"profile_{time.strftime('%Y%m%d_%H%M%S')}")
+
+        if self.mode == "cprofile":
+            self._profile.disable()
+            self.output_path = base + ".prof"
+            self._profile.dump_stats(self.output_path)
+            top = self._cprofile_top(limit)
+        else:
+            self._sampler.stop()
+            self.output_path = base + ".folded"
+            self._sampler.write_folded(self.output_path)
+            top = self._sampler.top_functions(limit)
+
+        lines = [f"性能分析({self.mode}) 用时 {elapsed:.1f}s，结果已保存: {self.output_path}",
+                 "热点函数:"]
+        return lines + ["  " + line for line in top]
+
+    def _cprofile_top(self, limit: int) -> List[str]:
+        stats = pstats.Stats(self._profile)
+        total = stats.total_tt or 1
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        lines = []
+        for (filename, line, func), (_, calls, tottime, cumtime, _) in entries:
+            lines.append(f"{tottime / total * 100:5.1f}%  {tottime:8.3f}s 自身 / {cumtime:8.3f}s 累计  "
+                         f"{calls:>8} 次  {func} ({os.path.basename(filename)}:{line})")
+        return lines
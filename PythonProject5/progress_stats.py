@@ -0,0 +1,106 @@
+import time
+import threading
+from typing import Dict, Optional
+
+
+class ThroughputTracker:
+    """
+    按音频时长加权的进度与吞吐统计
+
+    进度 = 已完成音频秒数 / 总音频秒数，时长未知的文件按已知文件的平均时长估算。
+    实时率(RTF) = 识别耗时 / 音频时长，按引擎分别累计；音频小时/小时与RTF
+    只计入时长已知且实际送入引擎的文件，估算值和跳过的文件（重复、静音）不参与吞吐统计。
+    ETA按整体墙钟吞吐（已完成音频/已用时间）推算剩余音频所需时间。
+    工作线程调用file_done，界面线程调用snapshot，二者加锁互斥。
+    """
+
+    def __init__(self, durations: Dict[str, float]):
+        self._lock = threading.Lock()
+        self._durations = dict(durations)
+
+        known = [d for d in self._durations.values() if d > 0]
+        self._fallback = sum(known) / len(known) if known else 1.0
+
+        self.total_files = len(self._durations)
+        self.total_audio = sum(self._weight(path) for path in self._durations)
+        self.started_at = time.perf_counter()
+
+        self.done_files = 0
+        self.done_audio = 0.0
+        self.measured_audio = 0.0  # 已识别文件中时长已知的部分
+        self._engine_time: Dict[str, float] = {}
+        self._engine_audio: Dict[str, float] = {}
+
+    def _weight(self, path: str) -> float:
+        return self._durations.get(path) or self._fallback
+
+    def duration_of(self, path: str) -> Optional[float]:
+        """探测到的时长（未知为None）"""
+        return self._durations.get(path) or None
+
+    def file_done(self, path: str, elapsed: float, engine: str = "", skipped: bool = False):
+        """
+        记录一个文件完成（成功或失败都应调用，以保证进度能走到100%）
+
+        Args:
+            path: 文件路径
+            elapsed: 识别耗时（秒）
+            engine: 引擎名称，用于分引擎统计RTF
+            skipped: 未送入引擎（重复文件复用结果、静音跳过），只推进进度与ETA
+        """
+        audio = 0.0 if skipped else self._durations.get(path) or 0.0
+        with self._lock:
+            self.done_files += 1
+            self.done_audio += self._weight(path)
+            self.measured_audio += audio
+            if audio > 0 and engine:
+                self._engine_time[engine] = self._engine_time.get(engine, 0.0) + elapsed
+                self._engine_audio[engine] = self._engine_audio.get(engine, 0.0) + audio
+
+    def snapshot(self) -> Dict:
+        """当前统计的快照"""
+        with self._lock:
+            elapsed = time.perf_counter() - self.started_at
+            done_audio = self.done_audio
+            measured_audio = self.measured_audio
+            snapshot = {
+                'done_files': self.done_files,
+                'total_files': self.total_files,
+                'done_audio': done_audio,
+                'total_audio': self.total_audio,
+                'fraction': done_audio / self.total_audio if self.total_audio else 0.0,
+                'elapsed': elapsed,
+                'files_per_min': self.done_files / elapsed * 60 if elapsed > 0 else 0.0,
+                'audio_hours_per_hour': measured_audio / elapsed if elapsed > 0 else 0.0,
+                'engine_rtf': {
+                    engine: self._engine_time[engine] / audio
+                    for engine, audio in self._engine_audio.items() if audio > 0
+                },
+                'eta': None
+            }
+
+        if done_audio > 0 and elapsed > 0:
+            snapshot['eta'] = max(0.0, (self.total_audio - done_audio) * elapsed / done_audio)
+        return snapshot
+
+    @staticmethod
+    def format_seconds(seconds: Optional[float]) -> str:
+        if seconds is None:
+            return "--:--"
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+    @classmethod
+    def format(cls, snapshot: Dict) -> str:
+        """单行摘要，用于状态栏和命令行"""
+        parts = [
+            f"{snapshot['fraction'] * 100:.1f}%",
+            f"{snapshot['files_per_min']:.1f} 文件/分",
+            f"{snapshot['audio_hours_per_hour']:.1f} 音频小时/小时",
+        ]
+        for engine, rtf in snapshot['engine_rtf'].items():
+            parts.append(f"{engine} RTF {rtf:.2f}")
+        parts.append(f"剩余 {cls.format_seconds(snapshot['eta'])}")
+        return " | ".join(parts)
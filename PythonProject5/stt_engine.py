@@ -7,7 +7,11 @@ import tempfile
 import numpy as np
 import soundfile as sf
 import time
-from typing import Optional, Union, Dict, List
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Optional, Union, Dict, Iterable, Iterator, List, Tuple
 from vosk import Model, KaldiRecognizer
 import torch
 import whisper
@@ -15,6 +19,17 @@ import base64
 import logging
 import os
 import re
+from utils.pcm_cache import PCMCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from utils.wav_reader import MappedWav
+from transcript import Transcript
+from tracing import tracer
+from vosk_pool import VoskProcessPool, merge_chunk_results, DEFAULT_VOSK_WORKERS
+from utils.silence_split import plan_chunks
+from utils.decode_service import DecodeService, chain
+from utils.audio_stager import create_stager, INLINE_LIMIT
+from whisper_cpu import configure_threads, load_quantized_model, DEFAULT_QUANT_CACHE_DIR
+from memory_budget import memory_budget, estimate_model_memory, MemoryBudgetExceeded
+from utils.process_memory import rss_bytes
 
 try:
     from tencentcloud.asr.v20190614 import models as tencent_models
@@ -27,11 +42,41 @@ try:
 except ImportError:
     TENCENT_SDK_AVAILABLE = False
 
+# Whisper按窗口送入模型，长录音的内存占用与总时长无关；窗口在静音处切开并带重叠，
+# 句段按中点归属到唯一的窗口，切点处不会截断或重复
+WHISPER_WINDOW_SECONDS = 600
+
+# Whisper解码策略（config['whisper_profile']），未指定时使用whisper默认参数
+# temperature元组的长度即失败回退的最大重解码次数
+WHISPER_DECODING_PROFILES = {
+    # 吞吐优先：贪心解码、不回退、不以上文为条件
+    'fast': {'beam_size': None, 'best_of': None, 'temperature': (0.0,),
+             'condition_on_previous_text': False},
+    # 贪心解码，最多回退两次
+    'balanced': {'beam_size': None, 'best_of': 2, 'temperature': (0.0, 0.4, 0.8),
+                 'condition_on_previous_text': True},
+    # 质量优先：束搜索，完整回退
+    'accurate': {'beam_size': 5, 'best_of': 5, 'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+                 'condition_on_previous_text': True},
+}
+
+# 这些语言取值表示由Whisper自动检测
+WHISPER_AUTO_LANGUAGES = (None, "", "auto", "multilingual")
+
+# Vosk长录音在静音处分块并行识别的目标块长（秒），config['vosk_chunk_seconds']为0时不分块
+VOSK_CHUNK_SECONDS = 120
+
+# Vosk识别子进程除模型外的常驻内存（解释器、numpy、vosk库）
+VOSK_WORKER_OVERHEAD = 80 * 1024 ** 2
+
+# 腾讯云录音文件识别结果中的句级时间戳，如 [0:1.240,0:3.560]
+TENCENT_TIMESTAMP_PATTERN = re.compile(r'\[(\d+):(\d+\.\d+),(\d+):(\d+\.\d+)\]\s*([^\[]*)')
 
 
 class STTEngine:
     _instance = None
     _initialized = False
+    _standalone = False  # create()创建的独立实例不参与单例
 
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
@@ -44,7 +89,7 @@ class STTEngine:
                  engine_type: str = 'vosk',
                  config: Optional[Dict] = None):
 
-        if self.__class__._initialized:
+        if self.__class__._initialized and not self._standalone:
             return
 
         # 初始化日志
@@ -67,6 +112,18 @@ class STTEngine:
         self.engine_type = engine_type.lower()
         self.lang = lang
         self.config = config or {}
+        self._inference_lock = threading.Lock()  # Whisper模型不支持并发推理
+        self._model_lock = threading.Lock()  # Vosk模型在本进程中按需加载
+        self._vosk_pool: Optional[VoskProcessPool] = None  # 批量识别时按需启动
+
+        # 解码结果缓存（重复运行时跳过ffmpeg）
+        self.pcm_cache = PCMCache.instance(
+            cache_dir=self.config.get('pcm_cache_dir', DEFAULT_CACHE_DIR),
+            max_bytes=int(self.config.get('pcm_cache_max_mb', DEFAULT_MAX_BYTES // 1024 ** 2)) * 1024 ** 2
+        )
+        # 批量识别时提前读取并解码后续文件（config['read_workers']个读取线程、
+        # config['decode_workers']个解码线程）
+        self.decoder = DecodeService.instance(self.config.get('decode_workers'), self.config.get('read_workers'))
 
         # 处理模型配置
         if isinstance(model_config, dict):
@@ -85,8 +142,53 @@ class STTEngine:
         else:
             raise TypeError("model_config must be str or dict")
 
-        self.__class__._initialized = True
-        self._initialize_engine()
+        # 本地模型按估算（或config['memory_estimate']中的实测值）申请内存预算，超出时拒绝加载
+        self.memory_bytes = 0
+        self.memory_estimate = 0
+        self._pool_bytes = 0  # Vosk识别进程占用的预算（随进程池启停增减）
+        self._released = False
+        reserved = 0
+        if self.engine_type in ("vosk", "whisper"):
+            self.memory_estimate = int(self.config.get('memory_estimate') or estimate_model_memory(
+                self.engine_type, self.model_config, self.config.get('whisper_cpu_profile', 'fp32')))
+            reserved = memory_budget.admit(self.memory_estimate, self.memory_label)
+
+        if not self._standalone:
+            self.__class__._initialized = True
+        rss_before = rss_bytes()
+        try:
+            self._initialize_engine()
+        except Exception:
+            memory_budget.cancel(reserved)
+            raise
+
+        # 登记实测的常驻内存增量（无法测量时沿用估算值）
+        if self.engine_type in ("vosk", "whisper"):
+            rss_after = rss_bytes()
+            measured = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            if self.engine_type == "vosk" and self.vosk_model is None:
+                measured = 0  # 模型推迟到使用时加载，预留的额度随登记交回
+            self.memory_bytes = max(0, measured) if measured is not None else reserved
+            memory_budget.register(self, self.memory_label, self.memory_bytes,
+                                   reserved=reserved, evictable=self._standalone)
+
+    @property
+    def memory_label(self) -> str:
+        """内存记账中显示的模型名"""
+        name = os.path.basename(str(self.model_config).rstrip("\\/")) if isinstance(self.model_config, str) else ""
+        return f"{self.engine_type}/{name}" if name else self.engine_type
+
+    @property
+    def released(self) -> bool:
+        return getattr(self, '_released', False)
+
+    @classmethod
+    def create(cls, *args, **kwargs) -> "STTEngine":
+        """创建独立实例（不影响单例），用于同时保持多个模型常驻"""
+        engine = object.__new__(cls)
+        engine._standalone = True
+        engine.__init__(*args, **kwargs)
+        return engine
 
     @classmethod
     def reset_engine(cls):
@@ -123,9 +225,39 @@ class STTEngine:
         if not os.path.isdir(self.model_config):
             raise ValueError(f"VOSK model must be directory: {self.model_config}")
 
+        # 批量识别交给进程池时每个子进程各自加载模型，本进程的副本推迟到首次在本进程识别时再加载
+        self.vosk_model = None
+        if self.uses_vosk_pool:
+            self.logger.info(f"✅ VOSK model checked | Language: {self.lang} | 识别进程按需加载")
+            return
         self.vosk_model = Model(self.model_config)
         self.logger.info(f"✅ VOSK model loaded | Language: {self.lang}")
 
+    def _get_vosk_model(self) -> Model:
+        """本进程的Vosk模型（未加载时按估算申请内存预算后加载，并登记实测占用）"""
+        with self._model_lock:
+            if self.vosk_model is not None:
+                return self.vosk_model
+            memory_budget.pin(self)  # 申请额度时不淘汰自己
+            try:
+                reserved = memory_budget.admit(self.memory_estimate, self.memory_label)
+            finally:
+                memory_budget.unpin(self)
+            rss_before = rss_bytes()
+            try:
+                model = Model(self.model_config)
+            except Exception:
+                memory_budget.cancel(reserved)
+                raise
+            rss_after = rss_bytes()
+            measured = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            memory_budget.commit(self, reserved)
+            self.memory_bytes += max(0, measured) if measured is not None else reserved
+            memory_budget.update(self, self.memory_bytes)
+            self.vosk_model = model
+            self.logger.info(f"✅ VOSK model loaded in-process | Language: {self.lang}")
+            return model
+
     def _init_whisper(self):
         """初始化Whisper引擎"""
         device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -133,8 +265,18 @@ class STTEngine:
         if not (str(self.model_config).endswith('.pt') or os.path.isdir(self.model_config)):
             raise ValueError(f"Whisper model must be .pt file or directory: {self.model_config}")
 
-        self.whisper_model = whisper.load_model(self.model_config, device=device)
-        self.logger.info(f"✅ Whisper model loaded | Device: {device}")
+        # CPU推理：可选int8动态量化（config['whisper_cpu_profile'] = 'int8'）与线程数设置
+        profile = "fp16" if device == "cuda" else self.config.get('whisper_cpu_profile', 'fp32')
+        if device == "cpu":
+            configure_threads(self.config.get('torch_threads'), self.config.get('torch_interop_threads'))
+
+        if profile == "int8":
+            self.whisper_model = load_quantized_model(
+                self.model_config, self.config.get('whisper_quant_cache', DEFAULT_QUANT_CACHE_DIR))
+        else:
+            self.whisper_model = whisper.load_model(self.model_config, device=device)
+        self.whisper_fp16 = device == "cuda"
+        self.logger.info(f"✅ Whisper model loaded | Device: {device} | Profile: {profile}")
 
     def _init_microsoft(self):
         """初始化Microsoft Azure引擎"""
@@ -191,6 +333,14 @@ class STTEngine:
                 client_profile
             )
 
+            # 音频来源：base64内嵌(SourceType=1)或URL(SourceType=0)，auto时超过内嵌上限的文件走URL
+            self.tencent_source = self.model_config.get('source', 'auto')
+            if self.tencent_source not in ('auto', 'base64', 'url'):
+                raise ValueError(f"Unknown Tencent source: {self.tencent_source}")
+            self.tencent_stager = create_stager(self.model_config)
+            if self.tencent_source == 'url' and self.tencent_stager is None:
+                raise ValueError("Tencent source 'url' requires a 'stager' section")
+
             self.logger.info(f"✅ Tencent client initialized | Region: {self.model_config.get('region', 'ap-beijing')}")
 
         except Exception as e:
@@ -215,21 +365,25 @@ class STTEngine:
 
         self.logger.info(f"✅ Sphinx config loaded: {self.sphinx_config}")
 
-    def transcribe(self, audio_path: str) -> str:
+    def transcribe(self, audio_path: str, display_name: Optional[str] = None) -> str:
         """安全转录入口（添加实时显示功能）"""
+        return self.transcribe_detailed(audio_path, display_name).text
+
+    def transcribe_detailed(self, audio_path: str, display_name: Optional[str] = None) -> Transcript:
+        """转录并保留时间轴（词/句级起止时间与置信度）"""
         if not os.path.exists(audio_path):
             self.logger.error(f"File not exists: {audio_path}")
-            return ""
+            return Transcript()
 
-        temp_path = None
+        filename = display_name or os.path.basename(audio_path)
+        with tracer.bind_file(filename):
+            return self._transcribe_file(audio_path, filename)
+
+    def _transcribe_file(self, audio_path: str, filename: str) -> Transcript:
         try:
-            # 统一音频预处理
-            if not self._is_valid_audio(audio_path):
-                temp_path = self._convert_audio(audio_path)
-                audio_path = temp_path
+            audio_path = self._normalize_audio(audio_path)
 
             # 路由到对应引擎前显示文件名
-            filename = os.path.basename(audio_path)
             print(f"\n[开始识别] {filename}")  # 实时显示开始标记
 
             # 路由到对应引擎
@@ -247,19 +401,223 @@ class STTEngine:
                 raise ValueError(f"Unsupported engine type: {self.engine_type}")
 
             # 实时显示识别结果（核心添加点）
-            print(f"[识别结果] {result}")  # 单独一行更清晰
+            print(f"[识别结果] {result.text}")  # 单独一行更清晰
             return result
 
         except Exception as e:
             self.logger.error(f"Transcription error: {str(e)}", exc_info=True)
-            print(f"[识别失败] {os.path.basename(audio_path)}")  # 失败时也显示
-            return ""
+            print(f"[识别失败] {filename}")  # 失败时也显示
+            return Transcript()
+
+    def _normalize_audio(self, audio_path: str) -> str:
+        """统一音频预处理（Whisper始终走缓存，避免其内部再次调用ffmpeg），返回可直接识别的路径"""
+        with tracer.span("probe"):
+            needs_convert = self.engine_type == "whisper" or not self._is_valid_audio(audio_path)
+        if not needs_convert:
+            return audio_path
+        with tracer.span("convert"):
+            return self._convert_audio(audio_path)
+
+    def _read_audio(self, audio_path: str) -> str:
+        """在读取线程中预读一个文件（网络存储的读取延迟与识别重叠）"""
+        with tracer.span("read", os.path.basename(audio_path)):
+            return self.pcm_cache.read_ahead(audio_path)
+
+    def _prepare_audio(self, audio_path: str) -> str:
+        """在解码线程中预处理一个文件（span归属到该文件）"""
+        with tracer.bind_file(os.path.basename(audio_path)):
+            return self._normalize_audio(audio_path)
+
+    def _decode_ahead(self) -> int:
+        """批量识别时提前解码的文件数"""
+        return int(self.config.get('decode_ahead') or self.decoder.workers * 2)
+
+    def transcribe_channels(self, audio_path: str,
+                            channel_paths: Optional[List[str]] = None) -> List[Tuple[str, Transcript]]:
+        """
+        声道拆分识别：各声道（如坐席/客户）分别并发识别
+
+        Args:
+            channel_paths: 已拆分好的各声道缓存路径（批量识别时由解码线程提前拆分），为None时在此拆分
+
+        Returns:
+            [(说话人标签, Transcript), ...]，单声道音频只返回一项
+        """
+        if not os.path.exists(audio_path):
+            self.logger.error(f"File not exists: {audio_path}")
+            return []
+
+        filename = os.path.basename(audio_path)
+        if channel_paths is None:
+            try:
+                channel_paths = self.pcm_cache.split_channels(audio_path)
+            except Exception as e:
+                self.logger.error(f"Channel split failed: {str(e)}", exc_info=True)
+                return []
+
+        labels = list(self.config.get('channel_labels') or [])
+        labels += [f"声道{i + 1}" for i in range(len(labels), len(channel_paths))]
+        names = [f"{filename} [{labels[i]}]" for i in range(len(channel_paths))]
+
+        with ThreadPoolExecutor(max_workers=len(channel_paths)) as pool:
+            transcripts = list(pool.map(self.transcribe_detailed, channel_paths, names))
+
+        return list(zip(labels, transcripts))
+
+    def transcribe_many(self, paths: Iterable[str],
+                        workers: Optional[int] = None) -> Iterator[Tuple[str, Transcript, float]]:
+        """
+        批量转录，按输入顺序逐个产出(路径, Transcript, 识别耗时)
+
+        Vosk在可用多个进程时（config['vosk_workers']，默认DEFAULT_VOSK_WORKERS，受内存预算限制）
+        交给进程池并行识别，workers限制本次同时在识别的文件数（与其他引擎并发时分摊CPU）；
+        其他引擎逐个调用transcribe_detailed。两种方式都由DecodeService提前读取并解码后续文件，
+        识别耗时不含读取和解码。
+        """
+        if self.uses_vosk_pool:
+            pool = self._ensure_vosk_pool()
+            if pool is not None:
+                yield from self._transcribe_many_vosk(pool, paths, workers)
+                return
+            self._get_vosk_model()  # 进程池启动不了时在本进程识别，内存不足在这里报一次
+
+        for path, decoded in self.decoder.prefetch(paths, self._prepare_audio, self._decode_ahead(),
+                                                   read=self._read_audio):
+            filename = os.path.basename(path)
+            try:
+                with tracer.span("queue-wait", filename):
+                    audio_path = decoded.result()
+            except Exception as e:
+                self.logger.error(f"Decode error: {filename}: {str(e)}")
+                audio_path = path  # 交给单文件流程处理（记录错误并返回空结果）
+            started = time.perf_counter()
+            transcript = self.transcribe_detailed(audio_path, filename)
+            yield path, transcript, time.perf_counter() - started
+
+    def transcribe_channels_many(self, paths: Iterable[str]) -> Iterator[Tuple[str, List[Tuple[str, Transcript]], float]]:
+        """声道拆分批量识别：后续文件的读取、解码与解交错提前在后台线程中完成"""
+        for path, split in self.decoder.prefetch(paths, self.pcm_cache.split_channels, self._decode_ahead(),
+                                                 read=self._read_audio):
+            try:
+                channel_paths = split.result()
+            except Exception as e:
+                # 拆分失败的文件不在识别线程中重新解码，直接返回空结果
+                self.logger.error(f"Channel split failed: {os.path.basename(path)}: {str(e)}")
+                yield path, [], 0.0
+                continue
+            started = time.perf_counter()
+            channel_results = self.transcribe_channels(path, channel_paths)
+            yield path, channel_results, time.perf_counter() - started
+
+    def _vosk_worker_count(self) -> int:
+        """识别进程数（每个进程一份模型）"""
+        return int(self.config.get('vosk_workers') or DEFAULT_VOSK_WORKERS)
+
+    def _vosk_thread_count(self) -> int:
+        """单个长录音分块识别的线程数（线程共用本进程的模型，不额外占用模型内存）"""
+        return int(self.config.get('vosk_threads') or os.cpu_count() or 1)
+
+    def _vosk_chunk_seconds(self) -> float:
+        return float(self.config.get('vosk_chunk_seconds', VOSK_CHUNK_SECONDS))
+
+    def _ensure_vosk_pool(self) -> Optional[VoskProcessPool]:
+        """
+        按需启动Vosk进程池
+
+        每个子进程各自加载一份完整模型，启动前按 进程数×单份占用 申请内存预算：
+        放不下时减少进程数，连两个进程都放不下则返回None，由本进程逐个识别。
+        """
+        if self._vosk_pool is not None:
+            return self._vosk_pool
+
+        model_bytes = self.memory_bytes if self.vosk_model is not None else self.memory_estimate
+        per_worker = (model_bytes or self.memory_estimate) + VOSK_WORKER_OVERHEAD
+        memory_budget.pin(self)  # 申请额度时不淘汰自己
+        try:
+            for workers in range(self._vosk_worker_count(), 1, -1):
+                try:
+                    reserved = memory_budget.admit(workers * per_worker, f"{self.memory_label} ×{workers}进程")
+                except MemoryBudgetExceeded:
+                    continue
+                break
+            else:
+                self.logger.warning("内存预算不足以启动Vosk识别进程，改为在本进程中逐个识别")
+                return None
         finally:
-            if temp_path and os.path.exists(temp_path):
+            memory_budget.unpin(self)
+
+        if workers < self._vosk_worker_count():
+            self.logger.warning(f"内存预算不足，Vosk识别进程数从 {self._vosk_worker_count()} 减为 {workers}")
+        try:
+            self._vosk_pool = VoskProcessPool(self.model_config, workers)
+        except Exception:
+            memory_budget.cancel(reserved)
+            raise
+        self._pool_bytes = reserved
+        self.memory_bytes += reserved
+        memory_budget.commit(self, reserved)
+        return self._vosk_pool
+
+    def _stop_vosk_pool(self):
+        """关闭进程池并交回其内存预算"""
+        pool, self._vosk_pool = self._vosk_pool, None
+        if pool is None:
+            return
+        pool.shutdown(wait=False)
+        self.memory_bytes = max(0, self.memory_bytes - self._pool_bytes)
+        self._pool_bytes = 0
+        memory_budget.update(self, self.memory_bytes)
+
+    def _transcribe_many_vosk(self, pool: VoskProcessPool, paths: Iterable[str],
+                              workers: Optional[int] = None) -> Iterator[Tuple[str, Transcript, float]]:
+        """
+        进程池识别：最多提前提交两倍进程数的文件，停止迭代时取消未开始的任务
+
+        workers少于进程数时只保持workers个文件在途，其余进程空闲，不与并发的其他引擎争抢CPU。
+        """
+        paths = iter(paths)
+        ahead = workers if workers and workers < pool.workers else pool.workers * 2
+        pending = deque((path, self._submit_vosk(pool, path)) for path in islice(paths, ahead))
+        try:
+            while pending:
+                path, future = pending.popleft()
                 try:
-                    os.remove(temp_path)
-                except:
-                    pass
+                    results, elapsed = future.result()
+                    with tracer.span("post-process", os.path.basename(path)):
+                        transcript = Transcript.from_vosk_results(results)
+                except Exception as e:
+                    self.logger.error(f"Transcription error: {os.path.basename(path)}: {str(e)}")
+                    transcript, elapsed = Transcript(), 0.0
+
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, self._submit_vosk(pool, next_path)))
+                yield path, transcript, elapsed
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def _submit_vosk(self, pool: VoskProcessPool, audio_path: str) -> Future:
+        """
+        在解码线程中预处理，完成后提交到进程池
+
+        立即返回代表整个流程的Future（失败时带异常），调用方按提交顺序取结果。
+        """
+        filename = os.path.basename(audio_path)
+
+        def submit(wav_path: str) -> Future:
+            with tracer.bind_file(filename):
+                with tracer.span("load"):
+                    return pool.submit(wav_path, self._vosk_chunk_seconds())
+
+        return chain(self.decoder.submit(audio_path, self._prepare_audio, read=self._read_audio), submit)
+
+    @staticmethod
+    def format_channel_text(channel_results: List[Tuple[str, Transcript]]) -> str:
+        """把声道识别结果合并为带说话人标签的文本"""
+        if len(channel_results) == 1:
+            return channel_results[0][1].text
+        return "\n".join(f"[{speaker}] {t.text}" for speaker, t in channel_results if t.text)
 
     def _is_valid_audio(self, path: str) -> bool:
         """检查音频格式"""
@@ -277,108 +635,221 @@ class STTEngine:
             return False
 
     def _convert_audio(self, input_path: str) -> str:
-        """音频格式转换"""
-        temp_path = os.path.join(
-            tempfile.gettempdir(),
-            f"stt_convert_{os.path.basename(input_path)}.wav"
-        )
+        """音频格式转换（结果写入PCM缓存，重复运行直接命中）"""
+        return self.pcm_cache.get_wav(input_path)
+
+    def _transcribe_with_vosk(self, audio_path: str) -> Transcript:
+        """
+        VOSK转录（保留词级时间戳）
+
+        长录音在静音处切成带重叠的块，各块用独立的识别器在线程中并行解码
+        （共享同一个Model，解码在C层进行不占GIL），再按词中点去重合并。
+        """
+        with tracer.span("load"):
+            wav = MappedWav(audio_path)
+        with wav:
+            pcm = wav.channel(0)
+            chunks = plan_chunks(pcm, wav.sample_rate, self._vosk_chunk_seconds())
+            with tracer.span("decode"):
+                if len(chunks) == 1:
+                    chunk_results = [self._recognize_pcm(pcm)]
+                else:
+                    workers = min(len(chunks), self._vosk_thread_count())
+                    with ThreadPoolExecutor(max_workers=workers) as pool:
+                        chunk_results = list(pool.map(
+                            lambda chunk: self._recognize_pcm(pcm[chunk[0]:chunk[1]]), chunks))
+
+        with tracer.span("post-process"):
+            return Transcript.from_vosk_results(merge_chunk_results(chunk_results, chunks, 16000))
+
+    def _recognize_pcm(self, pcm: np.ndarray, frames: int = 2000) -> List[Dict]:
+        """用新的识别器解码一段PCM（mmap视图切片，仅拷贝当前小块交给识别器）"""
+        recognizer = KaldiRecognizer(self._get_vosk_model(), 16000)
+        recognizer.SetWords(True)
+        results = []
+        for offset in range(0, len(pcm), frames):
+            if recognizer.AcceptWaveform(pcm[offset:offset + frames].tobytes()):
+                results.append(json.loads(recognizer.Result()))
+        results.append(json.loads(recognizer.FinalResult()))
+        return results
+
+    def detect_language(self, audio_path: str) -> Optional[str]:
+        """用Whisper对前30秒做语种识别，返回语言代码（非Whisper引擎返回None）"""
+        if self.engine_type != "whisper":
+            return None
+        with MappedWav(self._convert_audio(audio_path)) as wav:
+            audio = wav.to_float32(wav.samples[:30 * wav.sample_rate, 0])
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=self.whisper_model.dims.n_mels)
+        with self._inference_lock:
+            _, probs = self.whisper_model.detect_language(mel.to(self.whisper_model.device))
+        return max(probs, key=probs.get)
+
+    def configure(self, **options):
+        """更新运行时选项（如解码策略），值为None的项恢复默认"""
+        for key, value in options.items():
+            if value is None:
+                self.config.pop(key, None)
+            else:
+                self.config[key] = value
+
+    def _whisper_options(self) -> Dict:
+        """当前解码策略对应的transcribe参数"""
+        options = dict(WHISPER_DECODING_PROFILES.get(self.config.get('whisper_profile'), {}))
+        language = self.config.get('whisper_language') or self.lang
+        options['language'] = None if language in WHISPER_AUTO_LANGUAGES else language
+        return options
+
+    def _transcribe_with_whisper(self, audio_path: str) -> Transcript:
+        """Whisper转录（在静音处切窗口并从映射中取样，不整段加载，保留句级segments）"""
+        options = self._whisper_options()
+        texts = []
+        transcript = Transcript()
+        with tracer.span("load"):
+            wav = MappedWav(audio_path)
+        with wav:
+            pcm = wav.channel(0)
+            sample_rate = wav.sample_rate
+            for start, end, own_start, own_end in plan_chunks(pcm, sample_rate, WHISPER_WINDOW_SECONDS):
+                audio = wav.to_float32(pcm[start:end])
+                with tracer.span("queue-wait"):
+                    self._inference_lock.acquire()
+                try:
+                    with tracer.span("decode"):
+                        result = self.whisper_model.transcribe(audio, fp16=self.whisper_fp16, **options)
+                    # 自动检测只在首个窗口做一次，后续窗口沿用
+                    options['language'] = options['language'] or result.get('language')
+                finally:
+                    self._inference_lock.release()
+                with tracer.span("post-process"):
+                    # 只保留中点落在本窗口自有范围内的句段，重叠部分由相邻窗口之一负责
+                    offset = start / sample_rate
+                    # 首尾窗口不设外侧边界（Whisper的时间戳可能略超出音频末尾）
+                    low = own_start / sample_rate if own_start > 0 else float('-inf')
+                    high = own_end / sample_rate if own_end < len(pcm) else float('inf')
+                    segments = [seg for seg in result.get("segments", [])
+                                if low <= offset + (seg["start"] + seg["end"]) / 2 < high]
+                    text = "".join(seg.get("text", "") for seg in segments).strip()
+                    if text:
+                        texts.append(text)
+                    transcript.extend(Transcript.from_whisper_segments(segments), offset=offset)
+        transcript.text = " ".join(texts)
+        return transcript
+
+    def _transcribe_with_microsoft(self, audio_path: str) -> Transcript:
+        """Microsoft转录（detailed格式中的Offset/Duration单位为100ns）"""
+        with tracer.span("upload"):
+            result = self.microsoft_client.transcribe_detailed(audio_path)
+        if result.get('RecognitionStatus') != 'Success':
+            return Transcript()
+
+        transcript = Transcript(result.get('DisplayText', ""))
+        if 'Offset' in result and 'Duration' in result:
+            best = (result.get('NBest') or [{}])[0]
+            start = result['Offset'] / 1e7
+            transcript.add(start, start + result['Duration'] / 1e7,
+                           transcript.text, best.get('Confidence', 1.0))
+        return transcript
+
+    def _tencent_use_url(self, size: int) -> bool:
+        """是否以URL方式提交（auto时超过base64上限且配置了暂存方式）"""
+        if self.tencent_source != 'auto':
+            return self.tencent_source == 'url'
+        if size <= INLINE_LIMIT:
+            return False
+        if self.tencent_stager is None:
+            self.logger.warning(f"Audio exceeds Tencent inline limit ({size} bytes); configure 'stager' for URL mode")
+            return False
+        return True
 
-        cmd = ["ffmpeg", "-i", input_path, "-ar", "16000", "-ac", "1"]
-        if self.engine_type in ("tencent", "vosk"):
-            cmd.extend(["-acodec", "pcm_s16le"])
-        cmd.extend(["-y", temp_path])
-
-        subprocess.run(cmd, check=True, capture_output=True)
-        return temp_path
-
-    def _transcribe_with_vosk(self, audio_path: str) -> str:
-        """VOSK转录"""
-        recognizer = KaldiRecognizer(self.vosk_model, 16000)
-        result = []
-
-        with open(audio_path, "rb") as f:
-            while True:
-                data = f.read(4000)
-                if not data:
-                    break
-                if recognizer.AcceptWaveform(data):
-                    res = json.loads(recognizer.Result())
-                    if res["text"]:
-                        result.append(res["text"])
-
-        final_res = json.loads(recognizer.FinalResult())
-        if final_res["text"]:
-            result.append(final_res["text"])
-
-        return " ".join(result).strip()
-
-    def _transcribe_with_whisper(self, audio_path: str) -> str:
-        """Whisper转录"""
-        result = self.whisper_model.transcribe(audio_path, language=self.lang)
-        return result["text"].strip()
-
-    def _transcribe_with_microsoft(self, audio_path: str) -> str:
-        """Microsoft转录"""
-        return self.microsoft_client.transcribe(audio_path)
-
-    def _transcribe_with_tencent(self, audio_path: str) -> str:
-        """腾讯云转录"""
-        try:
-            # 1. 读取音频文件
-            with open(audio_path, 'rb') as f:
-                audio_data = f.read()
+    def _transcribe_with_tencent(self, audio_path: str) -> Transcript:
+        """
+        腾讯云转录
 
-            # 2. 创建识别任务请求
+        小文件对文件映射做base64内嵌在请求中；大文件（或source为url时）先流式上传到
+        暂存服务，请求只携带URL，文件大小不再受内嵌上限和内存限制。
+        """
+        staged_url = None
+        try:
+            # 1-2. 创建识别任务请求
             req = tencent_models.CreateRecTaskRequest()
             req.EngineModelType = "16k_zh"
             req.ChannelNum = 1
-            req.SourceType = 1  # 1表示语音数据是base64编码
             req.ResTextFormat = 0  # 0表示识别结果文本
-            req.Data = base64.b64encode(audio_data).decode('utf-8')
+            with tracer.span("load"):
+                wav = MappedWav(audio_path)
+            with wav:
+                duration = wav.duration
+                if self._tencent_use_url(len(wav.raw)):
+                    req.SourceType = 0  # 0表示语音URL
+                    with tracer.span("upload"):
+                        staged_url = self.tencent_stager.stage(audio_path)
+                    req.Url = staged_url
+                else:
+                    req.SourceType = 1  # 1表示语音数据是base64编码（不额外读入整段原始数据）
+                    with tracer.span("encode"):
+                        req.Data = base64.b64encode(wav.raw).decode('utf-8')
 
             # 3. 发送请求
-            resp = self.tencent_client.CreateRecTask(req)
+            with tracer.span("upload"):
+                resp = self.tencent_client.CreateRecTask(req)
             task_id = resp.Data.TaskId
             self.logger.info(f"Tencent task created | TaskId: {task_id}")
 
-            # 4. 获取结果
-            start_time = time.time()
-            while time.time() - start_time < 30:  # 30秒超时
-                req = tencent_models.DescribeTaskStatusRequest()
-                req.TaskId = task_id
-                status = self.tencent_client.DescribeTaskStatus(req)
+            # 4. 获取结果（轮询等待计入queue-wait；长录音按时长放宽超时）
+            with tracer.span("queue-wait"):
+                status = self._wait_tencent_task(task_id, timeout=max(30.0, duration))
+
+            raw_result = status.Data.Result
+            if not raw_result:
+                return Transcript()
 
-                if status.Data.Status == 2:  # 成功
-                    # ============== 新增内容开始 ==============
-                    raw_result = status.Data.Result
-                    if not raw_result:
-                        return ""
-                    # 方案2：正则处理（应对多段情况）
+            with tracer.span("post-process"):
+                # 正则处理（应对多段情况）
+                clean_result = re.sub(r'\[\d+:\d+\.\d+,\d+:\d+\.\d+\]\s*', '', raw_result)
 
-                    clean_result = re.sub(r'\[\d+:\d+\.\d+,\d+:\d+\.\d+\]\s*', '', raw_result)
+                # 保留句级时间戳
+                transcript = Transcript(clean_result)
+                for m in TENCENT_TIMESTAMP_PATTERN.finditer(raw_result):
+                    text = m.group(5).strip()
+                    if text:
+                        start = int(m.group(1)) * 60 + float(m.group(2))
+                        end = int(m.group(3)) * 60 + float(m.group(4))
+                        transcript.add(start, end, text)
+                return transcript
 
-                    return clean_result
-                    # ============== 新增内容结束 ==============
+        except Exception as e:
+            self.logger.error(f"Tencent transcription failed: {str(e)}")
+            return Transcript()
+        finally:
+            if staged_url:
+                self.tencent_stager.release(staged_url)
 
-                elif status.Data.Status == 3:  # 失败
-                    raise Exception(f"Recognition failed: {status.Data.StatusStr}")
+    def _wait_tencent_task(self, task_id, timeout: float = 30):
+        """轮询腾讯云任务状态直到完成，返回状态响应"""
+        start_time = time.time()
+        while time.time() - start_time < timeout:
+            req = tencent_models.DescribeTaskStatusRequest()
+            req.TaskId = task_id
+            status = self.tencent_client.DescribeTaskStatus(req)
 
-                time.sleep(1)
+            if status.Data.Status == 2:  # 成功
+                return status
+            elif status.Data.Status == 3:  # 失败
+                raise Exception(f"Recognition failed: {status.Data.StatusStr}")
 
-            raise Exception("Result timeout")
+            time.sleep(1)
 
-        except Exception as e:
-            self.logger.error(f"Tencent transcription failed: {str(e)}")
-            return ""
+        raise Exception("Result timeout")
 
-    def _transcribe_with_sphinx(self, audio_path: str) -> str:
-        """Sphinx转录"""
+    def _transcribe_with_sphinx(self, audio_path: str) -> Transcript:
+        """Sphinx转录（仅文本，无时间轴）"""
         from pocketsphinx import AudioFile
         audio = AudioFile(
             audio_file=audio_path,
             **self.sphinx_config
         )
-        return " ".join([str(seg) for seg in audio]).strip()
+        with tracer.span("decode"):
+            return Transcript(" ".join([str(seg) for seg in audio]).strip())
 
     def test_model(self, test_audio: Optional[str] = None) -> str:
         """测试模型"""
@@ -399,6 +870,77 @@ class STTEngine:
 
         return result
 
+    def warm_up(self, seconds: float = 2.0) -> float:
+        """
+        用内存中的合成音频完整跑一遍推理，返回耗时（秒）
+
+        首次推理会构建mel滤波器组、分配张量缓存并选定算子实现（Whisper），
+        或初始化解码图（Vosk）；预热后第一个真实文件不会比后续文件慢。
+        Vosk交给进程池识别时，预热会启动全部识别进程并让每个进程加载模型。
+        不写临时文件，云端引擎无需预热直接返回0。
+        """
+        if self.engine_type not in ("vosk", "whisper"):
+            return 0.0
+        if self.uses_vosk_pool and self._ensure_vosk_pool() is not None:
+            return self._warm_up_vosk_pool()
+
+        start = time.perf_counter()
+        rss_before = rss_bytes()
+        t = np.arange(int(16000 * seconds), dtype=np.float32) / 16000
+        audio = 0.1 * np.sin(2 * np.pi * 440 * t).astype(np.float32)
+        if self.engine_type == "vosk":
+            self._recognize_pcm((audio * 32767).astype('<i2'))
+        else:
+            with self._inference_lock:
+                self.whisper_model.transcribe(audio, fp16=self.whisper_fp16, **self._whisper_options())
+        elapsed = time.perf_counter() - start
+
+        # 预热分配的缓存也计入该模型的内存占用
+        rss_after = rss_bytes()
+        if rss_before is not None and rss_after is not None and rss_after > rss_before:
+            self.memory_bytes += rss_after - rss_before
+            memory_budget.update(self, self.memory_bytes)
+        self.logger.info(f"🔥 Engine warmed up in {elapsed:.2f}s")
+        return elapsed
+
+    @property
+    def model_rss(self) -> Optional[int]:
+        """本进程中一份模型的常驻内存（不含识别进程；模型只在子进程中加载时为None）"""
+        if self.engine_type == "vosk" and self.vosk_model is None:
+            return None
+        return max(0, self.memory_bytes - self._pool_bytes) or None
+
+    @property
+    def uses_vosk_pool(self) -> bool:
+        """批量识别是否交给Vosk进程池（此时模型由各子进程加载）"""
+        return self.engine_type == "vosk" and self._vosk_worker_count() > 1
+
+    def _warm_up_vosk_pool(self) -> float:
+        """启动进程池并让每个子进程加载模型、跑一遍合成音频，首个批次不再等待进程启动"""
+        start = time.perf_counter()
+        ready = self._vosk_pool.warm_up()
+        elapsed = time.perf_counter() - start
+        if ready < self._vosk_pool.workers:
+            self.logger.warning(f"Vosk识别进程预热超时: {ready}/{self._vosk_pool.workers} 个就绪")
+        self.logger.info(f"🔥 Vosk pool warmed up in {elapsed:.2f}s | {ready} 个进程")
+        return elapsed
+
+    def release_resources(self):
+        """释放模型和进程池；单例实例同时重置单例以便用新参数重新创建"""
+        if getattr(self, '_vosk_pool', None) is not None:
+            self._stop_vosk_pool()
+        stager = getattr(self, 'tencent_stager', None)
+        if stager is not None:
+            stager.close()
+            self.tencent_stager = None
+        for attr in ('vosk_model', 'whisper_model', 'microsoft_client', 'tencent_client'):
+            if hasattr(self, attr):
+                setattr(self, attr, None)
+        self._released = True
+        memory_budget.unregister(self)
+        if not self._standalone:
+            self.reset_instance()
+
     @classmethod
     def reset_instance(cls):
         """重置单例实例"""
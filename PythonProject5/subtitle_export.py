@@ -0,0 +1,298 @@
+import os
+import heapq
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from transcript import Transcript
+
+logger = logging.getLogger(__name__)
+
+# 字幕排版默认参数（剪映等编辑器常用的中文字幕规范）
+MAX_LINE_CHARS = 18       # 每行最大字符数（中文字符计1，英文按宽度折半）
+MAX_LINES = 2             # 每条字幕最多行数
+MAX_CUE_DURATION = 6.0    # 单条字幕最长显示秒数
+MAX_CPS = 9.0             # 阅读速度上限（字符/秒）
+MIN_CUE_DURATION = 0.8    # 单条字幕最短显示秒数
+PAUSE_SPLIT = 0.6         # 词间停顿超过该值时断句
+
+SENTENCE_BREAKS = "。！？!?；;"
+CLAUSE_BREAKS = "，,、：:"
+
+Cue = Tuple[float, float, str]
+
+
+def _is_wide(ch: str) -> bool:
+    return ord(ch) > 0x2E80
+
+
+def text_width(text: str) -> float:
+    """显示宽度：全角字符计1，半角字符计0.5"""
+    return sum(1.0 if _is_wide(ch) else 0.5 for ch in text)
+
+
+def _join(left: str, right: str) -> str:
+    """拼接词：中文直接相连，英文/数字之间补空格"""
+    if not left:
+        return right
+    if left[-1].isascii() and left[-1].isalnum() and right[:1].isascii() and right[:1].isalnum():
+        return f"{left} {right}"
+    return left + right
+
+
+def _split_long_text(text: str, max_width: float) -> List[str]:
+    """把超长文本按标点优先、宽度兜底切成若干段"""
+    pieces = []
+    current = ""
+    for ch in text:
+        if not current and pieces and ch in SENTENCE_BREAKS + CLAUSE_BREAKS:
+            pieces[-1] += ch  # 标点不放在段首
+            continue
+        current += ch
+        if ch in SENTENCE_BREAKS or (ch in CLAUSE_BREAKS and text_width(current) >= max_width / 2):
+            pieces.append(current.strip())
+            current = ""
+        elif text_width(current) >= max_width:
+            # 英文尽量在空格处断开
+            cut = current.rfind(" ")
+            if cut > 0:
+                pieces.append(current[:cut].strip())
+                current = current[cut + 1:]
+            else:
+                pieces.append(current.strip())
+                current = ""
+    if current.strip():
+        pieces.append(current.strip())
+    return [p for p in pieces if p]
+
+
+def wrap_lines(text: str, max_line_chars: float = MAX_LINE_CHARS) -> str:
+    """按行宽折行（尽量均分为两行）"""
+    if text_width(text) <= max_line_chars:
+        return text
+    target = text_width(text) / 2
+    width = 0.0
+    best = None
+    for i, ch in enumerate(text):
+        width += 1.0 if _is_wide(ch) else 0.5
+        if width >= target:
+            # 优先在空格或标点后换行
+            for j in range(i, max(0, i - 6), -1):
+                if text[j] == " " or text[j] in CLAUSE_BREAKS + SENTENCE_BREAKS:
+                    best = j + 1
+                    break
+            best = best or i + 1
+            break
+    return f"{text[:best].strip()}\n{text[best:].strip()}" if best else text
+
+
+def _iter_units(transcript: Transcript, max_width: float,
+                max_line_chars: float = MAX_LINE_CHARS, max_cps: float = MAX_CPS) -> Iterator[Cue]:
+    """
+    把时间轴拆成不超过单条字幕宽度的单元（句级结果按字数比例分配时间）
+
+    语速超过max_cps的单元（如2秒说完的长句段）再按该时长可读的字数切开，
+    但每段不短于一行，交给build_cues分成多条字幕。
+    """
+    for start, end, _, token in transcript:
+        token = token.strip()
+        if not token:
+            continue
+        width = text_width(token)
+        limit = max_width
+        if width / max(end - start, MIN_CUE_DURATION) > max_cps:
+            limit = min(max_width, max(max_line_chars, max_cps * (end - start)))
+        if width <= limit:
+            yield start, end, token
+            continue
+
+        pieces = _split_long_text(token, limit)
+        total = sum(len(p) for p in pieces) or 1
+        cursor = start
+        for piece in pieces:
+            span = (end - start) * len(piece) / total
+            yield cursor, cursor + span, piece
+            cursor += span
+
+
+def build_cues(transcript: Transcript,
+               max_line_chars: float = MAX_LINE_CHARS,
+               max_lines: int = MAX_LINES,
+               max_duration: float = MAX_CUE_DURATION,
+               max_cps: float = MAX_CPS,
+               pause_split: float = PAUSE_SPLIT) -> Iterator[Cue]:
+    """
+    由时间轴流式生成字幕条目
+
+    按宽度、时长、阅读速度、停顿和句末标点断句：合并后超过max_cps字符/秒的单元另起一条；
+    每条字幕至少显示到满足阅读速度（字符数/max_cps），但不会与下一条重叠。
+    """
+    max_width = max_line_chars * max_lines
+    pending: Optional[List] = None  # 已生成、等待确认结束时间的条目
+    cur_start = cur_end = None
+    cur_text = ""
+
+    def finish(start, end, text):
+        nonlocal pending
+        cue = None
+        if pending is not None:
+            # 阅读速度不足时延长，最多延长到下一条开始
+            p_start, p_end, p_text = pending
+            need = max(MIN_CUE_DURATION, text_width(p_text) / max_cps)
+            cue = (p_start, max(p_end, min(p_start + need, start)), p_text)
+        pending = [start, end, text]
+        return cue
+
+    for start, end, token in _iter_units(transcript, max_width, max_line_chars, max_cps):
+        if cur_text:
+            candidate = _join(cur_text, token)
+            if (text_width(candidate) > max_width or
+                    end - cur_start > max_duration or
+                    text_width(candidate) / max(end - cur_start, MIN_CUE_DURATION) > max_cps or
+                    start - cur_end > pause_split or
+                    cur_text[-1] in SENTENCE_BREAKS):
+                cue = finish(cur_start, cur_end, cur_text)
+                if cue:
+                    yield cue
+                cur_start, cur_end, cur_text = start, end, token
+            else:
+                cur_end, cur_text = end, candidate
+        else:
+            cur_start, cur_end, cur_text = start, end, token
+
+    if cur_text:
+        cue = finish(cur_start, cur_end, cur_text)
+        if cue:
+            yield cue
+    if pending is not None:
+        p_start, p_end, p_text = pending
+        need = max(MIN_CUE_DURATION, text_width(p_text) / max_cps)
+        yield p_start, max(p_end, p_start + need), p_text
+
+
+def _format_time(seconds: float, sep: str) -> str:
+    millis = int(round(max(0.0, seconds) * 1000))
+    hours, millis = divmod(millis, 3600000)
+    minutes, millis = divmod(millis, 60000)
+    secs, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{sep}{millis:03d}"
+
+
+def write_srt(cues: Iterable[Cue], f, max_line_chars: float = MAX_LINE_CHARS) -> int:
+    """流式写出SRT，返回条目数"""
+    count = 0
+    for count, (start, end, text) in enumerate(cues, 1):
+        f.write(f"{count}\n{_format_time(start, ',')} --> {_format_time(end, ',')}\n"
+                f"{wrap_lines(text, max_line_chars)}\n\n")
+    return count
+
+
+def write_vtt(cues: Iterable[Cue], f, max_line_chars: float = MAX_LINE_CHARS) -> int:
+    """流式写出WebVTT，返回条目数"""
+    f.write("WEBVTT\n\n")
+    count = 0
+    for count, (start, end, text) in enumerate(cues, 1):
+        f.write(f"{_format_time(start, '.')} --> {_format_time(end, '.')}\n"
+                f"{wrap_lines(text, max_line_chars)}\n\n")
+    return count
+
+
+def result_cues(result: Dict, **options) -> Iterator[Cue]:
+    """单个识别结果的字幕条目；声道拆分结果按时间合并并加说话人标签"""
+    channels = result.get('channels')
+    if channels:
+        streams = []
+        for ch in channels:
+            transcript = ch.get('transcript')
+            if transcript is not None and transcript.has_timing:
+                streams.append(_tag_speaker(build_cues(transcript, **options), ch['speaker']))
+        return heapq.merge(*streams, key=lambda cue: cue[0])
+
+    transcript = result.get('transcript')
+    if transcript is None or not transcript.has_timing:
+        return iter(())
+    return build_cues(transcript, **options)
+
+
+def _tag_speaker(cues: Iterator[Cue], speaker: str) -> Iterator[Cue]:
+    for start, end, text in cues:
+        yield start, end, f"[{speaker}] {text}"
+
+
+def export_subtitle(result: Dict, output_dir: str, fmt: str = 'srt', name: Optional[str] = None,
+                    **options) -> Optional[str]:
+    """
+    导出单个文件的字幕，无时间轴时返回None
+
+    Args:
+        name: 字幕文件名（不含扩展名），默认取音频文件名
+    """
+    cues = result_cues(result, **options)
+    first = next(cues, None)
+    if first is None:
+        return None
+
+    base = name or os.path.splitext(os.path.basename(result['file']))[0]
+    path = os.path.join(output_dir, f"{base}.{fmt}")
+    writer = write_vtt if fmt == 'vtt' else write_srt
+    max_line_chars = options.get('max_line_chars', MAX_LINE_CHARS)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        writer(_chain_first(first, cues), f, max_line_chars)
+    return path
+
+
+def _chain_first(first: Cue, rest: Iterator[Cue]) -> Iterator[Cue]:
+    yield first
+    yield from rest
+
+
+def subtitle_names(results: List[Dict]) -> List[str]:
+    """
+    每个结果的字幕文件名（不含扩展名）
+
+    不同子目录下的同名音频会得到相同的文件名，后出现的依次加上 _2、_3 …，
+    保证并行写入时不会互相覆盖。
+    """
+    names, used = [], set()
+    for result in results:
+        base = os.path.splitext(os.path.basename(result['file']))[0]
+        name, n = base, 1
+        while name.lower() in used:  # Windows文件名不区分大小写
+            n += 1
+            name = f"{base}_{n}"
+        used.add(name.lower())
+        names.append(name)
+    return names
+
+
+def export_subtitles(results: List[Dict], output_dir: str, fmt: str = 'srt',
+                     max_workers: Optional[int] = None, **options) -> Tuple[List[str], List[str]]:
+    """
+    批量导出字幕（线程池并行）
+
+    Returns:
+        (已导出的字幕路径列表, 缺少时间轴而跳过的文件名列表)
+    """
+    fmt = fmt.lower()
+    if fmt not in ('srt', 'vtt'):
+        raise ValueError(f"不支持的字幕格式: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    exported, skipped = [], []
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, (os.cpu_count() or 1) + 2)) as pool:
+        futures = [(r['file'], pool.submit(export_subtitle, r, output_dir, fmt, name, **options))
+                   for r, name in zip(results, subtitle_names(results))]
+        for filename, future in futures:
+            try:
+                path = future.result()
+            except Exception as e:
+                logger.error(f"字幕导出失败 {filename}: {str(e)}")
+                skipped.append(filename)
+                continue
+            if path:
+                exported.append(path)
+            else:
+                skipped.append(filename)
+
+    return exported, skipped
@@ -74,6 +74,35 @@ class TencentSTT:
             logging.error(error_msg)
             return False, error_msg
 
+    def recognize_url(self, audio_url, model="16k_zh"):
+        """
+        以URL方式执行语音识别（SourceType=0），适合超过base64上限的大文件
+        :param audio_url: 识别服务可访问的音频下载地址（见utils.audio_stager）
+        :param model: 引擎模型
+        :return: (success, task_id/error_message)
+        """
+        try:
+            request = models.CreateRecTaskRequest()
+            request.EngineModelType = model
+            request.ChannelNum = 1
+            request.SourceType = 0  # 0表示语音URL
+            request.ResTextFormat = 0
+            request.Url = audio_url
+
+            response = self.client.CreateRecTask(request)
+            task_id = response.Data.TaskId
+            logging.info("识别任务创建成功 | TaskId: %d", task_id)
+            return True, task_id
+
+        except TencentCloudSDKException as e:
+            error_msg = f"SDK错误: {e.get_code()} - {e.get_message()}"
+            logging.error(error_msg)
+            return False, error_msg
+        except Exception as e:
+            error_msg = f"系统错误: {type(e).__name__} - {str(e)}"
+            logging.error(error_msg)
+            return False, error_msg
+
     def get_result(self, task_id, timeout=30):
         """
         获取识别结果
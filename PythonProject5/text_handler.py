@@ -1,31 +1,43 @@
 import logging
 import tkinter as tk
+from collections import deque
 from tkinter import scrolledtext
 
 
 class TextHandler(logging.Handler):
-    """自定义日志处理器，将日志输出到Tkinter文本框"""
+    """自定义日志处理器，将日志输出到Tkinter文本框（按帧批量刷新）"""
 
-    def __init__(self, text_widget):
+    def __init__(self, text_widget, interval_ms=50):
         super().__init__()
         self.text_widget = text_widget
         self.text_widget.config(state=tk.DISABLED)
+        self.interval_ms = interval_ms
+        self._pending = deque()
 
         # 设置日志格式
         formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
         self.setFormatter(formatter)
 
+        # 必须在主线程创建：之后由主线程定时取走积压的日志
+        self.text_widget.after(self.interval_ms, self._flush)
+
     def emit(self, record):
-        """处理日志记录"""
-        msg = self.format(record)
+        """处理日志记录（任意线程只入队，不直接操作控件）"""
+        self._pending.append(self.format(record))
+
+    def _flush(self):
+        """主线程中一次性追加积压的日志"""
+        if not self.text_widget.winfo_exists():
+            return
+
+        lines = []
+        while self._pending:
+            lines.append(self._pending.popleft())
 
-        def append():
-            """线程安全的文本追加操作"""
+        if lines:
             self.text_widget.config(state=tk.NORMAL)
-            self.text_widget.insert(tk.END, msg + '\n')
+            self.text_widget.insert(tk.END, '\n'.join(lines) + '\n')
             self.text_widget.see(tk.END)  # 滚动到底部
             self.text_widget.config(state=tk.DISABLED)
 
-        # 确保在主线程更新UI
-        if self.text_widget.winfo_exists():
-            self.text_widget.after(0, append)
\ No newline at end of file
+        self.text_widget.after(self.interval_ms, self._flush)
\ No newline at end of file
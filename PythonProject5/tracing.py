@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import threading
+from typing import Dict, List, Optional
+
+# 单个文件识别过程中的阶段
+STAGES = ("read", "probe", "convert", "load", "encode", "upload", "queue-wait", "decode", "post-process", "persist")
+
+
+class _NullSpan:
+    """关闭追踪时返回的共享空对象，进入/退出不做任何事"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'file', 'start')
+
+    def __init__(self, tracer: "Tracer", name: str, file: Optional[str]):
+        self.tracer = tracer
+        self.name = name
+        self.file = file
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer._record(self.name, self.file, self.start, time.perf_counter_ns() - self.start)
+        return False
+
+
+class _FileScope:
+    __slots__ = ('local', 'file', 'previous')
+
+    def __init__(self, local, file: str):
+        self.local = local
+        self.file = file
+
+    def __enter__(self):
+        self.previous = getattr(self.local, 'file', None)
+        self.local.file = self.file
+        return self
+
+    def __exit__(self, *exc):
+        self.local.file = self.previous
+        return False
+
+
+class Tracer:
+    """
+    分阶段耗时追踪
+
+    用法:
+        with tracer.bind_file("a.wav"):
+            with tracer.span("convert"):
+                ...
+
+    关闭时span()直接返回共享的空对象，开销只有一次属性判断。
+    开启时每个span记录为(阶段, 文件, 线程, 起始ns, 耗时ns)，
+    可汇总为各阶段分位数，或导出为Chrome trace(chrome://tracing / Perfetto)与JSONL。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._events: List[tuple] = []  # list.append是原子操作，多线程记录无需加锁
+        self._local = threading.local()
+        self._epoch = time.perf_counter_ns()
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+
+    def reset(self):
+        self._events = []
+        self._epoch = time.perf_counter_ns()
+
+    def span(self, name: str, file: Optional[str] = None):
+        """记录一个阶段，file缺省时取当前线程绑定的文件"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, file)
+
+    def bind_file(self, file: str):
+        """把当前线程之后的span归属到指定文件"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _FileScope(self._local, file)
+
+    def _record(self, name: str, file: Optional[str], start: int, duration: int):
+        if file is None:
+            file = getattr(self._local, 'file', None)
+        self._events.append((name, file, threading.get_ident(), start - self._epoch, duration))
+
+    # ========== 汇总 ==========
+
+    def histograms(self) -> Dict[str, Dict[str, float]]:
+        """各阶段耗时分布（毫秒）"""
+        durations: Dict[str, List[float]] = {}
+        for name, _, _, _, duration in self._events:
+            durations.setdefault(name, []).append(duration / 1e6)
+
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            count = len(values)
+            stats[name] = {
+                'count': count,
+                'total': sum(values),
+                'p50': values[int(count * 0.5)],
+                'p90': values[min(count - 1, int(count * 0.9))],
+                'p99': values[min(count - 1, int(count * 0.99))],
+                'max': values[-1]
+            }
+        return stats
+
+    def summary_lines(self) -> List[str]:
+        """按阶段顺序输出的汇总表（每阶段一行）"""
+        stats = self.histograms()
+        order = [s for s in STAGES if s in stats] + sorted(set(stats) - set(STAGES))
+        lines = []
+        for name in order:
+            s = stats[name]
+            lines.append(f"{name:<13} n={s['count']:<5} 总计 {s['total'] / 1000:8.2f}s  "
+                         f"p50 {s['p50']:8.1f}ms  p90 {s['p90']:8.1f}ms  "
+                         f"p99 {s['p99']:8.1f}ms  max {s['max']:8.1f}ms")
+        return lines
+
+    # ========== 导出 ==========
+
+    def export_chrome(self, path: str):
+        """导出为Chrome trace事件格式（完整事件ph=X，时间单位微秒）"""
+        pid = os.getpid()
+        events = [
+            {
+                'name': name, 'cat': 'stt', 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': start / 1000, 'dur': duration / 1000,
+                'args': {'file': file} if file else {}
+            }
+            for name, file, tid, start, duration in self._events
+        ]
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+
+    def export_jsonl(self, path: str):
+        """每个span一行，便于用pandas/jq离线分析"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for name, file, tid, start, duration in self._events:
+                f.write(json.dumps({
+                    'stage': name, 'file': file, 'thread': tid,
+                    'start_ms': round(start / 1e6, 3), 'duration_ms': round(duration / 1e6, 3)
+                }, ensure_ascii=False) + "\n")
+
+    def export(self, path: str):
+        """按扩展名选择格式：.jsonl为JSONL，其余为Chrome trace"""
+        if path.lower().endswith('.jsonl'):
+            self.export_jsonl(path)
+        else:
+            self.export_chrome(path)
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+
+# 全局追踪器（默认关闭）
+tracer = Tracer()
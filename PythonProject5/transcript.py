@@ -0,0 +1,130 @@
+import json
+import math
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class Transcript:
+    """
+    带时间轴的识别结果
+
+    text保留引擎原样输出的文本；时间轴以紧凑数组保存（单精度float），
+    每一项为(起始秒, 结束秒, 置信度, 词/片段)。Vosk为词级，Whisper/腾讯云为句级。
+    """
+
+    __slots__ = ('text', 'starts', 'ends', 'confidences', 'tokens')
+
+    def __init__(self, text: str = ""):
+        self.text = text
+        self.starts = array('f')
+        self.ends = array('f')
+        self.confidences = array('f')
+        self.tokens: List[str] = []
+
+    def add(self, start: float, end: float, token: str, confidence: float = 1.0):
+        """追加一个词/片段"""
+        self.starts.append(start)
+        self.ends.append(end)
+        self.confidences.append(confidence)
+        self.tokens.append(token)
+
+    def extend(self, other: "Transcript", offset: float = 0.0):
+        """拼接另一段结果的时间轴（offset为其在整段音频中的起始秒）"""
+        for start, end, conf, token in other:
+            self.add(start + offset, end + offset, token, conf)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def __iter__(self) -> Iterator[Tuple[float, float, float, str]]:
+        return zip(self.starts, self.ends, self.confidences, self.tokens)
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    @property
+    def has_timing(self) -> bool:
+        return len(self.tokens) > 0
+
+    @property
+    def duration(self) -> float:
+        return max(self.ends) if self.ends else 0.0
+
+    def to_dict(self) -> Dict:
+        """序列化为列式字典（便于JSON保存）"""
+        return {
+            'text': self.text,
+            'start': [round(v, 3) for v in self.starts],
+            'end': [round(v, 3) for v in self.ends],
+            'conf': [round(v, 3) for v in self.confidences],
+            'token': list(self.tokens)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Transcript":
+        transcript = cls(data.get('text', ""))
+        transcript.starts.extend(data.get('start', []))
+        transcript.ends.extend(data.get('end', []))
+        transcript.confidences.extend(data.get('conf', []))
+        transcript.tokens.extend(data.get('token', []))
+        return transcript
+
+    @classmethod
+    def from_vosk_results(cls, results: Iterable[Dict]) -> "Transcript":
+        """由Vosk的Result()/FinalResult()字典序列构建（需SetWords(True)）"""
+        texts = []
+        transcript = cls()
+        for res in results:
+            if res.get("text"):
+                texts.append(res["text"])
+            for word in res.get("result", []):
+                transcript.add(word["start"], word["end"], word["word"], word.get("conf", 1.0))
+        transcript.text = " ".join(texts).strip()
+        return transcript
+
+    @classmethod
+    def from_whisper_segments(cls, segments: Iterable[Dict], offset: float = 0.0) -> "Transcript":
+        """由Whisper的segments构建，置信度取exp(avg_logprob)"""
+        transcript = cls()
+        for seg in segments:
+            text = seg.get("text", "").strip()
+            if not text:
+                continue
+            conf = min(1.0, math.exp(seg.get("avg_logprob", 0.0)))
+            transcript.add(seg["start"] + offset, seg["end"] + offset, text, conf)
+        return transcript
+
+
+def save_transcripts(path: str, results: List[Dict]):
+    """
+    把结果中的时间轴保存为JSONL（每行一个文件）
+
+    声道拆分的多声道结果没有整体的transcript，只写合并文本和channels中各声道的时间轴。
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        for result in results:
+            transcript: Optional[Transcript] = result.get('transcript')
+            if transcript is None and not result.get('channels'):
+                continue
+            record = {'file': result['file']}
+            if transcript is not None:
+                record.update(transcript.to_dict())
+            else:
+                record['text'] = result.get('text', "")
+            if result.get('channels'):
+                record['channels'] = [
+                    dict(speaker=ch['speaker'], **ch['transcript'].to_dict())
+                    for ch in result['channels'] if ch.get('transcript') is not None
+                ]
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_transcripts(path: str) -> Dict[str, Transcript]:
+    """读取save_transcripts保存的JSONL，返回 文件名 -> Transcript"""
+    transcripts = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                transcripts[record['file']] = Transcript.from_dict(record)
+    return transcripts
@@ -0,0 +1,104 @@
+import logging
+from collections import deque
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FRAME_INTERVAL_MS = 50  # 每帧处理一次积压事件
+
+
+class UIEventQueue:
+    """
+    线程安全的界面事件通道
+
+    工作线程只负责入队（deque的append/popleft是原子操作），
+    Tk主线程每帧用一次after回调取空队列并合并同类事件：
+    进度和状态只保留最新值，日志行合并为一次插入，文件状态批量更新。
+    每秒数千条事件也只产生每帧一次的界面刷新。
+    """
+
+    def __init__(self, root, interval_ms: int = FRAME_INTERVAL_MS):
+        self.root = root
+        self.interval_ms = interval_ms
+        self._events = deque()
+        self._running = False
+
+        # 事件处理器（在主线程中调用）
+        self.on_progress: Optional[Callable[[int, int, str, Optional[dict]], None]] = None
+        self.on_status: Optional[Callable[[str], None]] = None
+        self.on_log: Optional[Callable[[list], None]] = None
+        self.on_file_status: Optional[Callable[[list], None]] = None
+
+    # ========== 工作线程接口 ==========
+
+    def progress(self, processed: int, total: int, current: str = "", stats: Optional[dict] = None):
+        """stats为ThroughputTracker.snapshot()，用于按音频时长显示进度和ETA"""
+        self._events.append(('progress', (processed, total, current, stats)))
+
+    def status(self, text: str):
+        self._events.append(('status', text))
+
+    def log(self, line: str, level: int = logging.INFO):
+        self._events.append(('log', (level, line)))
+
+    def file_status(self, filename: str):
+        self._events.append(('file', filename))
+
+    def call(self, func: Callable, *args):
+        """在主线程中按顺序执行任意回调（如处理完成后的收尾）"""
+        self._events.append(('call', (func, args)))
+
+    # ========== 主线程 ==========
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.root.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        try:
+            self.drain()
+        except Exception as e:
+            logger.error(f"界面事件处理失败: {str(e)}", exc_info=True)
+        finally:
+            if self._running:
+                self.root.after(self.interval_ms, self._tick)
+
+    def drain(self) -> int:
+        """取空队列并按类别合并处理，返回处理的事件数"""
+        progress = status = None
+        log_lines, files, calls = [], [], []
+
+        count = 0
+        events = self._events
+        while events:
+            kind, payload = events.popleft()
+            count += 1
+            if kind == 'progress':
+                progress = payload
+            elif kind == 'status':
+                status = payload
+            elif kind == 'log':
+                log_lines.append(payload)
+            elif kind == 'file':
+                files.append(payload)
+            else:
+                calls.append(payload)
+
+        if not count:
+            return 0
+
+        if log_lines and self.on_log:
+            self.on_log(log_lines)
+        if files and self.on_file_status:
+            self.on_file_status(files)
+        if progress and self.on_progress:
+            self.on_progress(*progress)
+        if status is not None and self.on_status:
+            self.on_status(status)
+        for func, args in calls:
+            func(*args)
+        return count
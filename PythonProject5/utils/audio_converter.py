@@ -3,6 +3,8 @@ import subprocess
 import logging
 from pathlib import Path
 from typing import Optional, Tuple
+from utils.pcm_cache import PCMCache
+from utils.audio_dsp import native_info
 
 # 腾讯云支持的音频格式列表 (2023最新)
 TENCENT_SUPPORTED_FORMATS = {
@@ -18,7 +20,10 @@ TENCENT_SUPPORTED_FORMATS = {
 class AudioConverter:
     @staticmethod
     def get_audio_info(file_path: str) -> Tuple[str, int, int]:
-        """获取音频的格式、采样率和声道数"""
+        """获取音频的格式、采样率和声道数（WAV/FLAC直接读文件头，其余使用ffprobe）"""
+        info = native_info(file_path)
+        if info is not None:
+            return info[:3]
         try:
             # 使用ffprobe获取音频信息
             cmd = [
@@ -65,6 +70,12 @@ class AudioConverter:
             if not need_conversion:
                 return input_path
 
+            # 标准16kHz单声道WAV直接复用PCM缓存
+            cache = PCMCache.instance()
+            if (output_dir is None and target_format == 'wav' and
+                    target_sample_rate == cache.sample_rate and target_channels == 1):
+                return cache.get_wav(input_path)
+
             # 准备输出路径
             input_file = Path(input_path)
             output_path = str(
@@ -0,0 +1,108 @@
+import math
+import logging
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+try:
+    import soundfile as sf
+
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):  # 缺少libsndfile时抛出OSError
+    SOUNDFILE_AVAILABLE = False
+
+try:
+    from scipy.signal import resample_poly
+
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# 进程内解码的格式（libsndfile支持的无损格式），其余交给ffmpeg
+NATIVE_EXTENSIONS = ('.wav', '.flac', '.aif', '.aiff')
+BLOCK_SECONDS = 30  # 每次读取并重采样的时长
+
+# libsndfile的格式/子类型 -> ffprobe的codec_name（与原ffprobe流程的判断保持一致）
+SUBTYPE_CODECS = {
+    'PCM_16': 'pcm_s16le', 'PCM_24': 'pcm_s24le', 'PCM_32': 'pcm_s32le',
+    'PCM_U8': 'pcm_u8', 'PCM_S8': 'pcm_s8', 'FLOAT': 'pcm_f32le', 'DOUBLE': 'pcm_f64le'
+}
+
+
+def can_decode_natively(path: str) -> bool:
+    return SOUNDFILE_AVAILABLE and SCIPY_AVAILABLE and path.lower().endswith(NATIVE_EXTENSIONS)
+
+
+def native_info(path: str) -> Optional[Tuple[str, int, int, float]]:
+    """
+    只读文件头获取(codec_name, 采样率, 声道数, 时长秒)，不启动ffprobe
+
+    非原生格式或读取失败时返回None，由调用方退回ffprobe。
+    """
+    if not SOUNDFILE_AVAILABLE or not path.lower().endswith(NATIVE_EXTENSIONS):
+        return None
+    try:
+        info = sf.info(path)
+    except Exception as e:
+        logger.debug(f"读取音频头失败 {path}: {str(e)}")
+        return None
+    if info.format == 'FLAC':
+        codec = 'flac'
+    else:
+        codec = SUBTYPE_CODECS.get(info.subtype, info.subtype.lower())
+    return codec, int(info.samplerate), int(info.channels), float(info.duration)
+
+
+def resample_ratio(source_rate: int, target_rate: int) -> Tuple[int, int]:
+    """多相重采样的(up, down)，如44100->16000为(160, 441)"""
+    divisor = math.gcd(source_rate, target_rate)
+    return target_rate // divisor, source_rate // divisor
+
+
+def _context_frames(up: int, down: int) -> int:
+    """
+    分块重采样时每侧需要的输入上下文（帧）
+
+    resample_poly的默认FIR半长为10*max(up, down)个上采样点，折合输入约为其/up帧；
+    再向上取整到down的倍数，使块起点对应整数个输出帧。
+    """
+    reach = math.ceil(10 * max(up, down) / up) + 1
+    return math.ceil(reach / down) * down
+
+
+def iter_pcm16(path: str, sample_rate: int, channels: int = 1,
+               block_seconds: float = BLOCK_SECONDS) -> Iterator[np.ndarray]:
+    """
+    进程内解码、下混并重采样为s16le，按块产出(frames, channels)的int16数组
+
+    分块边界对齐到down的整数倍，每块两侧带足FIR长度的上下文后再裁掉，
+    拼接结果与整段一次性resample_poly一致，长录音的内存占用只取决于块长。
+
+    Args:
+        channels: 1为下混单声道（各声道取平均，与ffmpeg -ac 1一致），0为保留源声道
+    """
+    with sf.SoundFile(path) as f:
+        up, down = resample_ratio(f.samplerate, sample_rate)
+        total = f.frames
+        block = max(down, int(block_seconds * f.samplerate) // down * down)
+        context = _context_frames(up, down) if up != down else 0
+
+        for start in range(0, total, block):
+            end = min(total, start + block)
+            first = max(0, start - context)
+            last = min(total, end + context)
+            f.seek(first)
+            data = f.read(last - first, dtype='float32', always_2d=True)
+            if channels == 1 and data.shape[1] > 1:
+                data = data.mean(axis=1, keepdims=True)
+
+            if up != down:
+                data = resample_poly(data, up, down, axis=0)
+                # first是down的倍数，输出偏移为整数；末块按总长向上取整
+                offset = (start - first) * up // down
+                count = (-(-end * up // down)) - start * up // down
+                data = data[offset:offset + count]
+
+            yield np.clip(np.rint(data * 32768.0), -32768, 32767).astype('<i2')
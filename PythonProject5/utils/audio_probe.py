@@ -0,0 +1,184 @@
+import os
+import math
+import logging
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from utils.wav_reader import MappedWav
+from utils.pcm_cache import PCMCache
+from utils.audio_dsp import native_info
+from utils.silence_split import FRAME_SECONDS, frame_energy
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+SILENCE_THRESHOLD_DB = -45.0  # 响度最高的若干帧低于该电平(dBFS)即视为静音
+ACTIVE_SECONDS = 0.15         # 至少这么长的帧超过阈值才算有声音（单个爆音不算）
+LEVEL_BLOCK_SECONDS = 10      # 电平统计每次处理的时长
+LEVEL_FLOOR_DB = -120.0
+
+
+def to_dbfs(amplitude: float) -> float:
+    """满刻度为1.0的幅度转换为dBFS（下限-120）"""
+    return 20 * math.log10(amplitude) if amplitude > 10 ** (LEVEL_FLOOR_DB / 20) else LEVEL_FLOOR_DB
+
+
+class AudioProbe:
+    """
+    音频时长与电平探测
+
+    WAV直接解析文件头（不读采样数据），其他格式调用ffprobe读取容器时长。
+    电平（峰值、整体RMS、有声帧电平）用numpy按块向量化统计，
+    用于在送入引擎前剔除静音文件。
+    结果按(路径, 大小, 修改时间)缓存，同一批次重复探测不会重复开进程。
+    """
+
+    _memo: Dict[tuple, float] = {}
+    _level_memo: Dict[tuple, Tuple[float, float, float]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def duration(cls, path: str) -> float:
+        """返回音频时长（秒），无法探测时返回0.0"""
+        with tracer.span("probe", os.path.basename(path)):
+            return cls._duration(path)
+
+    @classmethod
+    def _duration(cls, path: str) -> float:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return 0.0
+
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+        with cls._lock:
+            if key in cls._memo:
+                return cls._memo[key]
+
+        seconds = 0.0
+        if path.lower().endswith('.wav'):
+            try:
+                with MappedWav(path) as wav:
+                    seconds = wav.duration
+            except Exception:
+                seconds = 0.0  # 非常规WAV交给ffprobe
+        if not seconds:
+            info = native_info(path)
+            seconds = info[3] if info else 0.0
+        if not seconds:
+            seconds = cls._ffprobe_duration(path)
+
+        with cls._lock:
+            cls._memo[key] = seconds
+        return seconds
+
+    @classmethod
+    def durations(cls, paths: Iterable[str], max_workers: int = 8) -> Dict[str, float]:
+        """并发探测一批文件的时长"""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(paths, pool.map(cls.duration, paths)))
+
+    @classmethod
+    def level(cls, path: str, threshold_db: float = SILENCE_THRESHOLD_DB) -> Optional[Dict]:
+        """
+        统计音频电平并判断是否静音
+
+        以最响的ACTIVE_SECONDS时长的帧（frame_db）而不是整体RMS判断：
+        长段静音里只有一句话的录音不会被误判，单个爆音也不会让静音文件逃过检查。
+
+        Returns:
+            {'peak_db', 'rms_db', 'frame_db', 'silent'}，无法读取时返回None（交给引擎处理）
+        """
+        with tracer.span("probe", os.path.basename(path)):
+            levels = cls._levels(path)
+        if levels is None:
+            return None
+        peak_db, rms_db, frame_db = levels
+        return {'peak_db': peak_db, 'rms_db': rms_db, 'frame_db': frame_db, 'silent': frame_db < threshold_db}
+
+    @classmethod
+    def levels(cls, paths: Iterable[str], threshold_db: float = SILENCE_THRESHOLD_DB,
+               max_workers: int = 4) -> Dict[str, Optional[Dict]]:
+        """并发统计一批文件的电平"""
+        paths = list(paths)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return dict(zip(paths, pool.map(lambda p: cls.level(p, threshold_db), paths)))
+
+    @classmethod
+    def _levels(cls, path: str) -> Optional[Tuple[float, float, float]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime)
+        with cls._lock:
+            if key in cls._level_memo:
+                return cls._level_memo[key]
+
+        try:
+            try:
+                wav = MappedWav(path) if path.lower().endswith('.wav') else None
+            except ValueError:
+                wav = None  # 非常规WAV同样先解码
+            if wav is None:
+                # 压缩格式经PCM缓存解码，识别时直接命中缓存，不会重复解码
+                wav = PCMCache.instance().open(path)
+            with wav:
+                levels = cls._measure(wav)
+        except Exception as e:
+            logger.warning(f"无法统计音频电平 {path}: {str(e)}")
+            return None
+
+        with cls._lock:
+            cls._level_memo[key] = levels
+        return levels
+
+    @staticmethod
+    def _measure(wav: MappedWav) -> Tuple[float, float, float]:
+        """
+        按块统计(峰值, 整体RMS, 有声帧RMS)，单位dBFS，多声道取所有声道
+
+        有声帧RMS为能量最高的ACTIVE_SECONDS时长的帧中最低的一帧，
+        跨块只保留当前最高的k个帧能量。
+        """
+        frame_len = max(1, int(FRAME_SECONDS * wav.sample_rate))
+        block_frames = frame_len * max(1, int(LEVEL_BLOCK_SECONDS / FRAME_SECONDS))
+        active = max(1, int(round(ACTIVE_SECONDS / FRAME_SECONDS)))
+        peak = sum_squares = 0.0
+        loudest = np.zeros(0, dtype=np.float32)
+        for block in wav.iter_blocks(block_frames):
+            samples = wav.to_float32(block)
+            if not samples.size:
+                continue
+            peak = max(peak, float(np.abs(samples).max()))
+            sum_squares += float(np.einsum('ij,ij->', samples, samples))
+            for channel in range(samples.shape[1]):
+                loudest = np.concatenate([loudest, frame_energy(samples[:, channel], frame_len)])
+                if len(loudest) > active:
+                    loudest = np.partition(loudest, -active)[-active:]
+
+        count = wav.frames * wav.channels
+        rms = math.sqrt(sum_squares / count) if count else 0.0
+        active_energy = float(loudest.min()) if len(loudest) else 0.0
+        return to_dbfs(peak), to_dbfs(rms), to_dbfs(math.sqrt(active_energy))
+
+    @staticmethod
+    def _ffprobe_duration(path: str) -> float:
+        cmd = [
+            'ffprobe', '-v', 'error',
+            '-show_entries', 'format=duration',
+            '-of', 'default=noprint_wrappers=1:nokey=1',
+            path
+        ]
+        try:
+            output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, timeout=30)
+            return float(output.decode('utf-8').strip() or 0.0)
+        except Exception as e:
+            logger.warning(f"无法获取音频时长 {path}: {str(e)}")
+            return 0.0
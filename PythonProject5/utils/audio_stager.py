@@ -0,0 +1,232 @@
+import os
+import uuid
+import shutil
+import logging
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+try:
+    from qcloud_cos import CosConfig, CosS3Client
+
+    COS_SDK_AVAILABLE = True
+except ImportError:
+    COS_SDK_AVAILABLE = False
+
+INLINE_LIMIT = 5 * 1024 * 1024  # 录音文件识别base64方式的音频上限，超过时需要URL方式
+COPY_BUFFER = 1024 * 1024       # 流式收发的块大小
+URL_EXPIRE_SECONDS = 3600       # 预签名下载链接有效期
+
+
+def _staging_key(path: str, prefix: str = "") -> str:
+    """随机对象名（保留扩展名，便于服务端识别格式）"""
+    return f"{prefix}{uuid.uuid4().hex}{os.path.splitext(path)[1].lower()}"
+
+
+class _FileRequestHandler(BaseHTTPRequestHandler):
+    """
+    按URL路径在server.files中查找本地文件并流式返回
+
+    server.files: {对象名: 本地路径}，未登记的路径返回404，不会暴露其他文件。
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def _lookup(self) -> Optional[str]:
+        key = urlsplit(self.path).path.lstrip('/')
+        return self.server.files.get(key)
+
+    def _send_file(self, with_body: bool):
+        path = self._lookup()
+        if not path or not os.path.isfile(path):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.end_headers()
+        if with_body:
+            with open(path, 'rb') as f:
+                shutil.copyfileobj(f, self.wfile, COPY_BUFFER)
+
+    def do_HEAD(self):
+        self._send_file(with_body=False)
+
+    def do_GET(self):
+        self._send_file(with_body=True)
+
+    def log_message(self, fmt, *args):
+        logger.debug(f"{self.address_string()} {fmt % args}")
+
+
+class _StagingServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.files: Dict[str, str] = {}
+
+    def start(self) -> threading.Thread:
+        thread = threading.Thread(target=self.serve_forever, name="stager-http", daemon=True)
+        thread.start()
+        return thread
+
+
+class LocalHTTPStager:
+    """
+    本机HTTP服务暂存：文件以随机路径临时发布，识别服务按URL拉取
+
+    文件直接从磁盘流式发送，不读入内存也不复制。腾讯云需要能访问public_url
+    （公网地址、端口映射或反向代理），内网部署时请改用对象存储。
+    """
+
+    def __init__(self, bind: str = "0.0.0.0", port: int = 0, public_url: Optional[str] = None):
+        self._server = _StagingServer((bind, int(port)), _FileRequestHandler)
+        self._server.start()
+        host, port = self._server.server_address[:2]
+        if not public_url:
+            if host in ("0.0.0.0", ""):
+                host = "127.0.0.1"
+            public_url = f"http://{host}:{port}"
+            logger.warning(f"未配置public_url，暂存地址 {public_url} 只能在本机访问")
+        self.public_url = public_url.rstrip('/')
+        logger.info(f"音频暂存服务已启动: {self.public_url}")
+
+    def stage(self, path: str) -> str:
+        """发布文件，返回下载URL"""
+        key = _staging_key(path)
+        self._server.files[key] = os.path.abspath(path)
+        return f"{self.public_url}/{key}"
+
+    def release(self, url: str):
+        """识别完成后撤销发布"""
+        self._server.files.pop(urlsplit(url).path.rsplit('/', 1)[-1], None)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class HTTPPutStager:
+    """
+    流式PUT上传到对象存储
+
+    适用于接受直接PUT的存储（公共写入或带签名参数的桶前缀、MinIO、本地假存储服务）。
+    请求体直接从文件按块发送，内存占用与文件大小无关；识别完成后DELETE清理。
+
+    Args:
+        upload_url: PUT目标前缀，如 http://127.0.0.1:9000/asr-staging
+        public_url: 识别服务下载用的前缀（默认与upload_url相同）
+        query: 附加在对象URL后的查询串（如签名参数）
+    """
+
+    def __init__(self, upload_url: str, public_url: Optional[str] = None, query: str = "",
+                 timeout: float = 300):
+        self.upload_url = upload_url.rstrip('/')
+        self.public_url = (public_url or upload_url).rstrip('/')
+        self.query = query.lstrip('?')
+        self.timeout = timeout
+
+    def _request(self, method: str, url: str, body=None, headers: Optional[Dict] = None):
+        parts = urlsplit(url)
+        connection_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        conn = connection_cls(parts.netloc, timeout=self.timeout, blocksize=COPY_BUFFER)
+        try:
+            target = parts.path + (f"?{parts.query}" if parts.query else "")
+            conn.request(method, target, body=body, headers=headers or {})
+            resp = conn.getresponse()
+            resp.read()
+            if resp.status >= 300:
+                raise IOError(f"{method} {parts.path} 失败: HTTP {resp.status} {resp.reason}")
+        finally:
+            conn.close()
+
+    def _object_url(self, base: str, key: str) -> str:
+        return f"{base}/{key}" + (f"?{self.query}" if self.query else "")
+
+    def stage(self, path: str) -> str:
+        """上传文件，返回下载URL"""
+        key = _staging_key(path)
+        with open(path, 'rb') as f:
+            self._request("PUT", self._object_url(self.upload_url, key), body=f, headers={
+                "Content-Length": str(os.path.getsize(path)),
+                "Content-Type": "application/octet-stream"
+            })
+        return self._object_url(self.public_url, key)
+
+    def release(self, url: str):
+        key = urlsplit(url).path.rsplit('/', 1)[-1]
+        try:
+            self._request("DELETE", self._object_url(self.upload_url, key))
+        except Exception as e:
+            logger.warning(f"清理暂存对象失败 {key}: {str(e)}")
+
+    def close(self):
+        pass
+
+
+class COSStager:
+    """
+    腾讯云COS暂存（需要cos-python-sdk-v5）
+
+    分块并发流式上传，返回预签名下载URL，识别完成后删除对象。
+    """
+
+    def __init__(self, secret_id: str, secret_key: str, region: str, bucket: str,
+                 prefix: str = "asr-staging/", expire: int = URL_EXPIRE_SECONDS):
+        if not COS_SDK_AVAILABLE:
+            raise ImportError("cos-python-sdk-v5 not available")
+        self.client = CosS3Client(CosConfig(Region=region, SecretId=secret_id, SecretKey=secret_key))
+        self.bucket = bucket
+        self.prefix = prefix
+        self.expire = expire
+        self._keys: Dict[str, str] = {}  # URL -> 对象名
+
+    def stage(self, path: str) -> str:
+        key = _staging_key(path, self.prefix)
+        self.client.upload_file(Bucket=self.bucket, LocalFilePath=path, Key=key, PartSize=8, MAXThread=4)
+        url = self.client.get_presigned_download_url(Bucket=self.bucket, Key=key, Expired=self.expire)
+        self._keys[url] = key
+        return url
+
+    def release(self, url: str):
+        key = self._keys.pop(url, None)
+        if key is None:
+            return
+        try:
+            self.client.delete_object(Bucket=self.bucket, Key=key)
+        except Exception as e:
+            logger.warning(f"清理COS对象失败 {key}: {str(e)}")
+
+    def close(self):
+        pass
+
+
+def create_stager(model_config: Dict):
+    """
+    按腾讯云配置中的stager段创建暂存方式，未配置时返回None（只能使用base64方式）
+
+    配置示例:
+        "stager": {"type": "http", "port": 8765, "public_url": "http://1.2.3.4:8765"}
+        "stager": {"type": "put", "upload_url": "http://127.0.0.1:9000/asr-staging"}
+        "stager": {"type": "cos", "bucket": "asr-1250000000", "region": "ap-shanghai"}
+    """
+    options = dict(model_config.get('stager') or {})
+    if not options:
+        return None
+
+    stager_type = options.pop('type', 'http').lower()
+    if stager_type == 'http':
+        return LocalHTTPStager(**options)
+    if stager_type == 'put':
+        return HTTPPutStager(**options)
+    if stager_type == 'cos':
+        options.setdefault('secret_id', model_config.get('secret_id'))
+        options.setdefault('secret_key', model_config.get('secret_key'))
+        options.setdefault('region', model_config.get('region', 'ap-beijing'))
+        return COSStager(**options)
+    raise ValueError(f"Unknown stager type: {stager_type}")
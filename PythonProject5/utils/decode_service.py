@@ -0,0 +1,122 @@
+import os
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_READ_WORKERS = 8  # 读取以等待I/O为主（NAS等网络存储），线程数可多于CPU核数
+
+
+def chain(first: Future, then: Callable[[object], Future]) -> Future:
+    """
+    first完成后用其结果调用then（返回另一个Future），返回代表整条链的Future
+
+    取消返回的Future时，尚未开始的后续步骤不再执行，已提交的步骤一并取消。
+    """
+    outer = Future()
+    inner = [None]
+    lock = threading.Lock()
+
+    def forward(step: Future):
+        if outer.cancelled():
+            return
+        try:
+            outer.set_result(step.result())
+        except BaseException as e:
+            if not outer.cancelled():
+                outer.set_exception(e)
+
+    def first_done(f: Future):
+        with lock:
+            if outer.cancelled():
+                return
+            try:
+                step = then(f.result())
+            except BaseException as e:
+                outer.set_exception(e)
+                return
+            inner[0] = step
+        step.add_done_callback(forward)
+
+    def outer_done(f: Future):
+        if f.cancelled():
+            first.cancel()
+            with lock:
+                if inner[0] is not None:
+                    inner[0].cancel()
+
+    outer.add_done_callback(outer_done)
+    first.add_done_callback(first_done)
+    return outer
+
+
+class DecodeService:
+    """
+    预解码服务
+
+    一组常驻的解码线程把后续文件提前规范化到PCM缓存（WAV/FLAC在进程内完成，
+    压缩格式由线程启动ffmpeg），识别线程拿到的已经是可直接映射的16kHz单声道WAV，
+    解码与推理重叠进行，引擎不会在ffmpeg进程启动上等待。
+    解码之前可以再加一个读取阶段（独立的I/O线程组），把网络存储上的读取延迟
+    也藏到识别后面。全进程共用一个实例（与PCMCache一致）。
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, workers: Optional[int] = None, read_workers: Optional[int] = None):
+        self.workers = int(workers or DEFAULT_DECODE_WORKERS)
+        self.read_workers = int(read_workers or DEFAULT_READ_WORKERS)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="decode")
+        self._readers = ThreadPoolExecutor(max_workers=self.read_workers, thread_name_prefix="read")
+
+    @classmethod
+    def instance(cls, workers: Optional[int] = None, read_workers: Optional[int] = None) -> "DecodeService":
+        """获取全局实例（首次调用时可指定解码/读取线程数）"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(workers, read_workers)
+            return cls._instance
+
+    def submit(self, path: str, prepare: Callable[[str], str],
+               read: Optional[Callable[[str], object]] = None) -> Future:
+        """
+        在解码线程中执行prepare(path)，结果为可直接识别的音频路径
+
+        指定read时先在读取线程中执行read(path)，完成后再交给解码线程。
+        """
+        if read is None:
+            return self._executor.submit(prepare, path)
+        return chain(self._readers.submit(read, path), lambda _: self._executor.submit(prepare, path))
+
+    def prefetch(self, paths: Iterable[str], prepare: Callable[[str], str],
+                 ahead: Optional[int] = None,
+                 read: Optional[Callable[[str], object]] = None) -> Iterator[Tuple[str, Future]]:
+        """
+        按输入顺序产出(原路径, 解码Future)，始终保持ahead个文件在读取或解码
+
+        ahead即读取/解码阶段与识别之间的队列长度：识别跟不上时不再提交新文件，
+        提前处理的文件数（和缓存占用）有上限。停止迭代时取消尚未开始的任务。
+        """
+        ahead = max(1, ahead or self.workers * 2)
+        paths = iter(paths)
+        pending = deque((path, self.submit(path, prepare, read)) for path in islice(paths, ahead))
+        try:
+            while pending:
+                path, future = pending.popleft()
+                next_path = next(paths, None)
+                if next_path is not None:
+                    pending.append((next_path, self.submit(next_path, prepare, read)))
+                yield path, future
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def shutdown(self, wait: bool = False):
+        self._readers.shutdown(wait=wait, cancel_futures=True)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,98 @@
+import os
+import hashlib
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Tuple
+
+from utils.pcm_cache import PCMCache
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_BYTES = 64 * 1024  # 快速指纹取首、中、尾各64KB
+
+
+class AudioDedup:
+    """
+    批次内的重复音频检测
+
+    同一录音常以不同文件名或子目录出现多份。先按文件大小分组（只需stat），
+    大小相同的再比较首/中/尾采样的快速指纹，指纹仍相同的才读完整文件比较SHA1
+    （与PCM缓存共用同一个内容哈希并被记住，后续读取阶段不会再算一次）。
+    """
+
+    @staticmethod
+    def sample_hash(path: str) -> str:
+        """大小+首/中/尾各SAMPLE_BYTES的SHA1，不读完整文件"""
+        size = os.path.getsize(path)
+        digest = hashlib.sha1(str(size).encode('ascii'))
+        with open(path, 'rb') as f:
+            if size <= 3 * SAMPLE_BYTES:
+                digest.update(f.read())
+            else:
+                for offset in (0, (size - SAMPLE_BYTES) // 2, size - SAMPLE_BYTES):
+                    f.seek(offset)
+                    digest.update(f.read(SAMPLE_BYTES))
+        return digest.hexdigest()
+
+    @classmethod
+    def group(cls, paths: Iterable[str], max_workers: int = 8) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        按内容分组
+
+        Returns:
+            (去重后的文件列表, {原件路径: [内容相同的其他路径]})
+            每组以输入顺序中最先出现的文件为原件，去重后的列表保持输入顺序。
+            无法读取的文件视为唯一，交给识别流程报告错误。
+        """
+        paths = list(paths)
+        sizes = {}
+        by_size = defaultdict(list)
+        for path in paths:
+            try:
+                sizes[path] = os.path.getsize(path)
+            except OSError:
+                continue
+            by_size[sizes[path]].append(path)
+        candidates = [path for group in by_size.values() if len(group) > 1 for path in group]
+        if not candidates:
+            return paths, {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            samples = dict(zip(candidates, pool.map(cls._try(cls.sample_hash), candidates)))
+            by_sample = defaultdict(list)
+            for path in candidates:
+                if samples[path]:
+                    by_sample[(sizes[path], samples[path])].append(path)
+
+            suspects = [path for group in by_sample.values() if len(group) > 1 for path in group]
+            content_key = PCMCache.instance().content_key
+            full = dict(zip(suspects, pool.map(cls._try(content_key), suspects)))
+
+        canonical_of = {}
+        copies = {}
+        for path in paths:
+            key = full.get(path)
+            if not key:
+                continue
+            if key in canonical_of:
+                copies.setdefault(canonical_of[key], []).append(path)
+            else:
+                canonical_of[key] = path
+
+        duplicates = {path for group in copies.values() for path in group}
+        unique = [path for path in paths if path not in duplicates]
+        if duplicates:
+            logger.info(f"重复文件: {len(duplicates)} 个（{len(copies)} 组），每组只识别一次")
+        return unique, copies
+
+    @staticmethod
+    def _try(func):
+        """读取失败返回None（文件在扫描后被删除等）"""
+        def wrapper(path):
+            try:
+                return func(path)
+            except OSError as e:
+                logger.debug(f"计算指纹失败 {path}: {str(e)}")
+                return None
+        return wrapper
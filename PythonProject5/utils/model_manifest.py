@@ -0,0 +1,229 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "model_manifest.json"  # 保存在models/的上级目录（写入不能改变models/的mtime）
+FINGERPRINT_BYTES = 1024 * 1024  # 单文件模型取首尾各1MB计算指纹
+
+# models/下的类别目录 -> 引擎与语言
+MODEL_CONFIG = {
+    'CN': {'engine': 'vosk', 'lang': 'zh'},
+    'EN': {'engine': 'vosk', 'lang': 'en'},
+    'WHISPER': {'engine': 'whisper', 'lang': 'multilingual'},
+    'MICROSOFT': {'engine': 'microsoft', 'config_file': True},
+    'TENCENT': {'engine': 'tencent', 'config_file': True}
+}
+
+
+def _walk_files(path: str) -> List[Tuple[str, os.stat_result]]:
+    """(相对路径, stat) 列表，按相对路径排序"""
+    files = []
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            full = os.path.join(dirpath, name)
+            try:
+                files.append((os.path.relpath(full, path), os.stat(full)))
+            except OSError:
+                continue
+    return sorted(files, key=lambda item: item[0])
+
+
+def fingerprint(path: str) -> str:
+    """
+    模型内容指纹
+
+    单文件（.pt、.json）为大小+首尾各1MB的SHA1，不读完整的大文件；
+    目录（Vosk）为其中所有文件的相对路径、大小、修改时间的SHA1。
+    """
+    digest = hashlib.sha1()
+    if os.path.isdir(path):
+        for rel, stat in _walk_files(path):
+            digest.update(f"{rel}|{stat.st_size}|{stat.st_mtime_ns}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    size = os.path.getsize(path)
+    digest.update(str(size).encode('ascii'))
+    with open(path, 'rb') as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if size > 2 * FINGERPRINT_BYTES:
+            f.seek(-FINGERPRINT_BYTES, os.SEEK_END)
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+
+class ModelManifest:
+    """
+    持久化的模型扫描清单
+
+    清单记录每个模型的路径、引擎、语言、大小、修改时间和内容指纹，
+    以及实测的加载耗时和内存占用。启动时按目录修改时间校验：
+    models/与各类别目录的mtime都未变化时直接使用清单，不做任何listdir；
+    某个类别目录变化时只重新列出该目录，其中mtime和大小未变的模型沿用原条目。
+
+    目录的mtime只反映直接子项的增删改名，模型目录内部文件被替换时需要强制重扫。
+    清单文件本身保存在models/之外，否则每次写入都会改变models/的mtime，下次启动又要重扫。
+    """
+
+    def __init__(self, models_dir: str = "models", manifest_path: Optional[str] = None):
+        self.models_dir = os.path.abspath(models_dir)
+        self.manifest_path = manifest_path or os.path.join(os.path.dirname(self.models_dir), MANIFEST_NAME)
+        self.root_mtime: Optional[float] = None
+        self.dirs: Dict[str, Dict] = {}  # 类别目录名 -> {"mtime": 修改时间, "models": {显示名: 条目}}
+        self.last_scan = {"reused": 0, "rescanned": 0}
+        self._load()
+
+    # ========== 持久化 ==========
+
+    def _load(self):
+        if not os.path.exists(self.manifest_path):
+            return
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != MANIFEST_VERSION or data.get("root") != self.models_dir:
+                return
+            self.root_mtime = data.get("mtime")
+            self.dirs = data.get("dirs", {})
+        except Exception as e:
+            logger.warning(f"模型清单损坏，将重新扫描: {str(e)}")
+            self.root_mtime, self.dirs = None, {}
+
+    def save(self):
+        """原子写入清单（模型目录只读时只记录警告）"""
+        data = {"version": MANIFEST_VERSION, "root": self.models_dir,
+                "mtime": self.root_mtime, "dirs": self.dirs}
+        tmp_path = self.manifest_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except OSError as e:
+            logger.warning(f"模型清单写入失败: {str(e)}")
+
+    # ========== 扫描 ==========
+
+    def scan(self, force: bool = False) -> Dict[str, Dict]:
+        """
+        返回 {显示名称: 模型条目}，必要时增量重扫并更新清单
+
+        Args:
+            force: 忽略缓存，重新列出所有目录并重算变化模型的指纹
+        """
+        self.last_scan = {"reused": 0, "rescanned": 0}
+        if not os.path.isdir(self.models_dir):
+            return {}
+
+        changed = False
+        root_mtime = os.stat(self.models_dir).st_mtime
+        if force or root_mtime != self.root_mtime:
+            names = [name for name in os.listdir(self.models_dir)
+                     if name.upper() in MODEL_CONFIG and os.path.isdir(os.path.join(self.models_dir, name))]
+            self.dirs = {name: self.dirs.get(name, {}) for name in names}
+            self.root_mtime = root_mtime
+            changed = True
+
+        models = {}
+        for lang_dir, cached in list(self.dirs.items()):
+            lang_path = os.path.join(self.models_dir, lang_dir)
+            try:
+                mtime = os.stat(lang_path).st_mtime
+            except OSError:
+                # 类别目录在两次扫描之间被删除
+                del self.dirs[lang_dir]
+                changed = True
+                continue
+
+            if force or cached.get("mtime") != mtime:
+                cached = {"mtime": mtime, "models": self._scan_dir(lang_dir, cached.get("models", {}), force)}
+                self.dirs[lang_dir] = cached
+                changed = True
+            else:
+                self.last_scan["reused"] += len(cached["models"])
+            models.update(cached["models"])
+
+        if changed:
+            self.save()
+        return {name: dict(entry) for name, entry in models.items()}
+
+    def _scan_dir(self, lang_dir: str, previous: Dict[str, Dict], force: bool) -> Dict[str, Dict]:
+        """重新列出一个类别目录，mtime和大小未变的模型沿用原条目"""
+        config = MODEL_CONFIG[lang_dir.upper()]
+        lang_path = os.path.join(self.models_dir, lang_dir)
+        entries = {}
+        for name in os.listdir(lang_path):
+            path = os.path.join(lang_path, name)
+            if config.get('config_file'):
+                if not name.lower().endswith('.json'):
+                    continue
+                display_name = f"{lang_dir.title()}/{os.path.splitext(name)[0]}"
+            else:
+                display_name = f"{lang_dir}/{name}"
+
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            old = previous.get(display_name)
+            if old and not force and old.get("mtime") == stat.st_mtime and (
+                    os.path.isdir(path) or old.get("size") == stat.st_size):
+                entries[display_name] = old
+                self.last_scan["reused"] += 1
+                continue
+
+            entries[display_name] = self._build_entry(path, config, stat, old)
+            self.last_scan["rescanned"] += 1
+        return entries
+
+    @staticmethod
+    def _build_entry(path: str, config: Dict, stat: os.stat_result, old: Optional[Dict]) -> Dict:
+        """新建模型条目；内容指纹未变时保留上次实测的加载耗时和内存"""
+        engine = config['engine']
+        if config.get('config_file'):
+            valid = os.path.isfile(path)
+        elif engine == 'vosk':
+            valid = os.path.isdir(path)
+        else:
+            valid = os.path.exists(path)
+
+        if os.path.isdir(path):
+            size = sum(file_stat.st_size for _, file_stat in _walk_files(path))
+        else:
+            size = stat.st_size
+        try:
+            content_print = fingerprint(path)
+        except OSError as e:
+            logger.warning(f"计算模型指纹失败 {path}: {str(e)}")
+            content_print = None
+
+        entry = {
+            'path': path,
+            'engine': engine,
+            'lang': config.get('lang', 'zh'),
+            'valid': valid,
+            'size': size,
+            'mtime': stat.st_mtime,
+            'fingerprint': content_print,
+            'load_time': None,
+            'rss': None
+        }
+        if old and content_print and old.get('fingerprint') == content_print:
+            entry['load_time'], entry['rss'] = old.get('load_time'), old.get('rss')
+        return entry
+
+    # ========== 实测数据 ==========
+
+    def record_load(self, display_name: str, load_time: float, rss: Optional[int]):
+        """记录模型实测的加载耗时（秒）和常驻内存增量（字节）"""
+        for cached in self.dirs.values():
+            entry = cached.get("models", {}).get(display_name)
+            if entry is not None:
+                entry['load_time'] = round(load_time, 3)
+                if rss is not None:
+                    entry['rss'] = int(rss)
+                self.save()
+                return
@@ -0,0 +1,372 @@
+import os
+import struct
+import hashlib
+import logging
+import threading
+import subprocess
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.wav_reader import MappedWav
+from utils.audio_dsp import can_decode_natively, iter_pcm16
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = "pcm_cache"
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3  # 默认4GB
+WAV_HEADER_SIZE = 44
+HASH_CHUNK_SIZE = 1024 * 1024
+SPLIT_BLOCK_FRAMES = 16000 * 60  # 解交错时每次处理1分钟
+
+
+def build_wav_header(data_size: int,
+                     sample_rate: int = 16000,
+                     channels: int = 1,
+                     sample_width: int = 2) -> bytes:
+    """生成标准44字节PCM WAV文件头"""
+    byte_rate = sample_rate * channels * sample_width
+    block_align = channels * sample_width
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, byte_rate, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
+
+class PCMCache:
+    """
+    内容寻址的PCM缓存（线程安全版本）
+
+    以源文件内容的SHA1为键，缓存规范化后的16kHz单声道s16le PCM（带44字节WAV头），
+    同一音频再次识别时直接通过np.memmap读取，无需重新调用ffmpeg解码。
+    缓存目录按最近访问时间做LRU淘汰，总大小不超过max_bytes。
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self,
+                 cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 sample_rate: int = 16000):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes
+        self.sample_rate = sample_rate
+
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> 文件大小（按访问顺序）
+        self._total_bytes = 0
+        self._hash_memo: Dict[Tuple[str, int, int], str] = {}
+        self._pending: Dict[str, threading.Event] = {}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def instance(cls, **kwargs) -> "PCMCache":
+        """获取全局缓存实例（首次调用时可传入配置）"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(**kwargs)
+            return cls._instance
+
+    def _load_index(self):
+        """扫描缓存目录，按修改时间重建LRU顺序"""
+        items = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.wav'):
+                st = entry.stat()
+                items.append((st.st_mtime, entry.name[:-4], st.st_size))
+            elif entry.is_file() and entry.name.endswith('.part'):
+                # 上次异常退出遗留的半成品
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+        for _, key, size in sorted(items):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        logger.info(f"PCM缓存已加载: {len(self._entries)} 项, "
+                    f"{self._total_bytes / 1024 ** 2:.1f}MB / {self.max_bytes / 1024 ** 2:.0f}MB")
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.wav")
+
+    def is_cached_file(self, path: str) -> bool:
+        """判断路径是否本身就是缓存文件"""
+        return os.path.dirname(os.path.abspath(path)) == self.cache_dir
+
+    def content_key(self, path: str, channels: int = 1) -> str:
+        """计算内容键（同一进程内按路径/大小/修改时间记忆，避免重复哈希）"""
+        st = os.stat(path)
+        memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+
+        digest = self._hash_memo.get(memo_key)
+        if digest is None:
+            h = hashlib.sha1()
+            with open(path, 'rb') as f:
+                while True:
+                    chunk = f.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self._hash_memo[memo_key] = digest
+
+        return f"{digest}_{self.sample_rate}_{channels}"
+
+    def read_ahead(self, path: str) -> str:
+        """
+        流水线的读取阶段：流式读完源文件一次
+
+        顺带算出并记住内容哈希，随后的get_wav不再重读文件计算键，
+        解码和识别读取的数据也已在系统文件缓存中。读取失败留给后续阶段报告。
+        """
+        if not self.is_cached_file(path):
+            try:
+                self.content_key(path)
+            except OSError as e:
+                logger.debug(f"预读失败 {path}: {str(e)}")
+        return path
+
+    def get_wav(self, path: str, channels: int = 1) -> str:
+        """
+        返回规范化后的缓存WAV路径（未命中时解码写入缓存）
+
+        Args:
+            path: 原始音频路径
+            channels: 1为下混单声道，0为保留源声道布局
+        """
+        if self.is_cached_file(path):
+            return path
+
+        key = self.content_key(path, channels)
+        cached_path = self._get_or_create(key, lambda dst: self._decode(path, dst, channels))
+        logger.debug(f"PCM缓存: {os.path.basename(path)} -> {key}")
+        return cached_path
+
+    def split_channels(self, path: str) -> List[str]:
+        """
+        按声道拆分为多个单声道缓存文件
+
+        先保留源声道解码一次，再在一次遍历中用numpy完成解交错，
+        返回按声道顺序排列的缓存WAV路径（单声道源直接返回一项）。
+        """
+        multi_path = self.get_wav(path, channels=0)
+        with MappedWav(multi_path) as wav:
+            channels = wav.channels
+        if channels == 1:
+            return [multi_path]
+
+        base = os.path.splitext(os.path.basename(multi_path))[0]
+        keys = [f"{base}_ch{i}" for i in range(channels)]
+
+        with self._lock:
+            if not all(k in self._entries for k in keys):
+                # 部分声道已被淘汰时整体重建
+                for k in keys:
+                    if k in self._entries:
+                        self._total_bytes -= self._entries.pop(k)
+            else:
+                for k in keys:
+                    self._touch(k)
+
+        self._get_or_create(keys[0], lambda dst: self._deinterleave(multi_path, keys))
+        return [self._path_for(k) for k in keys]
+
+    def load(self, path: str) -> np.memmap:
+        """以np.memmap只读方式映射PCM采样（int16）"""
+        wav_path = self.get_wav(path)
+        return np.memmap(wav_path, dtype='<i2', mode='r', offset=WAV_HEADER_SIZE)
+
+    def open(self, path: str) -> MappedWav:
+        """以MappedWav方式打开缓存文件（调用方负责close）"""
+        return MappedWav(self.get_wav(path))
+
+    def _get_or_create(self, key: str, create: Callable[[str], int]) -> str:
+        """命中则返回缓存路径；否则由当前线程生成，同一键的并发请求等待其完成"""
+        cached_path = self._path_for(key)
+
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._touch(key)
+                    return cached_path
+
+                event = self._pending.get(key)
+                if event is None:
+                    # 由当前线程负责生成
+                    event = threading.Event()
+                    self._pending[key] = event
+                    break
+
+            # 其他线程正在生成同一内容，等待其完成后重新检查
+            event.wait()
+
+        try:
+            self._register(key, create(cached_path))
+            return cached_path
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+            event.set()
+
+    def _register(self, key: str, size: int):
+        """登记新写入的缓存文件并按容量淘汰"""
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = size
+            self._total_bytes += size
+            self._evict(keep=key)
+
+    def _decode(self, src_path: str, dst_path: str, channels: int = 1) -> int:
+        """解码为s16le PCM写入缓存文件：WAV/FLAC在进程内完成，其余格式（或进程内失败时）调用ffmpeg"""
+        if can_decode_natively(src_path):
+            try:
+                return self._decode_native(src_path, dst_path, channels)
+            except Exception as e:
+                logger.debug(f"进程内解码失败，改用ffmpeg {os.path.basename(src_path)}: {str(e)}")
+        return self._decode_ffmpeg(src_path, dst_path, channels)
+
+    def _decode_native(self, src_path: str, dst_path: str, channels: int = 1) -> int:
+        """soundfile读取 + 多相重采样（不启动子进程），流式写入缓存文件"""
+        part_path = f"{dst_path}.{threading.get_ident()}.part"
+        try:
+            with open(part_path, 'wb') as out:
+                out.write(build_wav_header(0, self.sample_rate, max(1, channels)))
+                data_size, out_channels = 0, max(1, channels)
+                for block in iter_pcm16(src_path, self.sample_rate, channels):
+                    out_channels = block.shape[1]
+                    out.write(block.tobytes())
+                    data_size += block.nbytes
+
+                out.seek(0)
+                out.write(build_wav_header(data_size, self.sample_rate, out_channels))
+
+            os.replace(part_path, dst_path)
+            return WAV_HEADER_SIZE + data_size
+        except Exception:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    def _decode_ffmpeg(self, src_path: str, dst_path: str, channels: int = 1) -> int:
+        """调用ffmpeg解码为s16le PCM并流式写入缓存文件"""
+        part_path = f"{dst_path}.{threading.get_ident()}.part"
+        cmd = ["ffmpeg", "-v", "error", "-i", src_path, "-ar", str(self.sample_rate)]
+
+        try:
+            if channels == 0:
+                # 保留源声道：声道数由ffmpeg写入WAV头
+                cmd.extend(["-acodec", "pcm_s16le", "-map_metadata", "-1", "-f", "wav", "-y", part_path])
+                result = subprocess.run(cmd, capture_output=True)
+                if result.returncode != 0:
+                    raise RuntimeError(f"音频解码失败: {result.stderr.decode(errors='ignore').strip()}")
+                os.replace(part_path, dst_path)
+                return os.path.getsize(dst_path)
+
+            cmd.extend(["-ac", str(channels), "-acodec", "pcm_s16le", "-f", "s16le", "pipe:1"])
+            with open(part_path, 'wb') as out:
+                out.write(build_wav_header(0, self.sample_rate, channels))
+                proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                data_size = 0
+                while True:
+                    chunk = proc.stdout.read(HASH_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    data_size += len(chunk)
+                stderr = proc.stderr.read()
+                proc.wait()
+
+                if proc.returncode != 0:
+                    raise RuntimeError(f"音频解码失败: {stderr.decode(errors='ignore').strip()}")
+
+                # 回填真实数据长度
+                out.seek(0)
+                out.write(build_wav_header(data_size, self.sample_rate, channels))
+
+            os.replace(part_path, dst_path)
+            return WAV_HEADER_SIZE + data_size
+        except Exception:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+
+    def _deinterleave(self, multi_path: str, keys: List[str]) -> int:
+        """一次遍历把交错的多声道PCM写成各声道独立的单声道文件，返回首个声道文件大小"""
+        part_paths = [f"{self._path_for(k)}.{threading.get_ident()}.part" for k in keys]
+        outputs = []
+        try:
+            with MappedWav(multi_path) as wav:
+                data_size = wav.frames * 2
+                for part in part_paths:
+                    f = open(part, 'wb')
+                    outputs.append(f)
+                    f.write(build_wav_header(data_size, wav.sample_rate))
+
+                for block in wav.iter_blocks(SPLIT_BLOCK_FRAMES):
+                    planar = np.ascontiguousarray(block.T, dtype='<i2')  # (channels, frames)
+                    for f, row in zip(outputs, planar):
+                        f.write(row.tobytes())
+
+            for f in outputs:
+                f.close()
+            for part, key in zip(part_paths, keys):
+                os.replace(part, self._path_for(key))
+        except Exception:
+            for f in outputs:
+                f.close()
+            for part in part_paths:
+                if os.path.exists(part):
+                    os.remove(part)
+            raise
+
+        size = WAV_HEADER_SIZE + data_size
+        for key in keys[1:]:
+            self._register(key, size)
+        return size
+
+    def _touch(self, key: str):
+        """更新LRU顺序与文件修改时间（供下次启动恢复顺序）"""
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path_for(key))
+        except OSError:
+            pass
+
+    def _evict(self, keep: Optional[str] = None):
+        """超出容量时按LRU顺序淘汰"""
+        for key in list(self._entries.keys()):
+            if self._total_bytes <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._path_for(key))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Windows下仍被映射的文件无法删除，留待下次淘汰
+                logger.debug(f"缓存淘汰跳过 {key}: {str(e)}")
+                continue
+            self._total_bytes -= self._entries.pop(key)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            max_bytes, self.max_bytes = self.max_bytes, 0
+            try:
+                self._evict()
+            finally:
+                self.max_bytes = max_bytes
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
@@ -0,0 +1,52 @@
+import logging
+import queue
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINK_CAPACITY = 32  # 识别结果最多积压的条数
+
+
+class SinkStage:
+    """
+    流水线末端阶段：在独立线程中按提交顺序处理识别结果（记录、日志、进度）
+
+    识别线程只负责put，结果处理不再占用识别时间；队列有界，
+    处理跟不上时put阻塞识别线程（背压），积压的结果数不随文件数增长。
+    handle抛出的异常只记录日志，不会中断后续条目。
+    """
+
+    _STOP = object()
+
+    def __init__(self, handle: Callable, capacity: int = DEFAULT_SINK_CAPACITY, name: str = "persist"):
+        self.handle = handle
+        self._queue = queue.Queue(maxsize=max(1, capacity))
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, *args):
+        """提交一条结果（队列满时阻塞）"""
+        self._queue.put(args)
+
+    def close(self):
+        """等待已提交的结果全部处理完"""
+        self._queue.put(self._STOP)
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                return
+            try:
+                self.handle(*item)
+            except Exception as e:
+                logger.error(f"结果处理失败: {str(e)}")
@@ -0,0 +1,103 @@
+import os
+import sys
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+def _rss_windows() -> Optional[int]:
+    """通过psapi.GetProcessMemoryInfo读取WorkingSetSize"""
+    import ctypes
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t)]
+
+    counters = PROCESS_MEMORY_COUNTERS()
+    counters.cb = ctypes.sizeof(counters)
+    handle = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+        return None
+    return int(counters.WorkingSetSize)
+
+
+def _rss_proc() -> Optional[int]:
+    """Linux: /proc/self/statm第二列为常驻页数"""
+    with open("/proc/self/statm", "r") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def rss_bytes() -> Optional[int]:
+    """
+    当前进程的常驻内存（字节）
+
+    优先使用psutil（可选依赖），没有时Windows走psapi、Linux读/proc，
+    都不可用时返回None。
+    """
+    try:
+        if PSUTIL_AVAILABLE:
+            return int(psutil.Process().memory_info().rss)
+        if sys.platform == "win32":
+            return _rss_windows()
+        if os.path.exists("/proc/self/statm"):
+            return _rss_proc()
+    except Exception as e:
+        logger.debug(f"读取进程内存失败: {str(e)}")
+    return None
+
+
+def total_memory_bytes() -> Optional[int]:
+    """物理内存总量（字节），无法获取时返回None"""
+    try:
+        if PSUTIL_AVAILABLE:
+            return int(psutil.virtual_memory().total)
+        if sys.platform == "win32":
+            import ctypes
+
+            class MEMORYSTATUSEX(ctypes.Structure):
+                _fields_ = [("dwLength", ctypes.c_ulong),
+                            ("dwMemoryLoad", ctypes.c_ulong),
+                            ("ullTotalPhys", ctypes.c_ulonglong),
+                            ("ullAvailPhys", ctypes.c_ulonglong),
+                            ("ullTotalPageFile", ctypes.c_ulonglong),
+                            ("ullAvailPageFile", ctypes.c_ulonglong),
+                            ("ullTotalVirtual", ctypes.c_ulonglong),
+                            ("ullAvailVirtual", ctypes.c_ulonglong),
+                            ("ullAvailExtendedVirtual", ctypes.c_ulonglong)]
+
+            status = MEMORYSTATUSEX()
+            status.dwLength = ctypes.sizeof(status)
+            if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+                return int(status.ullTotalPhys)
+            return None
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except Exception as e:
+        logger.debug(f"读取物理内存总量失败: {str(e)}")
+    return None
+
+
+def format_bytes(size: Optional[float]) -> str:
+    """字节数格式化为MB/GB，未知时返回N/A"""
+    if size is None:
+        return "N/A"
+    if abs(size) >= 1024 ** 3:
+        return f"{size / 1024 ** 3:.2f}GB"
+    return f"{size / 1024 ** 2:.0f}MB"
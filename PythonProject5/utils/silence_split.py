@@ -0,0 +1,60 @@
+from typing import List, Tuple
+
+import numpy as np
+
+FRAME_SECONDS = 0.03     # 能量计算的帧长
+SEARCH_SECONDS = 10.0    # 在目标切点前后多大范围内找最安静的位置
+OVERLAP_SECONDS = 1.0    # 每块两端额外带上的上下文
+
+# (送入识别器的起点, 终点, 归属起点, 归属终点)，单位为采样点
+Chunk = Tuple[int, int, int, int]
+
+
+def frame_energy(samples: np.ndarray, frame_len: int) -> np.ndarray:
+    """逐帧均方能量（向量化，不逐点循环）"""
+    count = len(samples) // frame_len
+    if count == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * frame_len].reshape(count, frame_len).astype(np.float32)
+    return np.einsum('ij,ij->i', frames, frames) / frame_len
+
+
+def find_split_points(samples: np.ndarray, sample_rate: int, chunk_seconds: float,
+                      search_seconds: float = SEARCH_SECONDS) -> List[int]:
+    """
+    按目标块长寻找切点，每个切点落在目标位置附近能量最低的帧中心
+
+    只计算各搜索窗口内的能量，长录音也不会整段转为浮点。
+    """
+    total = len(samples)
+    chunk = int(chunk_seconds * sample_rate)
+    search = int(search_seconds * sample_rate)
+    frame_len = max(1, int(FRAME_SECONDS * sample_rate))
+
+    points = []
+    target = chunk
+    while total - target > chunk // 2:  # 末尾不足半块时并入上一块
+        lo = max(points[-1] + frame_len if points else 0, target - search)
+        hi = min(total, target + search)
+        energy = frame_energy(samples[lo:hi], frame_len)
+        split = lo + int(np.argmin(energy)) * frame_len + frame_len // 2 if len(energy) else target
+        points.append(split)
+        target = split + chunk
+    return points
+
+
+def plan_chunks(samples: np.ndarray, sample_rate: int, chunk_seconds: float,
+                overlap_seconds: float = OVERLAP_SECONDS) -> List[Chunk]:
+    """
+    把长音频规划为在静音处切开、两端带重叠的若干块
+
+    短于两块长度（或chunk_seconds为0）时返回覆盖全长的单块。
+    识别结果按词的中点落在哪一块的归属区间来去重。
+    """
+    total = len(samples)
+    if not chunk_seconds or total <= 2 * chunk_seconds * sample_rate:
+        return [(0, total, 0, total)]
+
+    overlap = int(overlap_seconds * sample_rate)
+    bounds = [0] + find_split_points(samples, sample_rate, chunk_seconds) + [total]
+    return [(max(0, a - overlap), min(total, b + overlap), a, b) for a, b in zip(bounds, bounds[1:])]
@@ -0,0 +1,145 @@
+import os
+import mmap
+import struct
+import logging
+from typing import Iterator, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class MappedWav:
+    """
+    零拷贝WAV读取器
+
+    只解析一次RIFF头，通过mmap把采样数据映射为numpy视图，
+    切片窗口不会拷贝数据，长录音的常驻内存只取决于实际访问的页面。
+
+    用法:
+        with MappedWav(path) as wav:
+            for block in wav.iter_blocks(2000):
+                ...
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size == 0:
+                raise ValueError(f"空文件: {path}")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._parse_header()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _parse_header(self):
+        """解析RIFF块，定位fmt与data"""
+        mm = self._mmap
+        if len(mm) < 12 or mm[0:4] != b'RIFF' or mm[8:12] != b'WAVE':
+            raise ValueError(f"不是有效的WAV文件: {self.path}")
+
+        fmt = None
+        pos = 12
+        while pos + 8 <= len(mm):
+            chunk_id = mm[pos:pos + 4]
+            chunk_size = struct.unpack_from('<I', mm, pos + 4)[0]
+            body = pos + 8
+
+            if chunk_id == b'fmt ':
+                fmt = struct.unpack_from('<HHIIHH', mm, body)
+                if fmt[0] == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                    # 扩展格式的真实编码在SubFormat GUID的前两个字节
+                    sub_format = struct.unpack_from('<H', mm, body + 24)[0]
+                    fmt = (sub_format,) + fmt[1:]
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"WAV缺少fmt块: {self.path}")
+                # 流式写入的文件data长度可能为0或超出实际大小
+                available = len(mm) - body
+                if chunk_size == 0 or chunk_size > available:
+                    chunk_size = available
+                self._data_offset = body
+                self._data_size = chunk_size
+                break
+
+            pos = body + chunk_size + (chunk_size & 1)  # 块按偶数字节对齐
+        else:
+            raise ValueError(f"WAV缺少data块: {self.path}")
+
+        format_tag, self.channels, self.sample_rate, _, block_align, bits = fmt
+        self.sample_width = bits // 8
+
+        if format_tag == WAVE_FORMAT_PCM:
+            dtype = {1: 'u1', 2: '<i2', 4: '<i4'}.get(self.sample_width)
+        elif format_tag == WAVE_FORMAT_IEEE_FLOAT:
+            dtype = {4: '<f4', 8: '<f8'}.get(self.sample_width)
+        else:
+            dtype = None
+
+        if dtype is None or block_align != self.channels * self.sample_width:
+            raise ValueError(f"不支持的WAV编码: format={format_tag}, bits={bits}")
+
+        self.dtype = np.dtype(dtype)
+        self.frames = self._data_size // block_align
+
+        # 零拷贝视图：shape = (frames, channels)
+        self.samples = np.frombuffer(
+            mm, dtype=self.dtype, count=self.frames * self.channels, offset=self._data_offset
+        ).reshape(self.frames, self.channels)
+
+    @property
+    def duration(self) -> float:
+        """时长（秒）"""
+        return self.frames / self.sample_rate if self.sample_rate else 0.0
+
+    @property
+    def raw(self) -> mmap.mmap:
+        """整个文件的只读映射（含文件头），可直接传给base64等接受缓冲区的接口"""
+        return self._mmap
+
+    def channel(self, index: int = 0) -> np.ndarray:
+        """单个声道的跨步视图（不拷贝）"""
+        return self.samples[:, index]
+
+    def window(self, start: float, duration: Optional[float] = None) -> np.ndarray:
+        """按秒截取窗口视图（不拷贝）"""
+        first = max(0, int(start * self.sample_rate))
+        last = self.frames if duration is None else min(self.frames, first + int(duration * self.sample_rate))
+        return self.samples[first:last]
+
+    def iter_blocks(self, frames: int, start_frame: int = 0,
+                    end_frame: Optional[int] = None) -> Iterator[np.ndarray]:
+        """按固定帧数迭代数据块视图"""
+        end_frame = self.frames if end_frame is None else min(end_frame, self.frames)
+        for start in range(start_frame, end_frame, frames):
+            yield self.samples[start:min(start + frames, end_frame)]
+
+    def to_float32(self, block: np.ndarray) -> np.ndarray:
+        """把数据块转换为[-1, 1]区间的float32（会产生拷贝，仅用于窗口）"""
+        if self.dtype.kind == 'f':
+            return block.astype(np.float32)
+        if self.dtype == np.dtype('u1'):
+            return (block.astype(np.float32) - 128.0) / 128.0
+        return block.astype(np.float32) / float(2 ** (self.sample_width * 8 - 1))
+
+    def close(self):
+        """释放映射（仍有视图引用时交由GC回收）"""
+        self.samples = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            logger.debug(f"映射仍被引用，延迟释放: {self.path}")
+        self._file.close()
+
+    def __enter__(self) -> "MappedWav":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
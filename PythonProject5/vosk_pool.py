@@ -0,0 +1,231 @@
+import os
+import json
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.wav_reader import MappedWav
+from utils.silence_split import Chunk, plan_chunks
+
+logger = logging.getLogger(__name__)
+
+CHUNK_FRAMES = 2000  # 每次送入识别器的帧数（与单线程路径一致）
+
+# 未指定时的识别进程数：每个进程都加载一份完整模型，默认只开少量进程
+# （实际进程数还受内存预算限制），需要更多时由config['vosk_workers']显式指定
+DEFAULT_VOSK_WORKERS = min(4, os.cpu_count() or 1)
+
+# ========== 子进程 ==========
+
+_model = None
+_sample_rate = 16000
+
+
+def _init_worker(model_path: str, sample_rate: int):
+    """每个子进程只加载一次模型"""
+    global _model, _sample_rate
+    from vosk import Model, SetLogLevel
+    SetLogLevel(-1)
+    _model = Model(model_path)
+    _sample_rate = sample_rate
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    附加到父进程创建的共享内存（由父进程负责unlink）
+
+    spawn出的子进程与父进程共用同一个resource_tracker，重复登记同名块无副作用；
+    子进程里不能unregister，否则会把父进程的登记一并删掉。
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13没有track参数
+        return shared_memory.SharedMemory(name=name)
+
+
+def _recognize_shared(name: str, start: int, end: int) -> Tuple[List[Dict], float]:
+    """识别共享内存中[start, end)字节范围的16位单声道PCM，返回(Vosk结果字典列表, 识别耗时)"""
+    from vosk import KaldiRecognizer
+
+    started = time.perf_counter()
+    shm = _attach(name)
+    try:
+        recognizer = KaldiRecognizer(_model, _sample_rate)
+        recognizer.SetWords(True)
+        results = []
+        step = CHUNK_FRAMES * 2
+        view = shm.buf
+        try:
+            for offset in range(start, end, step):
+                if recognizer.AcceptWaveform(bytes(view[offset:min(offset + step, end)])):
+                    results.append(json.loads(recognizer.Result()))
+        finally:
+            view.release()
+        results.append(json.loads(recognizer.FinalResult()))
+    finally:
+        shm.close()
+    return results, time.perf_counter() - started
+
+
+def _warm_worker(name: str, end: int) -> int:
+    """预热任务：识别一段合成PCM，返回处理它的子进程号"""
+    _recognize_shared(name, 0, end)
+    return os.getpid()
+
+
+def merge_chunk_results(chunk_results: List[List[Dict]], chunks: List[Chunk], sample_rate: int) -> List[Dict]:
+    """
+    合并分块识别结果
+
+    词时间加上块的起点偏移，只保留中点落在该块归属区间内的词，
+    重叠区内两块都识别出的词因此只保留一次。返回值与Vosk结果字典格式相同。
+    """
+    if len(chunks) == 1:
+        return chunk_results[0]
+
+    merged = []
+    for results, (start, _, own_start, own_end) in zip(chunk_results, chunks):
+        offset = start / sample_rate
+        low, high = own_start / sample_rate, own_end / sample_rate
+        for res in results:
+            words = []
+            for word in res.get("result", []):
+                word_start, word_end = word["start"] + offset, word["end"] + offset
+                if low <= (word_start + word_end) / 2 < high:
+                    words.append(dict(word, start=word_start, end=word_end))
+            if words:
+                merged.append({"text": " ".join(w["word"] for w in words), "result": words})
+    return merged
+
+
+# ========== 父进程 ==========
+
+class VoskProcessPool:
+    """
+    Vosk多进程识别池
+
+    KaldiRecognizer的解码是CPU密集的，单进程内多线程受GIL和单模型限制，
+    这里启动N个子进程，各自加载一次Model。音频由父进程写入
+    multiprocessing.shared_memory，子进程按名称附加后直接切片读取，
+    任务参数只有共享内存名和字节范围，不经过pickle传输采样数据。
+    长录音在静音处切成带重叠的块，分发给多个进程同时识别后再合并。
+    子进程使用spawn方式启动，避免在带Tk/线程的进程中fork。
+    """
+
+    def __init__(self, model_path: str, workers: Optional[int] = None, sample_rate: int = 16000):
+        self.model_path = model_path
+        self.workers = workers or DEFAULT_VOSK_WORKERS
+        self.sample_rate = sample_rate
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path, sample_rate)
+        )
+        logger.info(f"Vosk进程池已启动: {self.workers} 个进程")
+
+    def submit(self, wav_path: str, chunk_seconds: float = 0) -> Future:
+        """
+        提交一个16kHz单声道16位WAV
+
+        Args:
+            wav_path: WAV路径
+            chunk_seconds: 长于两倍该值的录音分块并行识别（0为不分块）
+
+        Returns:
+            Future，结果为(Vosk结果字典列表, 子进程内识别耗时之和)
+        """
+        with MappedWav(wav_path) as wav:
+            if wav.sample_rate != self.sample_rate or wav.dtype != np.dtype('<i2'):
+                raise ValueError(f"需要{self.sample_rate}Hz 16位PCM: {wav_path}")
+            pcm = wav.channel(0)
+            chunks = plan_chunks(pcm, self.sample_rate, chunk_seconds)
+            shm = shared_memory.SharedMemory(create=True, size=max(1, pcm.shape[0] * 2))
+            target = np.ndarray(pcm.shape, dtype='<i2', buffer=shm.buf)
+            target[:] = pcm
+            del target, pcm
+
+        try:
+            futures = [self._executor.submit(_recognize_shared, shm.name, start * 2, end * 2)
+                       for start, end, _, _ in chunks]
+        except Exception:
+            self._release(shm)
+            raise
+
+        if len(futures) == 1:
+            futures[0].add_done_callback(lambda _: self._release(shm))
+            return futures[0]
+        return self._gather(futures, chunks, shm)
+
+    def warm_up(self, seconds: float = 1.0, timeout: float = 600) -> int:
+        """
+        让每个子进程都启动并加载好模型，返回已就绪的进程数
+
+        子进程随提交按需启动，先就绪的进程可能连续取走多个任务，
+        因此按轮提交与进程数相同的合成PCM识别任务，直到每个进程都处理过至少一个（或超时）。
+        """
+        t = np.arange(int(self.sample_rate * seconds), dtype=np.float32) / self.sample_rate
+        pcm = (0.1 * 32767 * np.sin(2 * np.pi * 440 * t)).astype('<i2')
+        shm = shared_memory.SharedMemory(create=True, size=max(1, pcm.nbytes))
+        target = np.ndarray(pcm.shape, dtype='<i2', buffer=shm.buf)
+        target[:] = pcm
+        del target
+
+        ready = set()
+        deadline = time.monotonic() + timeout
+        try:
+            while len(ready) < self.workers and time.monotonic() < deadline:
+                futures = [self._executor.submit(_warm_worker, shm.name, pcm.nbytes) for _ in range(self.workers)]
+                ready.update(future.result() for future in futures)
+        finally:
+            self._release(shm)
+        return len(ready)
+
+    def _gather(self, futures: List[Future], chunks: List[Chunk], shm) -> Future:
+        """所有分块完成后释放共享内存并合并结果；取消外层Future时一并取消各分块"""
+        outer = Future()
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def chunk_done(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            self._release(shm)
+            if outer.cancelled():
+                return
+            try:
+                outputs = [f.result() for f in futures]
+                results = merge_chunk_results([o[0] for o in outputs], chunks, self.sample_rate)
+                outer.set_result((results, sum(o[1] for o in outputs)))
+            except BaseException as e:
+                if not outer.cancelled():
+                    outer.set_exception(e)
+
+        def outer_done(f):
+            if f.cancelled():
+                for chunk_future in futures:
+                    chunk_future.cancel()
+
+        outer.add_done_callback(outer_done)
+        for future in futures:
+            future.add_done_callback(chunk_done)
+        return outer
+
+    @staticmethod
+    def _release(shm: shared_memory.SharedMemory):
+        try:
+            shm.close()
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,89 @@
+import os
+import time
+import hashlib
+import logging
+from typing import Optional
+
+import torch
+import whisper
+from torch import nn
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUANT_CACHE_DIR = os.path.join("models", ".quantized")
+
+_threads_configured = False
+
+
+def configure_threads(intra_op: Optional[int] = None, inter_op: Optional[int] = None):
+    """
+    设置PyTorch线程数
+
+    intra_op为单个算子内部的并行度（默认CPU核数），inter_op为算子之间的并行度；
+    多个识别进程同时运行时应按进程数分摊intra_op，避免线程超额订阅。
+    inter_op在进程内只能设置一次。
+    """
+    global _threads_configured
+    torch.set_num_threads(int(intra_op or os.cpu_count() or 1))
+    if inter_op and not _threads_configured:
+        try:
+            torch.set_num_interop_threads(int(inter_op))
+        except RuntimeError as e:
+            logger.warning(f"无法设置inter-op线程数: {str(e)}")
+    _threads_configured = True
+
+
+def quantize_model(model: nn.Module) -> nn.Module:
+    """
+    对Whisper的全部线性层做int8动态量化
+
+    whisper.model.Linear是nn.Linear的子类（只改写了forward里的dtype转换），
+    quantize_dynamic按精确类型匹配，因此先把它们换回nn.Linear再量化。
+    """
+    model = model.float().eval()
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = nn.Linear
+    return torch.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+
+
+def _cache_path(model_path: str, cache_dir: str) -> str:
+    """缓存文件名包含源模型的大小、修改时间和torch版本，任一变化都会重新量化"""
+    stat = os.stat(model_path)
+    key = f"{os.path.abspath(model_path)}|{stat.st_size}|{stat.st_mtime}|{torch.__version__}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(model_path.rstrip("\\/")))[0]
+    return os.path.join(cache_dir, f"{name}_{digest}.int8.pt")
+
+
+def load_quantized_model(model_path: str, cache_dir: str = DEFAULT_QUANT_CACHE_DIR) -> nn.Module:
+    """
+    加载int8量化的Whisper模型（CPU）
+
+    首次加载时量化并把整个模块保存到cache_dir，之后直接读取量化后的权重，
+    量化开销只付一次。
+    """
+    cache_path = _cache_path(model_path, cache_dir)
+    if os.path.exists(cache_path):
+        try:
+            start = time.perf_counter()
+            model = torch.load(cache_path, map_location="cpu", weights_only=False)
+            logger.info(f"已加载量化模型缓存: {cache_path} ({time.perf_counter() - start:.1f}s)")
+            return model
+        except Exception as e:
+            logger.warning(f"量化模型缓存损坏，重新量化: {str(e)}")
+
+    start = time.perf_counter()
+    model = quantize_model(whisper.load_model(model_path, device="cpu"))
+    logger.info(f"Whisper int8量化完成 ({time.perf_counter() - start:.1f}s)")
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = cache_path + ".tmp"
+    try:
+        torch.save(model, tmp_path)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        logger.warning(f"量化模型缓存写入失败: {str(e)}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return model